@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+AIT_Steg serialization scaling benchmark
+========================================
+
+Times AITStegMethod encode and decode for payloads from 1 KB to 64 KB
+inside a 10 MB cover. Time per payload byte should stay roughly flat as
+the payload grows, and the zero-width layer should not depend on the
+cover size beyond the single extraction pass.
+
+Usage:
+    python benchmarks/ait_scaling.py [--cover-mb 10]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add the src directory to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from stego.methods.ait_steg import AITStegMethod
+
+PAYLOAD_SIZES = [1024, 2048, 4096, 8192, 16384, 32768, 65000]
+
+
+def make_cover(size: int) -> str:
+    """Build a deterministic ASCII cover of the given size."""
+    sentence = "The quick brown fox jumps over the lazy dog. "
+    return (sentence * (size // len(sentence) + 1))[:size]
+
+
+def make_payload(size: int) -> str:
+    """Build a deterministic ASCII payload of the given size."""
+    return ''.join(chr(32 + (i * 7) % 95) for i in range(size))
+
+
+def best_of(func, repeat: int) -> float:
+    """Return the fastest of ``repeat`` runs, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--cover-mb', type=float, default=10, help='Cover size in MB')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement')
+    args = parser.parse_args()
+
+    method = AITStegMethod()
+    cover = make_cover(int(args.cover_mb * 1024 * 1024))
+    key = "benchmark-key"
+
+    print(f"Cover: {len(cover):,} characters")
+    print(f"{'payload':>8}  {'serialize':>10}  {'parse':>10}  {'encode':>10}  {'decode':>10}  {'ns/byte':>8}")
+
+    for size in PAYLOAD_SIZES:
+        payload = make_payload(size).encode('utf-8')
+        zw = method._data_to_zero_width(payload)
+        stego_text = method.encode(cover, make_payload(size), key)
+
+        serialize = best_of(lambda: method._data_to_zero_width(payload), args.repeat)
+        parse = best_of(lambda: method._zero_width_to_data(zw), args.repeat)
+        encode = best_of(lambda: method.encode(cover, make_payload(size), key), args.repeat)
+        decode = best_of(lambda: method.decode(stego_text, key), args.repeat)
+
+        per_byte = (serialize + parse) / size * 1e9
+        print(f"{size:>8}  {serialize * 1e3:>8.2f}ms  {parse * 1e3:>8.2f}ms  "
+              f"{encode * 1e3:>8.2f}ms  {decode * 1e3:>8.2f}ms  {per_byte:>8.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Encode/decode benchmark suite for every method
+==============================================
+
+Runs FourSpachMethod, AITStegMethod, TWSMMethod and EmStMethod over a
+deterministic matrix of 1 KB to 64 KB payloads in 10 KB to 100 MB covers
+and reports latency percentiles, throughput and tracemalloc peak memory.
+This is the same suite as ``stego bench`` and takes the same options.
+
+Usage:
+    python benchmarks/suite.py --output results.json
+    python benchmarks/suite.py --quick --baseline results.json
+"""
+
+import os
+import sys
+
+# Add the src directory to path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from stego.cli import main
+
+if __name__ == '__main__':
+    sys.argv[1:1] = ['bench']
+    main()
@@ -11,9 +11,16 @@ Available methods:
 __version__ = "0.1.0"
 __author__ = "ByteBaker"
 
-from .methods.fourspach import FourSpachMethod
-from .methods.ait_steg import AITStegMethod
-from .methods.twsm import TWSMMethod
-from .methods.em_st import EmStMethod
-
 __all__ = ["FourSpachMethod", "AITStegMethod", "TWSMMethod", "EmStMethod"]
+
+
+def __getattr__(name):
+    # Method classes are imported on first access, see stego.methods
+    if name in __all__:
+        from . import methods
+        return getattr(methods, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
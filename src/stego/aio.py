@@ -0,0 +1,118 @@
+"""asyncio API: encode and decode without blocking the event loop.
+
+Each call runs on an executor: the loop's default thread pool unless one is
+given. Key derivation and AES-GCM release the GIL, so threads keep the loop
+responsive for AIT_Steg; the symbol mapping of every method is pure Python,
+so CPU-bound services should pass a ProcessPoolExecutor. The whole call is
+offloaded at once rather than stage by stage, since the stages run back to
+back and each hop back to the loop would cost more than most stages.
+
+Concurrency is bounded in two ways: ``limiter`` is an asyncio.Semaphore the
+caller shares across requests, and the ``*_many`` helpers keep at most
+``concurrency`` calls in flight, reading their inputs lazily.
+
+With a process executor, covers and stego texts of shm.SHARED_MIN_SIZE
+characters or more are not pickled: they cross to the worker, and large
+results back, through shared-memory segments unlinked when the call ends.
+"""
+
+import asyncio
+import sys
+from collections import deque
+from .batch import create_method
+from .shm import SegmentManager, call_shared, is_large, share, unshare
+
+# Calls in flight for the *_many helpers when no limit is given
+DEFAULT_CONCURRENCY = 8
+
+
+def _method(method):
+    """Accept a method instance or a CLI method name."""
+    return create_method(method) if isinstance(method, str) else method
+
+
+def _call(method, name: str, *args):
+    """Run ``method.name(*args)``; module level so process pools can pickle it."""
+    return getattr(method, name)(*args)
+
+
+def _is_process_pool(executor) -> bool:
+    # Whoever created a process pool has loaded its module; no need to import it here
+    process = sys.modules.get('concurrent.futures.process')
+    return process is not None and isinstance(executor, process.ProcessPoolExecutor)
+
+
+async def _submit(executor, method, name: str, *args):
+    loop = asyncio.get_running_loop()
+    if not _is_process_pool(executor) or not any(map(is_large, args)):
+        return await loop.run_in_executor(executor, _call, method, name, *args)
+
+    with SegmentManager() as segments:
+        # Copying into and out of segments runs on a thread, off the event loop
+        shared = await loop.run_in_executor(None, lambda: [share(arg, segments) for arg in args])
+        result = await loop.run_in_executor(executor, call_shared, _call, segments.new_segment(),
+                                            method, name, *shared)
+        return await loop.run_in_executor(None, unshare, result)
+
+
+async def _run(executor, limiter, method, name: str, *args):
+    if limiter is None:
+        return await _submit(executor, method, name, *args)
+    async with limiter:
+        return await _submit(executor, method, name, *args)
+
+
+async def async_encode(method, cover_text: str, secret, key: str = None, executor=None, limiter=None) -> str:
+    """Encode a secret (``str`` or ``bytes``) on ``executor``; returns the stego text.
+
+    ``method`` is a StegoMethod instance or a method name such as '4spach'.
+    With a process executor the method instance is pickled for each call.
+    """
+    name = 'encode_bytes' if isinstance(secret, (bytes, bytearray)) else 'encode'
+    return await _run(executor, limiter, _method(method), name, cover_text, secret, key)
+
+
+async def async_decode(method, stego_text: str, key: str = None, binary: bool = False,
+                       executor=None, limiter=None):
+    """Decode a secret on ``executor``, as text or as bytes with ``binary``."""
+    name = 'decode_bytes' if binary else 'decode'
+    return await _run(executor, limiter, _method(method), name, stego_text, key)
+
+
+async def _gather_window(calls, concurrency: int):
+    """Await coroutines from ``calls`` with at most ``concurrency`` running; results in order.
+
+    The first failure cancels the calls still in flight and is raised.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    results = []
+    in_flight = deque()
+    try:
+        for call in calls:
+            if len(in_flight) >= concurrency:
+                results.append(await in_flight.popleft())
+            in_flight.append(asyncio.ensure_future(call))
+        while in_flight:
+            results.append(await in_flight.popleft())
+    except BaseException:
+        for task in in_flight:
+            task.cancel()
+        raise
+    return results
+
+
+async def async_encode_many(method, items, key: str = None, executor=None,
+                            concurrency: int = DEFAULT_CONCURRENCY, limiter=None) -> list:
+    """Encode ``(cover_text, secret)`` pairs concurrently; returns stego texts in input order."""
+    method = _method(method)
+    calls = (async_encode(method, cover_text, secret, key, executor, limiter) for cover_text, secret in items)
+    return await _gather_window(calls, concurrency)
+
+
+async def async_decode_many(method, texts, key: str = None, binary: bool = False, executor=None,
+                            concurrency: int = DEFAULT_CONCURRENCY, limiter=None) -> list:
+    """Decode stego texts concurrently; returns the secrets in input order."""
+    method = _method(method)
+    calls = (async_decode(method, text, key, binary, executor, limiter) for text in texts)
+    return await _gather_window(calls, concurrency)
@@ -0,0 +1,268 @@
+"""Batch encoding and decoding of many files on a process pool.
+
+Jobs come from a JSONL manifest, one object per line::
+
+    {"id": "msg-1", "cover": "cover.txt", "data": "msg-1.txt", "output": "out/msg-1.txt"}
+    {"id": "msg-1", "input": "out/msg-1.txt", "output": "decoded/msg-1.txt", "key": "k"}
+    {"id": "sig", "cover": "cover.txt", "data": "sig.bin", "output": "out/sig.txt", "binary": true}
+
+or from a directory, where every file is a secret to encode into a shared
+cover (encode) or a stego text to decode. Relative manifest paths are
+resolved against the manifest's directory; a missing ``output`` is placed
+in the output directory under the name of the job's source file. Each job yields a JobResult
+record, so one bad job does not stop the batch.
+"""
+
+import json
+import os
+import time
+from collections import deque, namedtuple
+from .methods import METHODS
+from .streaming import EncodedReader, write_decoded
+
+ACTIONS = ('encode', 'decode')
+
+# Outcome of one job; ``bytes`` counts the input bytes read for throughput
+JobResult = namedtuple('JobResult', ['index', 'id', 'status', 'output', 'error', 'seconds', 'bytes'])
+
+# Fields each action needs in a job
+_REQUIRED = {
+    'encode': ('cover', 'data', 'output'),
+    'decode': ('input', 'output'),
+}
+
+# Method instance used by the jobs of this process (see _init_worker)
+_worker_method = None
+
+
+def create_method(name: str, options: dict = None):
+    """Instantiate a method by its CLI name with constructor options."""
+    if name not in METHODS:
+        raise ValueError(f"Unknown method: {name}")
+    return METHODS[name](**(options or {}))
+
+
+def encode_file(method, cover_path: str, data_path: str, output_path: str, key: str = None,
+                binary: bool = False):
+    """Stream a cover and a secret file into a stego text file.
+
+    The secret file is read as UTF-8 text unless ``binary`` is set, in which
+    case its bytes are embedded unchanged.
+    """
+    if hasattr(method, 'encode_file'):
+        # Append-style methods copy the cover as raw bytes, with no str decoding
+        with _open_secret(data_path, 'r', binary) as data:
+            method.encode_file(cover_path, data if binary else EncodedReader(data), output_path, key)
+        return
+
+    with open(cover_path, 'r', encoding='utf-8') as cover, \
+            _open_secret(data_path, 'r', binary) as data, \
+            open(output_path, 'w', encoding='utf-8') as output:
+        method.encode_stream(cover, data if binary else EncodedReader(data), output, key)
+
+
+def decode_file(method, input_path: str, output_path: str, key: str = None, binary: bool = False) -> int:
+    """Decode a stego text file into an output file (raw bytes with ``binary``).
+
+    Returns the size of the secret written (bytes, or characters for text);
+    0 means the text held no message the key could open.
+    """
+    if hasattr(method, 'decode_file'):
+        # Append-style methods only need the tail of the file
+        if binary:
+            result = method.decode_file_bytes(input_path, key)
+        else:
+            result = method.decode_file(input_path, key)
+        with _open_secret(output_path, 'w', binary) as output:
+            return output.write(result)
+
+    with open(input_path, 'r', encoding='utf-8') as stego, \
+            _open_secret(output_path, 'w', binary) as output:
+        chunks = method.decode_stream(stego, key)
+        if binary:
+            return sum(map(output.write, chunks))
+        return write_decoded(output, chunks)
+
+
+def _open_secret(path: str, mode: str, binary: bool):
+    """Open a secret file as UTF-8 text, or as bytes when ``binary`` is set."""
+    if binary:
+        return open(path, mode + 'b')
+    return open(path, mode, encoding='utf-8')
+
+
+def load_jobs(path: str, action: str, output_dir: str = None, cover: str = None, key: str = None,
+              binary: bool = False):
+    """Yield job dicts from a JSONL manifest or a directory, lazily.
+
+    ``key`` and ``binary`` are the defaults for jobs without them. Manifest lines that cannot
+    be parsed become jobs carrying an ``invalid`` message, reported as errors.
+    """
+    if action not in ACTIONS:
+        raise ValueError(f"Unknown action: {action}")
+
+    if os.path.isdir(path):
+        if output_dir is None:
+            raise ValueError("An output directory is required for a directory of jobs")
+        if action == 'encode' and cover is None:
+            raise ValueError("A cover file is required to encode a directory of secrets")
+
+        for name in sorted(os.listdir(path)):
+            source = os.path.join(path, name)
+            if name.startswith('.') or not os.path.isfile(source):
+                continue
+            job = {'id': name, 'output': os.path.join(output_dir, name), 'key': key, 'binary': binary}
+            if action == 'encode':
+                job.update(cover=cover, data=source)
+            else:
+                job['input'] = source
+            yield job
+        return
+
+    base = os.path.dirname(os.path.abspath(path))
+    with open(path, 'r', encoding='utf-8') as manifest:
+        for line_number, line in enumerate(manifest, 1):
+            if not line.strip():
+                continue
+            job = _manifest_job(line, line_number, base, action, output_dir, cover, key)
+            job.setdefault('binary', binary)
+            yield job
+
+
+def _manifest_job(line: str, line_number: int, base: str, action: str,
+                  output_dir: str, cover: str, key: str) -> dict:
+    """Build one job from a manifest line, resolving its paths."""
+    try:
+        job = json.loads(line)
+    except ValueError as e:
+        return {'id': f"line {line_number}", 'invalid': f"Invalid JSON: {e}"}
+    if not isinstance(job, dict):
+        return {'id': f"line {line_number}", 'invalid': "Manifest lines must be JSON objects"}
+
+    # Paths given in the manifest are relative to it; defaults are not
+    for field in ('cover', 'data', 'input', 'output'):
+        if isinstance(job.get(field), str):
+            job[field] = os.path.join(base, job[field])
+
+    job.setdefault('id', str(line_number))
+    job.setdefault('key', key)
+    if cover is not None:
+        job.setdefault('cover', cover)
+    if 'output' not in job and output_dir is not None:
+        source = job.get('data' if action == 'encode' else 'input')
+        name = os.path.basename(source) if isinstance(source, str) else str(job['id'])
+        job['output'] = os.path.join(output_dir, name)
+    return job
+
+
+def run_job(method, action: str, index: int, job: dict) -> JobResult:
+    """Run one job with ``method`` and record its outcome; never raises."""
+    start = time.perf_counter()
+    job_id = str(job.get('id', index))
+    output = job.get('output')
+    size = 0
+    try:
+        if 'invalid' in job:
+            raise ValueError(job['invalid'])
+        missing = [field for field in _REQUIRED[action] if not job.get(field)]
+        if missing:
+            raise ValueError(f"Missing job fields: {', '.join(missing)}")
+
+        if action == 'encode':
+            size = os.path.getsize(job['cover']) + os.path.getsize(job['data'])
+            encode_file(method, job['cover'], job['data'], output, job.get('key'), bool(job.get('binary')))
+        else:
+            size = os.path.getsize(job['input'])
+            if not decode_file(method, job['input'], output, job.get('key'), bool(job.get('binary'))):
+                # Nothing recovered: do not leave an empty output behind as if it were the secret
+                os.remove(output)
+                raise ValueError("Decoding failed - no message found or incorrect key")
+    except Exception as e:
+        return JobResult(index, job_id, 'error', output, str(e), time.perf_counter() - start, size)
+
+    return JobResult(index, job_id, 'ok', output, None, time.perf_counter() - start, size)
+
+
+def _init_worker(method_name: str, options: dict):
+    """Create the method once per worker process."""
+    global _worker_method
+    _worker_method = create_method(method_name, options)
+
+
+def _run_worker_job(action: str, index: int, job: dict) -> JobResult:
+    return run_job(_worker_method, action, index, job)
+
+
+def run_batch(jobs, method_name: str, action: str, options: dict = None,
+              workers: int = None, ordered: bool = True, window: int = None):
+    """Run jobs and yield a JobResult for each one.
+
+    Jobs run on a pool of ``workers`` processes (default: one per CPU); with
+    ``workers`` of 1 they run in this process. Results come back in job
+    order when ``ordered`` is true, otherwise as soon as each job finishes.
+    At most ``window`` jobs (default: four per worker) are in flight, so a
+    manifest is read lazily and never held in memory as a whole.
+    """
+    if action not in ACTIONS:
+        raise ValueError(f"Unknown action: {action}")
+    workers = workers or os.cpu_count() or 1
+    jobs = enumerate(jobs)
+
+    if workers == 1:
+        method = create_method(method_name, options)
+        for index, job in jobs:
+            yield run_job(method, action, index, job)
+        return
+
+    # Imported here: multiprocessing is slow to load and only pools need it
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    window = window or workers * 4
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(method_name, options or {})) as pool:
+        in_flight = deque()
+
+        def submit_more():
+            while len(in_flight) < window:
+                item = next(jobs, None)
+                if item is None:
+                    return
+                in_flight.append(pool.submit(_run_worker_job, action, *item))
+
+        submit_more()
+        while in_flight:
+            if ordered:
+                done = [in_flight.popleft()]
+            else:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    in_flight.remove(future)
+            for future in done:
+                yield future.result()
+            submit_more()
+
+
+class BatchSummary:
+    """Running totals of a batch, for the throughput report."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.ok = 0
+        self.failed = 0
+        self.bytes = 0
+
+    def add(self, result: JobResult):
+        if result.status == 'ok':
+            self.ok += 1
+        else:
+            self.failed += 1
+        self.bytes += result.bytes
+
+    @property
+    def total(self) -> int:
+        return self.ok + self.failed
+
+    def __str__(self):
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        return (f"Processed {self.total} jobs ({self.ok} ok, {self.failed} failed) in {elapsed:.2f}s: "
+                f"{self.total / elapsed:.1f} jobs/s, {self.bytes / elapsed / 1e6:.2f} MB/s")
@@ -0,0 +1,240 @@
+"""Benchmark suite for the encode and decode paths of every method.
+
+Runs each method over a deterministic matrix of synthetic covers and
+payloads and records latency percentiles, throughput and tracemalloc peak
+memory. Results are plain JSON so they can be stored as a baseline and
+compared against later runs (see compare()).
+"""
+
+import json
+import math
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+from .methods import METHODS
+
+# Default matrix: payload sizes of 1 KB to 64 KB in covers of 10 KB to 100 MB
+PAYLOAD_SIZES = (1024, 4096, 16384, 65536)
+COVER_SIZES = (10 * 1024, 1024 * 1024, 100 * 1024 * 1024)
+
+# Smaller matrix for a quick check
+QUICK_PAYLOAD_SIZES = (1024, 65536)
+QUICK_COVER_SIZES = (10 * 1024, 100 * 1024)
+
+OPERATIONS = ('encode', 'decode')
+
+# Slowdown (fraction of the baseline) reported as a regression by compare()
+DEFAULT_THRESHOLD = 0.10
+
+_SEED = 1234
+_KEY = 'benchmark-key'
+
+# Plain words only: no formatting markers or emoticon characters
+_WORDS = ('the', 'quick', 'brown', 'fox', 'jumps', 'over', 'lazy', 'dog', 'lorem', 'ipsum',
+          'dolor', 'sit', 'amet', 'message', 'network', 'channel', 'report', 'signal')
+
+BenchResult = namedtuple('BenchResult', [
+    'method', 'operation', 'cover_size', 'payload_size', 'repeat',
+    'p50_ms', 'p90_ms', 'p99_ms', 'mean_ms', 'throughput_mb_s', 'peak_memory_bytes',
+])
+BenchResult.__doc__ = """One measured case; throughput counts cover plus payload bytes at the median latency."""
+
+Regression = namedtuple('Regression', ['method', 'operation', 'cover_size', 'payload_size',
+                                       'metric', 'baseline', 'current', 'change'])
+Regression.__doc__ = """A metric that got worse than the baseline by more than the threshold."""
+
+_SIZE_SUFFIXES = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+
+def parse_size(text: str) -> int:
+    """Parse a size such as '64K', '10M' or '512' into bytes."""
+    text = text.strip().upper().rstrip('B')
+    if text and text[-1] in _SIZE_SUFFIXES:
+        return int(float(text[:-1]) * _SIZE_SUFFIXES[text[-1]])
+    return int(text)
+
+
+def format_size(size: int) -> str:
+    """Format a byte count with the largest exact suffix, e.g. 65536 -> '64K'."""
+    for suffix, factor in sorted(_SIZE_SUFFIXES.items(), key=lambda item: -item[1]):
+        if size >= factor and size % factor == 0:
+            return f"{size // factor}{suffix}"
+    return str(size)
+
+
+def make_cover(size: int, seed: int = _SEED) -> str:
+    """Build a deterministic cover of ``size`` characters from plain words.
+
+    A 64 KB block of seeded random words is repeated, so large covers are
+    cheap to build and identical between runs.
+    """
+    rng = random.Random(seed)
+    words = []
+    length = 0
+    while length < min(size, 64 * 1024):
+        word = rng.choice(_WORDS)
+        words.append(word + ('.\n' if rng.random() < 0.08 else ' '))
+        length += len(words[-1])
+    block = ''.join(words)
+    return (block * (size // len(block) + 1))[:size]
+
+
+def make_payload(size: int, seed: int = _SEED) -> bytes:
+    """Build a deterministic printable ASCII payload of ``size`` bytes."""
+    rng = random.Random(seed + size)
+    return bytes(rng.randrange(32, 127) for _ in range(size))
+
+
+def percentile(timings, pct: float) -> float:
+    """Nearest-rank percentile of a list of timings."""
+    ordered = sorted(timings)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def _measure(func, repeat: int):
+    """Time ``repeat`` calls, then trace one more for peak memory."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    # Tracing slows allocation down, so it gets a run of its own
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return timings, peak
+
+
+def bench_case(name: str, method, cover: str, payload: bytes, repeat: int):
+    """Benchmark encode and decode of one payload in one cover; returns BenchResults."""
+    stego_text = method.encode_bytes(cover, payload, _KEY)
+    if method.decode_bytes(stego_text, _KEY) != payload:
+        raise RuntimeError(f"{name} failed to round trip a {len(payload)} byte payload")
+
+    calls = {
+        'encode': lambda: method.encode_bytes(cover, payload, _KEY),
+        'decode': lambda: method.decode_bytes(stego_text, _KEY),
+    }
+    data_bytes = len(cover) + len(payload)
+
+    results = []
+    for operation in OPERATIONS:
+        timings, peak = _measure(calls[operation], repeat)
+        p50 = percentile(timings, 50)
+        results.append(BenchResult(
+            method=name, operation=operation, cover_size=len(cover), payload_size=len(payload),
+            repeat=repeat, p50_ms=p50 * 1000, p90_ms=percentile(timings, 90) * 1000,
+            p99_ms=percentile(timings, 99) * 1000, mean_ms=sum(timings) / len(timings) * 1000,
+            throughput_mb_s=data_bytes / p50 / 1e6 if p50 else 0.0, peak_memory_bytes=peak,
+        ))
+    return results
+
+
+def run_suite(methods=None, cover_sizes=COVER_SIZES, payload_sizes=PAYLOAD_SIZES,
+              repeat: int = 5, progress=None):
+    """Run the benchmark matrix and return a JSON-ready report dict.
+
+    ``methods`` is a list of names from METHODS (default: all of them).
+    ``progress``, if given, is called with each BenchResult as it is measured.
+    """
+    names = list(methods or METHODS)
+    for name in names:
+        if name not in METHODS:
+            raise ValueError(f"Unknown method: {name}")
+
+    results = []
+    for cover_size in cover_sizes:
+        cover = make_cover(cover_size)
+        for payload_size in payload_sizes:
+            payload = make_payload(payload_size)
+            for name in names:
+                for result in bench_case(name, METHODS[name](), cover, payload, repeat):
+                    results.append(result)
+                    if progress is not None:
+                        progress(result)
+            del payload
+        del cover
+
+    from . import __version__
+    return {
+        'meta': {
+            'stego_version': __version__,
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'repeat': repeat,
+            'seed': _SEED,
+        },
+        'results': [result._asdict() for result in results],
+    }
+
+
+def save_report(report: dict, path: str):
+    """Write a report as JSON."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+        f.write('\n')
+
+
+def load_report(path: str) -> dict:
+    """Read a report written by save_report()."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _case_key(record: dict):
+    return record['method'], record['operation'], record['cover_size'], record['payload_size']
+
+
+def compare(current: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD):
+    """Return the Regressions of ``current`` against ``baseline``, worst first.
+
+    Median latency and peak memory are compared for every case present in
+    both reports; a case regresses when a metric grows by more than
+    ``threshold`` (a fraction of the baseline).
+    """
+    baseline_cases = {_case_key(record): record for record in baseline['results']}
+    regressions = []
+    for record in current['results']:
+        base = baseline_cases.get(_case_key(record))
+        if base is None:
+            continue
+        for metric in ('p50_ms', 'peak_memory_bytes'):
+            if base[metric] <= 0:
+                continue
+            change = record[metric] / base[metric] - 1
+            if change > threshold:
+                regressions.append(Regression(*_case_key(record), metric, base[metric], record[metric], change))
+    return sorted(regressions, key=lambda regression: -regression.change)
+
+
+def format_result(result: BenchResult) -> str:
+    """One table row for a result."""
+    return (f"{result.method:<9}{result.operation:<8}{format_size(result.cover_size):>7}"
+            f"{format_size(result.payload_size):>8}{result.p50_ms:>11.3f}{result.p90_ms:>11.3f}"
+            f"{result.p99_ms:>11.3f}{result.throughput_mb_s:>11.1f}{result.peak_memory_bytes / 1e6:>10.2f}")
+
+
+TABLE_HEADER = (f"{'method':<9}{'op':<8}{'cover':>7}{'payload':>8}{'p50 ms':>11}{'p90 ms':>11}"
+                f"{'p99 ms':>11}{'MB/s':>11}{'peak MB':>10}")
+
+
+def format_regression(regression: Regression) -> str:
+    """Describe a regression on one line."""
+    return (f"{regression.method} {regression.operation} cover={format_size(regression.cover_size)} "
+            f"payload={format_size(regression.payload_size)}: {regression.metric} "
+            f"{regression.baseline:.3f} -> {regression.current:.3f} (+{regression.change:.0%})")
+
+
+def print_progress(result: BenchResult):
+    """Progress callback printing a table row to stderr."""
+    print(format_result(result), file=sys.stderr, flush=True)
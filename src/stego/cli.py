@@ -4,14 +4,87 @@ Stego CLI entry point
 """
 
 import argparse
+import json
+import os
 import sys
-from .methods.fourspach import FourSpachMethod
-from .methods.ait_steg import AITStegMethod
-from .methods.twsm import TWSMMethod
-from .methods.em_st import EmStMethod
-
-
-def create_parser():
+from .batch import BatchSummary, create_method, decode_file, encode_file, load_jobs, run_batch
+from .framing import CODECS
+from .methods import BUILTIN_METHODS, METHODS
+from .plan import PLAN_ORDERS, plan
+from .profiling import Profiler
+
+
+def add_batch_parsers(subparsers, key: bool = False, ciphers=None):
+    """Add the encode-batch and decode-batch actions to a method's subparsers."""
+    for action in ('encode', 'decode'):
+        batch = subparsers.add_parser(f'{action}-batch', help=f'{action.capitalize()} many files')
+        batch.add_argument('--jobs', required=True,
+                           help='JSONL manifest of jobs, or a directory of '
+                                + ('secret files' if action == 'encode' else 'stego text files'))
+        if action == 'encode':
+            batch.add_argument('--cover', help='Cover text file shared by jobs without one')
+        batch.add_argument('--output-dir', help='Directory for outputs of jobs without one')
+        if key:
+            batch.add_argument('--key', help='Key for jobs without one')
+        if action == 'encode':
+            batch.add_argument('--compress', choices=CODECS, help='Compress secrets before embedding')
+        if ciphers and action == 'encode':
+            batch.add_argument('--cipher', choices=ciphers, default=ciphers[0],
+                               help=f'Cipher (default: {ciphers[0]})')
+        batch.add_argument('--binary', action='store_true',
+                           help='Treat secrets as raw bytes instead of UTF-8 text')
+        batch.add_argument('--workers', type=int, default=None,
+                           help='Worker processes (default: one per CPU; 1 runs in-process)')
+        batch.add_argument('--unordered', action='store_true',
+                           help='Report jobs as they finish instead of in manifest order')
+        batch.add_argument('--report', help='Write per-job JSON records here instead of stdout')
+
+
+def add_method_parsers(subparsers, spec):
+    """Add the encode, decode and batch actions of one method (a MethodSpec)."""
+    encode = subparsers.add_parser('encode', help='Encode data')
+    encode.add_argument('--cover', required=True, help='Cover text file')
+    encode.add_argument('--data', required=True, help='Secret data file')
+    if spec.key:
+        encode.add_argument('--key', help='Encryption key')
+    if spec.ciphers:
+        encode.add_argument('--cipher', choices=spec.ciphers, default=spec.ciphers[0],
+                            help=f'Cipher (default: {spec.ciphers[0]})')
+    encode.add_argument('--output', required=True, help='Output file')
+    encode.add_argument('--binary', action='store_true', help='Read the secret as raw bytes')
+    encode.add_argument('--profile', action='store_true', help='Print per-stage timings and peak memory')
+    encode.add_argument('--compress', choices=CODECS, help='Compress the secret before embedding')
+    encode.add_argument('--parallel', type=int, metavar='WORKERS',
+                        help='Encode large inputs in chunks on this many processes (in memory)')
+
+    decode = subparsers.add_parser('decode', help='Decode data')
+    decode.add_argument('--input', required=True, help='Stego text file')
+    if spec.key:
+        decode.add_argument('--key', help='Decryption key')
+    if spec.keyring:
+        decode.add_argument('--keyring', help='File of candidate keys, one per line')
+        decode.add_argument('--hours', type=int, default=0,
+                            help='Also try dynamic keys from this many past hours')
+    decode.add_argument('--output', required=True, help='Output file')
+    decode.add_argument('--binary', action='store_true', help='Write the secret as raw bytes')
+    decode.add_argument('--profile', action='store_true', help='Print per-stage timings and peak memory')
+    decode.add_argument('--parallel', type=int, metavar='WORKERS',
+                        help='Decode large inputs in chunks on this many processes (in memory)')
+    add_batch_parsers(subparsers, key=spec.key, ciphers=spec.ciphers or None)
+
+
+def method_specs(argv=None):
+    """Methods offered on the command line.
+
+    When ``argv`` selects a built-in method, entry points are not scanned,
+    since only that method's subtree can be used.
+    """
+    if argv and any(spec.name == argv[0] for spec in BUILTIN_METHODS):
+        return METHODS.specs(plugins=False)
+    return METHODS.specs()
+
+
+def create_parser(argv=None):
     """Create argument parser for stego CLI."""
     parser = argparse.ArgumentParser(
         prog='stego',
@@ -20,121 +93,481 @@ def create_parser():
 
     subparsers = parser.add_subparsers(dest='method', help='Steganography method')
 
-    # 4spach method
-    fourspach_parser = subparsers.add_parser('4spach', help='Four invisible Unicode characters')
-    fourspach_subs = fourspach_parser.add_subparsers(dest='action')
-
-    encode_4spach = fourspach_subs.add_parser('encode', help='Encode data')
-    encode_4spach.add_argument('--cover', required=True, help='Cover text file')
-    encode_4spach.add_argument('--data', required=True, help='Secret data file')
-    encode_4spach.add_argument('--output', required=True, help='Output file')
+    # One subtree per method; modules are only imported once a method runs
+    for spec in method_specs(argv):
+        method_parser = subparsers.add_parser(spec.name, help=spec.help)
+        add_method_parsers(method_parser.add_subparsers(dest='action'), spec)
+
+    # Capacity and cost planning across methods
+    plan_parser = subparsers.add_parser('plan', help='Rank the methods for a cover and secret')
+    plan_parser.add_argument('--cover', required=True, help='Cover text file')
+    payload = plan_parser.add_mutually_exclusive_group(required=True)
+    payload.add_argument('--data', help='Secret data file')
+    payload.add_argument('--length', type=int, help='Secret size in bytes')
+    plan_parser.add_argument('--sort', choices=PLAN_ORDERS, default='time',
+                             help='Rank by predicted time, output size or overhead (default: time)')
+    plan_parser.add_argument('--json', action='store_true', help='Print JSON instead of a table')
+
+    # Benchmark suite over a synthetic cover/payload matrix
+    bench_parser = subparsers.add_parser('bench', help='Benchmark encode and decode of every method')
+    bench_parser.add_argument('--methods', nargs='+', help='Methods to benchmark (default: all)')
+    bench_parser.add_argument('--payloads', nargs='+',
+                              help='Payload sizes, e.g. 1K 64K (default: 1K 4K 16K 64K)')
+    bench_parser.add_argument('--covers', nargs='+',
+                              help='Cover sizes, e.g. 10K 100M (default: 10K 1M 100M)')
+    bench_parser.add_argument('--quick', action='store_true', help='Run a small matrix (covers up to 100K)')
+    bench_parser.add_argument('--repeat', type=int, default=5, help='Timed runs per case (default: 5)')
+    bench_parser.add_argument('--output', help='Write the results to this JSON file')
+    bench_parser.add_argument('--baseline', help='Baseline results JSON to check for regressions')
+    bench_parser.add_argument('--compare', metavar='RESULTS',
+                              help='Compare an existing results file with --baseline instead of running')
+    bench_parser.add_argument('--threshold', type=float, default=0.10,
+                              help='Slowdown that counts as a regression (default: 0.10 = 10%%)')
+
+    # Long-running daemon with a warm worker pool
+    serve_parser = subparsers.add_parser('serve', help='Run a daemon that the CLI hands work to')
+    serve_parser.add_argument('--address', default=default_daemon_address(),
+                              help='Unix socket path or localhost HOST:PORT (default: %(default)s)')
+    serve_parser.add_argument('--workers', type=int, default=None,
+                              help='Worker processes (default: one per CPU; 0 runs requests in-process)')
+    serve_parser.add_argument('--max-queue', type=int, default=None,
+                              help='Requests queued before new ones are refused (default: 64 per worker)')
+    serve_parser.add_argument('--stats', action='store_true',
+                              help='Print the counters of the running daemon instead of starting one')
+
+    # Decoding without naming the method
+    auto_parser = subparsers.add_parser('decode', help='Decode a stego text of any method')
+    auto_parser.add_argument('--auto', action='store_true',
+                             help='Accepted for compatibility; the method is always identified')
+    auto_parser.add_argument('--input', required=True, help='Stego text file')
+    auto_parser.add_argument('--key', help='Decryption key (AIT_Steg)')
+    auto_parser.add_argument('--output', required=True, help='Output file')
+    auto_parser.add_argument('--binary', action='store_true', help='Write the secret as raw bytes')
+
+    # Corpus scanner for hidden payloads
+    scan_parser = subparsers.add_parser('scan', help='Find and classify hidden payloads in many files')
+    scan_parser.add_argument('paths', nargs='+', help='Files or directories to scan')
+    scan_parser.add_argument('--workers', type=int, default=None,
+                             help='Worker processes (default: one per CPU)')
+    scan_parser.add_argument('--output', help='Write the JSONL index to this file (default: stdout)')
 
-    decode_4spach = fourspach_subs.add_parser('decode', help='Decode data')
-    decode_4spach.add_argument('--input', required=True, help='Stego text file')
-    decode_4spach.add_argument('--output', required=True, help='Output file')
-
-    # AIT_Steg method
-    ait_parser = subparsers.add_parser('ait-steg', help='Zero-width Unicode with dynamic keys')
-    ait_subs = ait_parser.add_subparsers(dest='action')
+    return parser
 
-    encode_ait = ait_subs.add_parser('encode', help='Encode data')
-    encode_ait.add_argument('--cover', required=True, help='Cover text file')
-    encode_ait.add_argument('--data', required=True, help='Secret data file')
-    encode_ait.add_argument('--key', help='Encryption key')
-    encode_ait.add_argument('--output', required=True, help='Output file')
 
-    decode_ait = ait_subs.add_parser('decode', help='Decode data')
-    decode_ait.add_argument('--input', required=True, help='Stego text file')
-    decode_ait.add_argument('--key', help='Decryption key')
-    decode_ait.add_argument('--output', required=True, help='Output file')
+def default_daemon_address() -> str:
+    """Unix socket of the daemon for this user, in a directory private to the user."""
+    directory = os.environ.get('XDG_RUNTIME_DIR') or '/tmp'
+    user = os.getuid() if hasattr(os, 'getuid') else os.environ.get('USERNAME', 'user')
+    return os.path.join(directory, f'stego-{user}', 'daemon.sock')
 
-    # TWSM method
-    twsm_parser = subparsers.add_parser('twsm', help='Text formatting steganography')
-    twsm_subs = twsm_parser.add_subparsers(dest='action')
 
-    encode_twsm = twsm_subs.add_parser('encode', help='Encode data')
-    encode_twsm.add_argument('--cover', required=True, help='Cover text file')
-    encode_twsm.add_argument('--data', required=True, help='Secret data file')
-    encode_twsm.add_argument('--output', required=True, help='Output file')
+def daemon_address():
+    """Address of a daemon the CLI should use, or None to run locally.
 
-    decode_twsm = twsm_subs.add_parser('decode', help='Decode data')
-    decode_twsm.add_argument('--input', required=True, help='Stego text file')
-    decode_twsm.add_argument('--output', required=True, help='Output file')
+    STEGO_DAEMON overrides the default socket ('off' disables the daemon);
+    without it the default socket is used only if it exists. A socket that
+    another user owns or could connect to is refused: a STEGO_DAEMON socket
+    with PermissionError, the default one with a warning and a local run.
+    """
+    address = os.environ.get('STEGO_DAEMON')
+    if address == 'off':
+        return None
+    explicit = bool(address)
+    address = address or default_daemon_address()
+    # Most runs have no daemon: leave the server module unloaded for them
+    if (not explicit or os.sep in address) and not os.path.exists(address):
+        return None
 
-    # Em_st method
-    emst_parser = subparsers.add_parser('em-st', help='Emoticon-based encoding')
-    emst_subs = emst_parser.add_subparsers(dest='action')
+    from .server import check_socket, parse_address, private_dir
 
-    encode_emst = emst_subs.add_parser('encode', help='Encode data')
-    encode_emst.add_argument('--cover', required=True, help='Cover text file')
-    encode_emst.add_argument('--data', required=True, help='Secret data file')
-    encode_emst.add_argument('--output', required=True, help='Output file')
+    if isinstance(parse_address(address), tuple):
+        return address
+    try:
+        if not explicit:
+            private_dir(os.path.dirname(address))
+        check_socket(address)
+    except FileNotFoundError:
+        return None
+    except PermissionError as e:
+        if explicit:
+            raise
+        print(f"Warning: {e}; running locally", file=sys.stderr)
+        return None
+    return address
+
+
+def run_via_daemon(args) -> bool:
+    """Hand an encode/decode action to a running daemon; False if none is reachable."""
+    address = daemon_address()
+    if address is None:
+        return False
+    from .server import DaemonClient, parse_address
+
+    if isinstance(parse_address(address), tuple):
+        # A TCP daemon does not serve the file ops
+        return False
+
+    request = {'method': args.method, 'options': method_options(args), 'key': getattr(args, 'key', None),
+               'binary': args.binary, 'output': os.path.abspath(args.output)}
+    if args.action == 'encode':
+        request.update(op='encode_file', cover=os.path.abspath(args.cover), data=os.path.abspath(args.data))
+    else:
+        request.update(op='decode_file', input=os.path.abspath(args.input))
 
-    decode_emst = emst_subs.add_parser('decode', help='Decode data')
-    decode_emst.add_argument('--input', required=True, help='Stego text file')
-    decode_emst.add_argument('--output', required=True, help='Output file')
+    try:
+        client = DaemonClient(address)
+    except OSError:
+        # Stale socket or no daemon listening: run locally
+        return False
+    with client:
+        client.call(request)
+    return True
+
+
+def run_serve_command(args):
+    """Run the daemon in the foreground, or print the counters of a running one."""
+    from .server import DaemonClient, StegoServer, check_socket, parse_address, private_dir
+
+    is_socket = not isinstance(parse_address(args.address), tuple)
+    if args.stats:
+        if is_socket:
+            check_socket(args.address)
+        with DaemonClient(args.address) as client:
+            print(json.dumps(client.stats(), indent=2))
+        return
+
+    if args.address == default_daemon_address():
+        private_dir(os.path.dirname(args.address))
+    server = StegoServer(args.address, workers=args.workers, max_queue=args.max_queue)
+    server.start()
+    print(f"Serving on {args.address} with {server.workers} workers", file=sys.stderr, flush=True)
+
+    # Stop cleanly (removing the socket) on SIGTERM as well as Ctrl-C
+    import signal
+
+    def interrupt(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, interrupt)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+def method_options(args) -> dict:
+    """Constructor options for the method selected on the command line."""
+    options = {}
+    if getattr(args, 'cipher', None):
+        options['cipher'] = args.cipher
+    if getattr(args, 'compress', None):
+        options['compression'] = args.compress
+    return options
+
+
+def encode_in_memory(method, args):
+    """Encode with the whole cover and secret in memory, so every stage runs once.
+
+    With ``--parallel`` the work is split into chunks run on a process pool.
+    """
+    with open(args.cover, 'r', encoding='utf-8') as f:
+        cover_text = f.read()
+    if args.binary:
+        with open(args.data, 'rb') as f:
+            secret = f.read()
+    else:
+        with open(args.data, 'r', encoding='utf-8') as f:
+            secret = f.read().encode('utf-8')
+    key = getattr(args, 'key', None)
+    if getattr(args, 'parallel', None):
+        from .parallel import parallel_encode
+        stego_text = parallel_encode(method, cover_text, secret, key, workers=args.parallel)
+    else:
+        stego_text = method.encode_bytes(cover_text, secret, key)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        f.write(stego_text)
+
+
+def decode_in_memory(method, args):
+    """Decode with the whole stego text in memory, so every stage runs once.
+
+    With ``--parallel`` the work is split into chunks run on a process pool.
+    """
+    with open(args.input, 'r', encoding='utf-8') as f:
+        stego_text = f.read()
+    key = getattr(args, 'key', None)
+    if getattr(args, 'parallel', None):
+        from .parallel import parallel_decode
+        secret = parallel_decode(method, stego_text, key, workers=args.parallel)
+    else:
+        secret = method.decode_bytes(stego_text, key)
+    if args.binary:
+        with open(args.output, 'wb') as f:
+            f.write(secret)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(secret.decode('utf-8'))
+
+
+def run_auto_decode_command(args) -> str:
+    """Decode with the method the text's frame header names; returns that method."""
+    from .detect import detect_method
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        stego_text = f.read()
+    name = detect_method(stego_text)
+    if name is None:
+        raise ValueError("Could not identify the method: no frame header or carrier symbols found")
+
+    key = args.key if METHODS.spec(name).key else None
+    secret = create_method(name).decode_bytes(stego_text, key)
+    if not secret:
+        raise ValueError(f"Decoding failed - no {name} message found")
+    if args.binary:
+        with open(args.output, 'wb') as f:
+            f.write(secret)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(secret.decode('utf-8'))
+    return name
+
+
+def run_batch_command(args) -> bool:
+    """Run an encode-batch/decode-batch action; returns True if every job succeeded."""
+    action = args.action.split('-')[0]
+    options = method_options(args)
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    jobs = load_jobs(args.jobs, action, output_dir=args.output_dir,
+                     cover=getattr(args, 'cover', None), key=getattr(args, 'key', None),
+                     binary=args.binary)
+    summary = BatchSummary()
+    report = open(args.report, 'w', encoding='utf-8') if args.report else sys.stdout
+    try:
+        for result in run_batch(jobs, args.method, action, options,
+                                workers=args.workers, ordered=not args.unordered):
+            summary.add(result)
+            record = {field: value for field, value in result._asdict().items() if field != 'index'}
+            record['seconds'] = round(result.seconds, 6)
+            report.write(json.dumps(record) + '\n')
+    finally:
+        if report is not sys.stdout:
+            report.close()
+
+    print(summary, file=sys.stderr)
+    return summary.failed == 0
+
+
+def run_scan_command(args) -> bool:
+    """Scan files for hidden payloads; returns True if every file could be read."""
+    from .corpus import ScanSummary, iter_paths, result_records, scan_files
+
+    summary = ScanSummary()
+    report = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        for result in scan_files(iter_paths(args.paths), workers=args.workers):
+            summary.add(result)
+            for record in result_records(result):
+                report.write(json.dumps(record) + '\n')
+    finally:
+        if report is not sys.stdout:
+            report.close()
+
+    print(summary, file=sys.stderr)
+    return summary.errors == 0
+
+
+def run_plan_command(args):
+    """Print the methods ranked for a cover and secret, without encoding."""
+    with open(args.cover, 'r', encoding='utf-8') as f:
+        cover_text = f.read()
+    payload_len = os.path.getsize(args.data) if args.data else args.length
+
+    ranking = plan(cover_text, payload_len, args.sort)
+    if args.json:
+        print(json.dumps([dict(name=name, fits=estimate.fits, **estimate._asdict())
+                          for name, estimate in ranking], indent=2))
+        return
+
+    print(f"{'Rank':<5}{'Method':<10}{'Fits':<6}{'Capacity':>12}{'Carriers':>20}"
+          f"{'Overflow':>10}{'Output':>12}{'Time (ms)':>11}")
+    for rank, (name, estimate) in enumerate(ranking, 1):
+        capacity = 'unbounded' if estimate.capacity is None else f"{estimate.capacity:,}"
+        carriers = f"{estimate.carriers:,} {estimate.carrier_unit}"
+        print(f"{rank:<5}{name:<10}{'yes' if estimate.fits else 'no':<6}{capacity:>12}{carriers:>20}"
+              f"{estimate.overflow:>10,}{estimate.output_size:>12,}{estimate.encode_seconds * 1000:>11.2f}")
+
+
+def run_bench_command(args) -> bool:
+    """Run (or load) benchmark results; returns False if any case regressed."""
+    from . import bench
+
+    if args.compare:
+        if not args.baseline:
+            raise ValueError("--compare needs a --baseline to compare against")
+        report = bench.load_report(args.compare)
+    else:
+        if args.covers:
+            covers = [bench.parse_size(size) for size in args.covers]
+        else:
+            covers = bench.QUICK_COVER_SIZES if args.quick else bench.COVER_SIZES
+        if args.payloads:
+            payloads = [bench.parse_size(size) for size in args.payloads]
+        else:
+            payloads = bench.QUICK_PAYLOAD_SIZES if args.quick else bench.PAYLOAD_SIZES
+        print(bench.TABLE_HEADER, file=sys.stderr)
+        report = bench.run_suite(args.methods, covers, payloads, args.repeat, progress=bench.print_progress)
+        if args.output:
+            bench.save_report(report, args.output)
+            print(f"Results written to {args.output}", file=sys.stderr)
+        else:
+            print(json.dumps(report, indent=2))
 
-    return parser
+    if not args.baseline:
+        return True
+    regressions = bench.compare(report, bench.load_report(args.baseline), args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {bench.format_regression(regression)}", file=sys.stderr)
+    print(f"{len(regressions)} regressions against {args.baseline}", file=sys.stderr)
+    return not regressions
 
 
 def main():
     """Main CLI entry point."""
-    parser = create_parser()
-    args = parser.parse_args()
+    argv = sys.argv[1:]
+    parser = create_parser(argv)
+    args = parser.parse_args(argv)
 
     if not args.method:
         parser.print_help()
         sys.exit(1)
 
+    if args.method == 'plan':
+        try:
+            run_plan_command(args)
+        except Exception as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        return
+
+    if args.method == 'bench':
+        try:
+            passed = run_bench_command(args)
+        except Exception as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        if not passed:
+            sys.exit(1)
+        return
+
+    if args.method == 'decode':
+        try:
+            name = run_auto_decode_command(args)
+        except Exception as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        print(f"Detected method: {name}")
+        print(f"Decoded data written to {args.output}")
+        return
+
+    if args.method == 'scan':
+        try:
+            passed = run_scan_command(args)
+        except Exception as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        if not passed:
+            sys.exit(1)
+        return
+
+    if args.method == 'serve':
+        try:
+            run_serve_command(args)
+        except Exception as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        return
+
     if not args.action:
         print(f"Error: No action specified for {args.method}")
         sys.exit(1)
 
     # Route to appropriate method
     try:
-        if args.method == '4spach':
-            method = FourSpachMethod()
-        elif args.method == 'ait-steg':
-            method = AITStegMethod()
-        elif args.method == 'twsm':
-            method = TWSMMethod()
-        elif args.method == 'em-st':
-            method = EmStMethod()
-        else:
-            print(f"Unknown method: {args.method}")
-            sys.exit(1)
+        options = method_options(args)
+        profiler = None
+        parallel = getattr(args, 'parallel', None)
+        if parallel is not None and parallel < 1:
+            raise ValueError("--parallel needs at least 1 worker")
+        if getattr(args, 'profile', False):
+            # Profiled runs use the in-memory path, so stages are not split into chunks
+            import tracemalloc
+            profiler = options['profiler'] = Profiler()
+            tracemalloc.start()
+        elif args.action in ('encode', 'decode') and not (parallel or getattr(args, 'keyring', None)
+                                                          or getattr(args, 'hours', 0)):
+            # A running daemon takes plain encode/decode actions; no method is loaded here
+            if run_via_daemon(args):
+                print(f"{args.action.capitalize()}d data written to {args.output}")
+                return
+        method = create_method(args.method, options)
 
         # Execute action
         if args.action == 'encode':
-            # Read cover and data files
-            with open(args.cover, 'r', encoding='utf-8') as f:
-                cover_text = f.read()
-            with open(args.data, 'r', encoding='utf-8') as f:
-                secret_data = f.read()
-
-            result = method.encode(cover_text, secret_data, getattr(args, 'key', None))
-
-            # Write result to output file
-            with open(args.output, 'w', encoding='utf-8') as f:
-                f.write(result)
+            if profiler is not None or parallel:
+                encode_in_memory(method, args)
+            else:
+                # Stream the cover and data files through to the output file
+                encode_file(method, args.cover, args.data, args.output, getattr(args, 'key', None),
+                            args.binary)
             print(f"Encoded data written to {args.output}")
 
         elif args.action == 'decode':
-            # Read input file
-            with open(args.input, 'r', encoding='utf-8') as f:
-                stego_text = f.read()
-
-            result = method.decode(stego_text, getattr(args, 'key', None))
-
-            # Write result to output file
-            with open(args.output, 'w', encoding='utf-8') as f:
-                f.write(result)
+            if getattr(args, 'keyring', None) or getattr(args, 'hours', 0):
+                with open(args.input, 'r', encoding='utf-8') as f:
+                    stego_text = f.read()
+                keyring = [args.key] if args.key else []
+                if args.keyring:
+                    with open(args.keyring, 'r', encoding='utf-8') as f:
+                        keyring += [line.strip() for line in f if line.strip()]
+
+                match = method.decode_keyring(stego_text, keyring, args.hours, binary=args.binary)
+                if match is None:
+                    raise ValueError("Decoding failed - no candidate key matched")
+                result = match.secret
+                if match.key is not None:
+                    print(f"Matched keyring entry {keyring.index(match.key) + 1}")
+                else:
+                    print(f"Matched dynamic key for hour bucket {match.hour}")
+
+                # Write result to output file
+                if args.binary:
+                    with open(args.output, 'wb') as f:
+                        f.write(result)
+                else:
+                    with open(args.output, 'w', encoding='utf-8') as f:
+                        f.write(result)
+            elif profiler is not None or parallel:
+                decode_in_memory(method, args)
+            else:
+                # Reads only the tail for append-style methods, else streams the file
+                decode_file(method, args.input, args.output, getattr(args, 'key', None), args.binary)
             print(f"Decoded data written to {args.output}")
 
+        elif args.action in ('encode-batch', 'decode-batch'):
+            if not run_batch_command(args):
+                sys.exit(1)
+
         else:
             print(f"Unknown action: {args.action}")
             sys.exit(1)
 
+        if profiler is not None:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(profiler.format_table(peak))
+
     except Exception as e:
         print(f"Error: {e}")
         sys.exit(1)
@@ -0,0 +1,241 @@
+"""Corpus scanning (``stego scan``): find and classify hidden payloads in many files.
+
+Each document is fingerprinted first: histograms of the zero-width
+characters (4spach, AIT_Steg), the Em_st emoticons and the TWSM formatting
+markers. Only carrier families with enough symbols for a framed message are
+looked at again, by their methods' message search (see scanning), which
+confirms each message by its frame markers and checksums. Carriers that hold
+no valid frame but are dense enough to be a payload (legacy frames, damaged
+or truncated messages) are still reported, as unverified. Files are scanned
+on a process pool and every finding becomes one JSONL record::
+
+    {"file": "logs/day-1.txt", "offset": 1832, "length": 147, "method": "ait-steg",
+     "est_length": 21, "verified": true}
+
+``offset`` and ``length`` are in characters of the file decoded as UTF-8
+(undecodable bytes count as one character each); ``est_length`` is the
+estimated payload size in bytes, as stored (after compression).
+"""
+
+import os
+import time
+from collections import Counter, deque, namedtuple
+from .batch import create_method
+from .framing import FLAG_AEAD, framed_size
+from .methods import METHODS
+
+# A suspected payload in a document; ``verified`` is true when a complete
+# message with valid checksums was found at the span
+Finding = namedtuple('Finding', ['offset', 'length', 'method', 'est_length', 'verified'])
+
+# Outcome of scanning one file; ``bytes`` counts the bytes read
+ScanResult = namedtuple('ScanResult', ['file', 'findings', 'error', 'bytes', 'seconds'])
+
+# Carrier histograms of a document: zero-width characters and Em_st symbols
+# by character, TWSM formatted words by 2-bit value; ``runs`` holds the
+# ``(start, end)`` spans of the zero-width runs
+Fingerprint = namedtuple('Fingerprint', ['zero_width', 'emoticons', 'formats', 'runs'])
+
+# Bytes in the smallest framed message: no family with fewer carriers is examined
+MIN_MESSAGE_BYTES = framed_size(1)
+
+# Share of the words in a span that must carry a symbol (Em_st) or be
+# formatted (TWSM) for unverified carriers to be reported; both methods mark
+# every word of the cover while the payload lasts
+MIN_DENSITY = 0.5
+
+# Nonce and authentication tag carried by every AEAD frame
+_AEAD_OVERHEAD = 12 + 16
+
+# Method instances of this process by name, see _get_method
+_scan_methods = {}
+
+
+def _get_method(name: str):
+    method = _scan_methods.get(name)
+    if method is None:
+        method = _scan_methods[name] = create_method(name)
+    return method
+
+
+def fingerprint(text: str) -> Fingerprint:
+    """Count the carrier symbols of every method in the text."""
+    ait = METHODS['ait-steg']
+    runs = [run.span() for run in ait._EXTRACT_RE.finditer(text)]
+    zero_width = Counter()
+    if runs:
+        carried = ''.join(text[start:end] for start, end in runs)
+        zero_width.update({char: carried.count(char) for char in ait._CHARSET if char in carried})
+
+    em_st = METHODS['em-st']
+    symbols = set(em_st.SYMBOL_MAP.values())
+    emoticons = Counter(symbol for symbol in em_st._SYMBOL_RE.findall(text) if symbol in symbols)
+
+    twsm = METHODS['twsm']
+    formats = Counter()
+    if '*' in text or '_' in text:
+        group_values = twsm._GROUP_VALUES
+        formats.update(group_values[match.lastindex] for match in twsm._FORMAT_RE.finditer(text))
+
+    return Fingerprint(zero_width, emoticons, formats, runs)
+
+
+def _payload_size(frames) -> int:
+    """Bytes of payload a message stores, without AEAD nonces and tags."""
+    return sum(len(frame.payload) - (_AEAD_OVERHEAD if frame.flags & FLAG_AEAD else 0)
+               for frame in frames)
+
+
+def _verified(text: str, name: str) -> list:
+    """Return a Finding for every valid message of one method in the text."""
+    found = _get_method(name)._find_messages(text)
+    return [Finding(offset, length, name, _payload_size(frames), True)
+            for offset, length, frames in found]
+
+
+def _zero_width_guess(text: str, start: int, end: int):
+    """Classify a zero-width run without a valid frame, or return None if too short."""
+    run = text[start:end]
+    spach = METHODS['4spach']
+    if any(char not in spach._CHARSET for char in run):
+        name, per_byte = 'ait-steg', 3
+    elif len(run) % 4 and not len(run) % 3:
+        name, per_byte = 'ait-steg', 3
+    else:
+        name, per_byte = '4spach', 4
+    if len(run) < MIN_MESSAGE_BYTES * per_byte:
+        return None
+    return Finding(start, end - start, name, len(run) // per_byte, False)
+
+
+def _dense_guess(text: str, name: str, matches, per_byte: int):
+    """Classify symbols without a valid frame by their density over the words they span."""
+    spans = [match.span() for match in matches]
+    if len(spans) < MIN_MESSAGE_BYTES * per_byte:
+        return None
+    start, end = spans[0][0], spans[-1][1]
+    words = len(text[start:end].split())
+    if len(spans) < MIN_DENSITY * words:
+        return None
+    return Finding(start, end - start, name, len(spans) // per_byte, False)
+
+
+def scan_text(text: str) -> list:
+    """Return the Findings of a document, ordered by offset."""
+    prints = fingerprint(text)
+    findings = []
+
+    if sum(prints.zero_width.values()) >= MIN_MESSAGE_BYTES * 3:
+        verified = _verified(text, '4spach') + _verified(text, 'ait-steg')
+        findings += verified
+        for start, end in prints.runs:
+            if not any(start <= found.offset < end for found in verified):
+                guess = _zero_width_guess(text, start, end)
+                if guess is not None:
+                    findings.append(guess)
+
+    if sum(prints.emoticons.values()) >= MIN_MESSAGE_BYTES * 2:
+        verified = _verified(text, 'em-st')
+        if not verified:
+            em_st = METHODS['em-st']
+            symbols = [match for match in em_st._SYMBOL_RE.finditer(text)
+                       if match.group() in prints.emoticons]
+            verified = [_dense_guess(text, 'em-st', symbols, 2)]
+        findings += verified
+
+    if sum(prints.formats.values()) >= MIN_MESSAGE_BYTES * 4:
+        verified = _verified(text, 'twsm')
+        if not verified:
+            verified = [_dense_guess(text, 'twsm', METHODS['twsm']._FORMAT_RE.finditer(text), 4)]
+        findings += verified
+
+    return sorted((found for found in findings if found is not None), key=lambda found: found.offset)
+
+
+def scan_file(path: str) -> ScanResult:
+    """Scan one file and record its findings; never raises."""
+    start = time.perf_counter()
+    size = 0
+    try:
+        size = os.path.getsize(path)
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            findings = scan_text(f.read())
+    except Exception as e:
+        return ScanResult(path, [], str(e) or type(e).__name__, size, time.perf_counter() - start)
+    return ScanResult(path, findings, None, size, time.perf_counter() - start)
+
+
+def iter_paths(paths):
+    """Yield the files named by ``paths``, walking directories in sorted order."""
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                yield os.path.join(root, name)
+
+
+def scan_files(paths, workers: int = None, window: int = None):
+    """Scan files and yield a ScanResult for each one, in input order.
+
+    Files are scanned on a pool of ``workers`` processes (default: one per
+    CPU); with ``workers`` of 1 they are scanned in this process. At most
+    ``window`` files (default: four per worker) are in flight, so ``paths``
+    is read lazily.
+    """
+    workers = workers or os.cpu_count() or 1
+    paths = iter(paths)
+
+    if workers == 1:
+        for path in paths:
+            yield scan_file(path)
+        return
+
+    # Imported here: multiprocessing is slow to load and only pools need it
+    from concurrent.futures import ProcessPoolExecutor
+
+    window = window or workers * 4
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+        for path in paths:
+            if len(in_flight) >= window:
+                yield in_flight.popleft().result()
+            in_flight.append(pool.submit(scan_file, path))
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+def result_records(result: ScanResult):
+    """Return the JSONL records of a ScanResult: one per finding, or one for an error."""
+    if result.error is not None:
+        return [{'file': result.file, 'error': result.error}]
+    return [dict(file=result.file, **found._asdict()) for found in result.findings]
+
+
+class ScanSummary:
+    """Running totals of a scan, for the throughput report."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.files = 0
+        self.flagged = 0
+        self.findings = 0
+        self.errors = 0
+        self.bytes = 0
+
+    def add(self, result: ScanResult):
+        self.files += 1
+        self.bytes += result.bytes
+        if result.error is not None:
+            self.errors += 1
+        elif result.findings:
+            self.flagged += 1
+            self.findings += len(result.findings)
+
+    def __str__(self):
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        return (f"Scanned {self.files} files ({self.flagged} flagged, {self.findings} findings, "
+                f"{self.errors} errors) in {elapsed:.2f}s: {self.files / elapsed:.1f} files/s, "
+                f"{self.bytes / elapsed / 1e6:.2f} MB/s")
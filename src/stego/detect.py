@@ -0,0 +1,55 @@
+"""Identifying the method of a stego text, for ``stego decode``.
+
+Every frame header records the id of the method that wrote it (see
+framing). detect_method() reads only the first carrier symbols of each
+built-in method, just enough for the 4-byte header, and names the method
+whose header carries its own id; only that method then decodes the text.
+Texts written before method ids were recorded fall back to the shape of
+the header and, for legacy frames with no header at all, to the carrier
+symbols the text contains.
+"""
+
+from .framing import FRAME_VERSION, MARKER, frame_method
+from .methods import BUILTIN_METHODS, METHODS
+
+# Marker, version and flags
+HEADER_SIZE = 4
+
+# Zero-width characters examined to tell AIT_Steg from 4spach in legacy texts
+_LEGACY_SAMPLE = 256
+
+
+def probe_headers(stego_text: str):
+    """Yield ``(name, header)`` with the first header bytes each built-in method reads."""
+    for spec in BUILTIN_METHODS:
+        yield spec.name, METHODS[spec.name]().header_bytes(stego_text, HEADER_SIZE)
+
+
+def _guess_legacy(stego_text: str):
+    """Name the method of a text without frame headers from the carriers it contains."""
+    run = METHODS['ait-steg']._EXTRACT_RE.search(stego_text)
+    if run is not None:
+        sample = stego_text[run.start():run.start() + _LEGACY_SAMPLE]
+        # AIT_Steg triplets use zero-width characters 4spach does not have
+        return '4spach' if set(sample) <= set(METHODS['4spach']._CHARSET) else 'ait-steg'
+    if METHODS['twsm']._FORMAT_RE.search(stego_text):
+        return 'twsm'
+    if METHODS['em-st']._SYMBOL_RE.search(stego_text):
+        return 'em-st'
+    return None
+
+
+def detect_method(stego_text: str):
+    """Return the name of the method that embedded the text's secret, or None."""
+    ids = {spec.name: spec.method_id for spec in BUILTIN_METHODS}
+    headerless = None
+    for name, header in probe_headers(stego_text):
+        if len(header) < HEADER_SIZE or header[:2] != MARKER:
+            continue
+        version, flags = header[2], header[3]
+        if version == FRAME_VERSION and frame_method(flags) == ids[name]:
+            return name
+        if headerless is None and version == FRAME_VERSION and not frame_method(flags):
+            # Written before method ids were recorded
+            headerless = name
+    return headerless or _guess_legacy(stego_text)
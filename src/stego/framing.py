@@ -0,0 +1,370 @@
+"""Shared frame format used by every method to delimit embedded payloads.
+
+A secret is carried as a message made of one or more frames::
+
+    00 00      marker; a legacy 16-bit length prefix is never zero
+    version    1 byte, FRAME_VERSION
+    flags      1 byte, FLAG_* bits; the high nibble is the method id
+    length     unsigned LEB128 varint, payload length in bytes
+    payload    ``length`` bytes
+    crc32      4 bytes, big-endian CRC-32 of the payload
+
+Secrets larger than ``frame_size`` are split into several frames; every
+frame but the last sets FLAG_MORE. Each frame carries its own length and
+checksum, so frames can be produced, verified and decoded independently.
+
+A frame may carry its payload compressed with zlib, bz2 or lzma; the codec
+is recorded in two flag bits (FLAG_CODEC_MASK). Compression is decided per
+frame and skipped when it does not make the payload smaller.
+
+The marker, version and flags make a 4-byte self-describing header: the
+method id (FLAG_METHOD_MASK) names the method that embedded the frame, so
+``stego decode`` can tell methods apart from the header alone. Frames
+written before method ids were recorded carry 0 there.
+
+Legacy payloads (a bare 16-bit big-endian length followed by the data)
+are still accepted by the reader.
+"""
+
+import importlib
+import io
+import zlib
+from collections import namedtuple
+from functools import partial
+
+MARKER = b'\x00\x00'
+FRAME_VERSION = 2
+LEGACY_VERSION = 0
+
+# Frame flags
+FLAG_MORE = 0x01  # Another frame of the same message follows
+FLAG_AEAD = 0x02  # Payload is an authenticated ciphertext (AIT_Steg)
+FLAG_CODEC_MASK = 0x0C  # Compression codec of the payload, see CODECS
+_CODEC_SHIFT = 2
+FLAG_METHOD_MASK = 0xF0  # Id of the method that embedded the frame, 0 if not recorded
+_METHOD_SHIFT = 4
+
+# Compression codecs by name and their id in the flag bits (0: uncompressed)
+CODECS = {'zlib': 1, 'bz2': 2, 'lzma': 3}
+_CODEC_MODULES = {codec_id: name for name, codec_id in CODECS.items()}
+
+# Largest payload a compressed frame may expand to
+MAX_INFLATED_SIZE = 64 * 1024 * 1024
+
+# Default payload bytes per frame
+FRAME_SIZE = 64 * 1024
+
+# Largest payload a legacy 16-bit length prefix can describe
+LEGACY_MAX_LENGTH = 0xFFFF
+
+# Largest single read issued to the underlying source
+_READ_STEP = 1024 * 1024
+
+Frame = namedtuple('Frame', ['start', 'end', 'version', 'flags', 'payload'])
+Frame.__doc__ = """A decoded frame; ``start``/``end`` are byte offsets in the source."""
+
+
+class FrameError(ValueError):
+    """Raised when a frame is malformed or fails its checksum."""
+
+
+def encode_varint(value: int) -> bytes:
+    """Encode a non-negative integer as an unsigned LEB128 varint."""
+    if value < 0:
+        raise ValueError("varint values must not be negative")
+
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def decode_varint(data: bytes, pos: int = 0):
+    """Decode a varint from ``data`` at ``pos``; returns ``(value, next_pos)``."""
+    reader = FrameReader(data[pos:])
+    value = reader.read_varint()
+    if value is None:
+        raise FrameError("Truncated varint")
+    return value, pos + reader.pos
+
+
+def frame_header(flags: int = 0) -> bytes:
+    """Return the fixed part of a frame header (marker, version, flags)."""
+    return MARKER + bytes([FRAME_VERSION, flags])
+
+
+def method_flags(method_id: int) -> int:
+    """Return the flag bits recording a method id (1-15; 0 records none)."""
+    if not 0 <= method_id <= FLAG_METHOD_MASK >> _METHOD_SHIFT:
+        raise ValueError(f"Method ids range from 0 to {FLAG_METHOD_MASK >> _METHOD_SHIFT}, got {method_id}")
+    return method_id << _METHOD_SHIFT
+
+
+def frame_method(flags: int) -> int:
+    """Return the method id recorded in a frame's flags (0 if none)."""
+    return (flags & FLAG_METHOD_MASK) >> _METHOD_SHIFT
+
+
+def check_compression(compression: str = None):
+    """Raise ValueError unless ``compression`` is None or a known codec name."""
+    if compression is not None and compression not in CODECS:
+        raise ValueError(f"Unknown compression: {compression} (choose from {', '.join(CODECS)})")
+
+
+def compress_payload(data: bytes, compression: str = None):
+    """Compress data for a frame; returns ``(payload, codec_flags)``.
+
+    The data is kept as is (with no codec flags) when compression is off or
+    does not make it smaller.
+    """
+    if compression is None or not data:
+        return data, 0
+    check_compression(compression)
+
+    compressed = importlib.import_module(compression).compress(data)
+    if len(compressed) >= len(data):
+        return data, 0
+    return compressed, CODECS[compression] << _CODEC_SHIFT
+
+
+def decompress_payload(payload: bytes, flags: int) -> bytes:
+    """Undo compress_payload() according to a frame's flags."""
+    codec_id = (flags & FLAG_CODEC_MASK) >> _CODEC_SHIFT
+    if not codec_id:
+        return payload
+
+    module = importlib.import_module(_CODEC_MODULES[codec_id])
+    if codec_id == CODECS['zlib']:
+        decompressor = module.decompressobj()
+    elif codec_id == CODECS['bz2']:
+        decompressor = module.BZ2Decompressor()
+    else:
+        decompressor = module.LZMADecompressor()
+
+    # Bound the output so a crafted frame cannot expand without limit
+    try:
+        data = decompressor.decompress(payload, MAX_INFLATED_SIZE)
+    except Exception as e:
+        raise FrameError(f"Corrupt compressed payload: {e}")
+    if not decompressor.eof:
+        if len(data) >= MAX_INFLATED_SIZE:
+            raise FrameError("Compressed payload expands beyond MAX_INFLATED_SIZE")
+        raise FrameError("Truncated compressed payload")
+    return data
+
+
+def frame_data(frames) -> bytes:
+    """Return the data carried by the frames of a message, decompressed."""
+    return b''.join(decompress_payload(frame.payload, frame.flags) for frame in frames)
+
+
+def build_frame(payload: bytes, flags: int = 0) -> bytes:
+    """Wrap a single payload in a frame."""
+    crc = zlib.crc32(payload).to_bytes(4, byteorder='big')
+    return frame_header(flags) + encode_varint(len(payload)) + payload + crc
+
+
+def framed_size(length: int, frame_size: int = FRAME_SIZE, extra: int = 0) -> int:
+    """Return the size of a message carrying ``length`` bytes, without building it.
+
+    ``extra`` bytes are added to every frame payload (e.g. a nonce and tag).
+    """
+    if length <= 0:
+        return 0
+
+    def frame_bytes(chunk: int) -> int:
+        payload = chunk + extra
+        return len(frame_header()) + len(encode_varint(payload)) + payload + 4
+
+    full, rest = divmod(length, frame_size)
+    return full * frame_bytes(frame_size) + (frame_bytes(rest) if rest else 0)
+
+
+def payload_capacity(budget: int, frame_size: int = FRAME_SIZE, extra: int = 0) -> int:
+    """Return the largest payload whose message fits in ``budget`` bytes."""
+    low, high = 0, max(budget, 0)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if framed_size(middle, frame_size, extra) <= budget:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def iter_chunks(data: bytes, frame_size: int = FRAME_SIZE):
+    """Yield ``(chunk, is_last)`` pairs splitting data into frame-sized pieces."""
+    if frame_size <= 0:
+        raise ValueError("frame_size must be positive")
+
+    view = memoryview(data)
+    for start in range(0, len(view), frame_size):
+        end = start + frame_size
+        yield bytes(view[start:end]), end >= len(view)
+
+
+def data_frame(chunk: bytes, is_last: bool, flags: int = 0, compression: str = None) -> bytes:
+    """Build one frame of a message, compressing its chunk if that pays off."""
+    payload, codec_flags = compress_payload(chunk, compression)
+    flags |= codec_flags
+    return build_frame(payload, flags if is_last else flags | FLAG_MORE)
+
+
+def iter_frames(data: bytes, frame_size: int = FRAME_SIZE, flags: int = 0, compression: str = None):
+    """Yield the frames of a message carrying ``data``, one frame at a time."""
+    for chunk, is_last in iter_chunks(data, frame_size):
+        yield data_frame(chunk, is_last, flags, compression)
+
+
+def frame_message(data: bytes, frame_size: int = FRAME_SIZE, flags: int = 0,
+                  compression: str = None) -> bytes:
+    """Return the framed bytes of a message carrying ``data``."""
+    return b''.join(iter_frames(data, frame_size, flags, compression))
+
+
+def legacy_frame(data: bytes) -> bytes:
+    """Wrap data with the legacy 16-bit length prefix."""
+    if not 0 < len(data) <= LEGACY_MAX_LENGTH:
+        raise ValueError(f"Legacy frames hold 1 to {LEGACY_MAX_LENGTH} bytes, got {len(data)}")
+    return len(data).to_bytes(2, byteorder='big') + data
+
+
+class FrameReader:
+    """Read frames sequentially from bytes, a binary file or a byte iterator.
+
+    ``source`` may be a bytes-like object, any object with a ``read(n)``
+    method returning bytes, or an iterable of byte values (read lazily).
+    ``pos`` counts the bytes consumed so far.
+    """
+
+    def __init__(self, source):
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            self._read = io.BytesIO(source).read
+        elif hasattr(source, 'read'):
+            self._read = source.read
+        else:
+            self._read = partial(_take, iter(source))
+        self.pos = 0
+
+    def read(self, size: int) -> bytes:
+        """Read up to ``size`` bytes; fewer means the source is exhausted."""
+        # Read in bounded steps so a corrupt length cannot force a huge allocation
+        parts = []
+        remaining = size
+        while remaining > 0:
+            part = self._read(min(remaining, _READ_STEP))
+            if not part:
+                break
+            parts.append(part)
+            remaining -= len(part)
+
+        data = parts[0] if len(parts) == 1 else b''.join(parts)
+        self.pos += len(data)
+        return data
+
+    def read_varint(self):
+        """Read a varint, or return None if the source ends inside it."""
+        value = 0
+        shift = 0
+        while True:
+            byte = self.read(1)
+            if not byte:
+                return None
+            value |= (byte[0] & 0x7F) << shift
+            if not byte[0] & 0x80:
+                return value
+            shift += 7
+            if shift > 63:
+                raise FrameError("Varint too long")
+
+    def next_frame(self):
+        """Read the next frame, or return None when no complete frame follows.
+
+        Raises FrameError when a complete frame fails its checksum.
+        """
+        start = self.pos
+        head = self.read(2)
+        if len(head) < 2:
+            return None
+
+        if head != MARKER:
+            # Legacy frame: bare 16-bit length and data
+            payload = self.read(int.from_bytes(head, byteorder='big'))
+            if len(payload) < int.from_bytes(head, byteorder='big'):
+                return None
+            return Frame(start, self.pos, LEGACY_VERSION, 0, payload)
+
+        header = self.read(2)
+        if len(header) < 2:
+            return None
+        version, flags = header
+        if version != FRAME_VERSION:
+            return None
+
+        length = self.read_varint()
+        if length is None:
+            return None
+        payload = self.read(length)
+        crc = self.read(4)
+        if len(payload) < length or len(crc) < 4:
+            return None
+        if zlib.crc32(payload) != int.from_bytes(crc, byteorder='big'):
+            raise FrameError(f"Frame at byte {start} failed its checksum")
+
+        return Frame(start, self.pos, version, flags, payload)
+
+    def next_message(self):
+        """Read the frames of the next message, or return None if it is incomplete."""
+        frames = []
+        while True:
+            frame = self.next_frame()
+            if frame is None:
+                return None
+            frames.append(frame)
+            if frame.version != FRAME_VERSION or not frame.flags & FLAG_MORE:
+                return frames
+
+    def __iter__(self):
+        """Iterate over complete frames until the source is exhausted."""
+        while True:
+            frame = self.next_frame()
+            if frame is None:
+                return
+            yield frame
+
+
+def _take(iterator, size: int) -> bytes:
+    """Take up to ``size`` byte values from an iterator."""
+    out = bytearray()
+    for value in iterator:
+        out.append(value)
+        if len(out) == size:
+            break
+    return bytes(out)
+
+
+def read_message(source) -> bytes:
+    """Return the payload of the first complete message in ``source``.
+
+    Returns b'' when there is no complete message; raises FrameError when a
+    frame fails its checksum.
+    """
+    frames = FrameReader(source).next_message()
+    if frames is None:
+        return b''
+    return frame_data(frames)
+
+
+def iter_messages(source):
+    """Yield the frame lists of every complete message in ``source``, in order."""
+    reader = FrameReader(source)
+    while True:
+        frames = reader.next_message()
+        if frames is None:
+            return
+        yield frames
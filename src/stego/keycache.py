@@ -0,0 +1,90 @@
+"""Process-wide cache for PBKDF2 derived keys.
+
+Key stretching is deliberately slow, and AIT_Steg repeats it on every
+encode and decode. Batches that reuse the same user key and salt can
+share one derivation through this cache.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+class DerivedKeyCache:
+    """Thread-safe LRU cache of PBKDF2-HMAC results.
+
+    Entries are keyed on (algorithm, key material, salt, iterations). The
+    key material is stored only as a SHA-256 digest, so the cache never
+    holds a user key in plain form. Call ``clear()`` to drop every derived
+    key, e.g. before handing the process over to less trusted work.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        if maxsize < 0:
+            raise ValueError("maxsize must not be negative")
+        self._maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def maxsize(self) -> int:
+        """Maximum number of derived keys kept; 0 disables caching."""
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, value: int):
+        if value < 0:
+            raise ValueError("maxsize must not be negative")
+        with self._lock:
+            self._maxsize = value
+            self._evict()
+
+    def _evict(self):
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def derive(self, algorithm: str, key_material: bytes, salt: bytes, iterations: int) -> bytes:
+        """Return ``hashlib.pbkdf2_hmac(algorithm, key_material, salt, iterations)``, cached."""
+        entry = (algorithm, hashlib.sha256(key_material).digest(), bytes(salt), iterations)
+
+        with self._lock:
+            derived = self._entries.get(entry)
+            if derived is not None:
+                self._entries.move_to_end(entry)
+                self.hits += 1
+                return derived
+            self.misses += 1
+
+        # Derive outside the lock so other threads are not held up
+        derived = hashlib.pbkdf2_hmac(algorithm, key_material, salt, iterations)
+
+        with self._lock:
+            if self._maxsize:
+                self._entries[entry] = derived
+                self._entries.move_to_end(entry)
+                self._evict()
+
+        return derived
+
+    def clear(self):
+        """Drop every cached key and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> CacheInfo:
+        """Return hit/miss counters and the current size."""
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self._maxsize, len(self._entries))
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Shared by every AITStegMethod instance in the process
+DERIVED_KEY_CACHE = DerivedKeyCache()
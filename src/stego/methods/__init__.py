@@ -1 +1,129 @@
-"""Steganography method implementations."""
+"""Steganography method implementations.
+
+Methods are listed in a registry and their modules are imported only when
+a method is first used, so a 4spach decode never loads the cryptography
+package. Third-party methods register under the ``stego.methods`` entry
+point group, e.g. in setup.py::
+
+    entry_points={"stego.methods": ["my-method = my_package.module:MyMethod"]}
+
+Entry points are only scanned when a name is not built in or when every
+method is listed.
+"""
+
+from collections import namedtuple
+from collections.abc import Mapping
+from importlib import import_module
+
+ENTRY_POINT_GROUP = 'stego.methods'
+
+# What the CLI needs to know about a method without importing it: the
+# module and class implementing it, whether it takes a --key (and keyring
+# decoding), the ciphers it offers and the id its frame headers carry
+MethodSpec = namedtuple('MethodSpec', ['name', 'module', 'attr', 'help', 'key', 'keyring', 'ciphers',
+                                       'method_id'], defaults=(0,))
+
+BUILTIN_METHODS = (
+    MethodSpec('4spach', 'stego.methods.fourspach', 'FourSpachMethod',
+               'Four invisible Unicode characters', False, False, (), 1),
+    MethodSpec('ait-steg', 'stego.methods.ait_steg', 'AITStegMethod',
+               'Zero-width Unicode with dynamic keys', True, True, ('aes-gcm', 'xor'), 2),
+    MethodSpec('twsm', 'stego.methods.twsm', 'TWSMMethod',
+               'Text formatting steganography', False, False, (), 3),
+    MethodSpec('em-st', 'stego.methods.em_st', 'EmStMethod',
+               'Emoticon-based encoding', False, False, (), 4),
+)
+
+
+def _entry_point_specs():
+    """Yield a MethodSpec for every method registered under ENTRY_POINT_GROUP."""
+    from importlib.metadata import entry_points
+
+    found = entry_points()
+    if hasattr(found, 'select'):
+        found = found.select(group=ENTRY_POINT_GROUP)
+    else:
+        # Python < 3.10 returns a dict of groups
+        found = found.get(ENTRY_POINT_GROUP, ())
+
+    for entry_point in found:
+        module, _, attr = entry_point.value.partition(':')
+        yield MethodSpec(entry_point.name, module.strip(), attr.strip(), entry_point.value,
+                         False, False, ())
+
+
+class MethodRegistry(Mapping):
+    """Method classes by CLI name, imported on first access."""
+
+    def __init__(self, specs=()):
+        self._specs = {spec.name: spec for spec in specs}
+        self._classes = {}
+        self._plugins_loaded = False
+
+    def register(self, spec: MethodSpec):
+        """Add a method; a built-in name cannot be replaced."""
+        if spec.name in self._specs:
+            raise ValueError(f"Method already registered: {spec.name}")
+        self._specs[spec.name] = spec
+
+    def load_plugins(self):
+        """Register the methods from entry points, once; names already taken are skipped."""
+        if self._plugins_loaded:
+            return
+        self._plugins_loaded = True
+        for spec in _entry_point_specs():
+            self._specs.setdefault(spec.name, spec)
+
+    def spec(self, name: str) -> MethodSpec:
+        """Return the MethodSpec for ``name``; raises KeyError if there is none."""
+        if name not in self._specs:
+            self.load_plugins()
+        return self._specs[name]
+
+    def specs(self, plugins: bool = True):
+        """Return every MethodSpec, built-in ones first."""
+        if plugins:
+            self.load_plugins()
+        return list(self._specs.values())
+
+    def __getitem__(self, name: str):
+        method_class = self._classes.get(name)
+        if method_class is None:
+            spec = self.spec(name)
+            method_class = self._classes[name] = getattr(import_module(spec.module), spec.attr)
+        return method_class
+
+    def __contains__(self, name) -> bool:
+        try:
+            self.spec(name)
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        self.load_plugins()
+        return iter(list(self._specs))
+
+    def __len__(self) -> int:
+        self.load_plugins()
+        return len(self._specs)
+
+
+# Method classes by CLI name
+METHODS = MethodRegistry(BUILTIN_METHODS)
+
+__all__ = ['METHODS', 'BUILTIN_METHODS', 'MethodSpec', 'MethodRegistry',
+           'FourSpachMethod', 'AITStegMethod', 'TWSMMethod', 'EmStMethod']
+
+_CLASS_NAMES = {spec.attr: spec.name for spec in BUILTIN_METHODS}
+
+
+def __getattr__(name):
+    # Method classes are imported when first accessed
+    if name in _CLASS_NAMES:
+        return METHODS[_CLASS_NAMES[name]]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_CLASS_NAMES))
@@ -1,8 +1,44 @@
 """AIT_Steg method - Zero-width Unicode characters with dynamic key encryption."""
 
 import hashlib
+import os
+import re
 import time
-from .base import StegoMethod
+from collections import namedtuple
+from itertools import chain
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from .base import Estimate, StegoMethod
+from ..framing import (FLAG_AEAD, FLAG_MORE, FRAME_SIZE, FRAME_VERSION, LEGACY_MAX_LENGTH,
+                       LEGACY_VERSION, FrameError, FrameReader, build_frame, compress_payload,
+                       decompress_payload, frame_header, framed_size, iter_chunks, legacy_frame)
+from ..keycache import DERIVED_KEY_CACHE
+from ..scanning import scan_carriers
+from ..streaming import ChunkReader, iter_secret_chunks, iter_source
+from ..tail import iter_file_blocks, read_head, read_trailing_bytes, trailing_run
+from ..utf8 import ZeroWidthCodec, copy_file, encode_table, map_file
+
+# Result of a keyring decode: the secret plus the candidate that opened it.
+# ``key`` is the matching user key, or None when a dynamic key matched, in
+# which case ``hour`` is the hour bucket it was generated for.
+KeyringMatch = namedtuple('KeyringMatch', ['secret', 'key', 'hour'])
+
+# Keeps the bottom two bits of a decoded triplet value
+_LOW_BITS = bytes(value & 0x03 for value in range(256))
+
+# Share of control or non-ASCII characters above which a legacy XOR
+# message is taken to be decrypted with the wrong key
+_UNPRINTABLE_LIMIT = 0.3
+
+
+def _plausible_text(text: str) -> bool:
+    """True if text looks like a secret rather than the output of a wrong XOR key.
+
+    Legacy messages carry no tag, so this is the only check they get.
+    """
+    unprintable = sum(1 for c in text if ord(c) > 127 or ord(c) < 32)
+    return unprintable <= len(text) * _UNPRINTABLE_LIMIT
 
 
 class AITStegMethod(StegoMethod):
@@ -20,12 +56,89 @@ class AITStegMethod(StegoMethod):
         '\uFEFF',  # Zero Width No-Break Space
     ]
 
+    # Frame header id, see StegoMethod.METHOD_ID; legacy xor frames have no header
+    METHOD_ID = 2
+
+    # Ciphers available for encoding; 'xor' writes the legacy format
+    CIPHERS = ('aes-gcm', 'xor')
+
+    # AES-GCM frames set FLAG_AEAD; each frame is sealed on its own with the
+    # frame header and its index in the message as associated data
+    _NONCE_SIZE = 12
+
+    # PBKDF2 parameters; derived keys are shared through a process-wide cache
+    KDF_ALGORITHM = 'sha256'
+    KDF_ITERATIONS = 1000
+    key_cache = DERIVED_KEY_CACHE
+
+    # Cost model for estimate(), see StegoMethod.ENCODE_COST; key derivation
+    # is included in the fixed cost only when the derived key is not cached
+    ENCODE_COST = (2.3e-5, 3.0e-10, 1.1e-7)
+
+    def __init__(self, cipher: str = 'aes-gcm', compression: str = None, profiler=None):
+        if cipher not in self.CIPHERS:
+            raise ValueError(f"Unknown cipher: {cipher} (choose from {', '.join(self.CIPHERS)})")
+        if cipher == 'xor' and compression:
+            raise ValueError("Compression is not available with the legacy xor cipher")
+        super().__init__(compression, profiler)
+        self.cipher = cipher
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._build_tables()
+
+    @classmethod
+    def _build_tables(cls):
+        """Precompute the byte <-> zero-width tables for ZERO_WIDTH_CHARS."""
+        chars = cls.ZERO_WIDTH_CHARS
+
+        # Each byte becomes a triplet: top 3 bits, middle 3 bits, bottom 2 bits
+        cls._ENCODE_TABLE = tuple(
+            chars[byte >> 5] + chars[(byte >> 2) & 0x07] + chars[byte & 0x03]
+            for byte in range(256)
+        )
+
+        # Reverse table: zero-width character -> 3-bit value as a single code point
+        cls._DECODE_TABLE = str.maketrans({char: chr(idx) for idx, char in enumerate(chars)})
+        cls._EXTRACT_RE = re.compile('[' + ''.join(map(re.escape, chars)) + ']+')
+        cls._CHARSET = ''.join(chars)
+
+        # The same tables on raw UTF-8 bytes (see utf8); a subclass whose
+        # characters are not three-byte sequences keeps to the str paths
+        cls._UTF8_TABLE = encode_table(cls._ENCODE_TABLE)
+        try:
+            cls._UTF8 = ZeroWidthCodec(chars, bytes(range(len(chars))))
+        except ValueError:
+            cls._UTF8 = None
+
     def _generate_dynamic_key(self, cover_text: str) -> str:
         """Generate a dynamic key from cover text content."""
+        with self.profiler.stage('cover hashing', len(cover_text)):
+            content_hash = hashlib.sha256(cover_text.encode('utf-8')).hexdigest()
+        return self._dynamic_key(content_hash)
+
+    def _current_hour(self) -> int:
+        """Return the hour bucket used by dynamic keys."""
+        return int(time.time()) // 3600
+
+    def _dynamic_key(self, content_hash: str, hour: int = None) -> str:
+        """Build the dynamic key from a hex digest of the cover text."""
+        if hour is None:
+            hour = self._current_hour()
         # Use content hash + timestamp for dynamic key
-        content_hash = hashlib.sha256(cover_text.encode('utf-8')).hexdigest()[:16]
-        time_component = str(int(time.time()) // 3600)  # Hour-based component
-        return content_hash + time_component
+        time_component = str(hour)  # Hour-based component
+        return content_hash[:16] + time_component
+
+    def _derive_key(self, base_key: str, salt: bytes) -> bytes:
+        """Stretch a base key with PBKDF2 using the cover text prefix as salt."""
+        key_material = base_key.encode('utf-8')
+        with self.profiler.stage('key derivation'):
+            if self.key_cache is None:
+                derived = hashlib.pbkdf2_hmac(self.KDF_ALGORITHM, key_material, salt[:16], self.KDF_ITERATIONS)
+            else:
+                derived = self.key_cache.derive(self.KDF_ALGORITHM, key_material, salt[:16],
+                                                self.KDF_ITERATIONS)
+        return derived[:16]
 
     def _derive_key_from_content(self, cover_text: str, user_key: str = None) -> bytes:
         """Derive encryption key from content and user key."""
@@ -35,122 +148,700 @@ class AITStegMethod(StegoMethod):
             base_key = self._generate_dynamic_key(cover_text)
 
         # Use PBKDF2-like key derivation
-        return hashlib.pbkdf2_hmac('sha256',
-                                   base_key.encode('utf-8'),
-                                   cover_text.encode('utf-8')[:16],
-                                   1000)[:16]
+        # Sixteen characters always encode to at least sixteen bytes
+        return self._derive_key(base_key, cover_text[:16].encode('utf-8'))
+
+    def _cover_prefix(self, stego_text: str, length: int = 16) -> str:
+        """Return the first ``length`` characters of the text without zero-width characters."""
+        size = length
+        while True:
+            prefix = self._EXTRACT_RE.sub('', stego_text[:size])
+            if len(prefix) >= length or size >= len(stego_text):
+                return prefix[:length]
+            size *= 4
+
+    def _derive_key_from_file(self, path: str, cover_end: int, user_key: str = None) -> bytes:
+        """Derive encryption key from the first ``cover_end`` bytes of a file."""
+        if user_key:
+            base_key = user_key
+        else:
+            content_hash = hashlib.sha256()
+            for block in iter_file_blocks(path, cover_end):
+                content_hash.update(block)
+            base_key = self._dynamic_key(content_hash.hexdigest())
 
-    def _encrypt_data(self, data: bytes, key: bytes) -> bytes:
-        """Simple XOR encryption with key expansion."""
-        encrypted = bytearray()
-        key_len = len(key)
+        return self._derive_key(base_key, read_head(path, min(16, cover_end)))
 
-        for i, byte in enumerate(data):
-            encrypted.append(byte ^ key[i % key_len])
+    def _encrypt_data(self, data: bytes, key: bytes) -> bytes:
+        """Simple XOR encryption with key expansion (legacy cipher)."""
+        if not data:
+            return b''
 
-        return bytes(encrypted)
+        # XOR the whole buffer at once against the repeated key
+        keystream = (key * (len(data) // len(key) + 1))[:len(data)]
+        encrypted = int.from_bytes(data, byteorder='big') ^ int.from_bytes(keystream, byteorder='big')
+        return encrypted.to_bytes(len(data), byteorder='big')
+
+    def _seal(self, data: bytes, key: bytes, associated_data: bytes, nonce: bytes = None) -> bytes:
+        """Encrypt and authenticate data with AES-GCM under a fresh nonce (or the one given)."""
+        with self.profiler.stage('encryption', len(data)):
+            nonce = nonce or os.urandom(self._NONCE_SIZE)
+            return nonce + AESGCM(key).encrypt(nonce, data, associated_data)
+
+    def _open(self, body: bytes, key: bytes, associated_data: bytes) -> bytes:
+        """Verify and decrypt an AES-GCM body; raises InvalidTag on failure."""
+        with self.profiler.stage('decryption', len(body)):
+            nonce = body[:self._NONCE_SIZE]
+            return AESGCM(key).decrypt(nonce, body[self._NONCE_SIZE:], associated_data)
+
+    def _frame_aad(self, flags: int, index: int) -> bytes:
+        """Associated data for a sealed frame: its header and position."""
+        return frame_header(flags) + index.to_bytes(4, byteorder='big')
+
+    def _build_frames(self, secret_bytes: bytes, enc_key: bytes, frame_size: int = FRAME_SIZE) -> bytes:
+        """Encrypt the secret and frame it for the selected cipher."""
+        if self.cipher == 'xor':
+            with self.profiler.stage('encryption', len(secret_bytes)):
+                return legacy_frame(self._encrypt_data(secret_bytes, enc_key))
+
+        return b''.join(self._seal_frame(chunk, enc_key, index, is_last)
+                        for index, (chunk, is_last) in enumerate(iter_chunks(secret_bytes, frame_size)))
+
+    def _seal_frame(self, chunk: bytes, enc_key: bytes, index: int, is_last: bool,
+                    nonce: bytes = None) -> bytes:
+        """Seal one chunk of the secret as frame ``index`` of an AEAD message.
+
+        Chunks are compressed before encryption; the codec flags are part of
+        the authenticated header.
+        """
+        with self.profiler.stage('compression', len(chunk)):
+            chunk, codec_flags = compress_payload(chunk, self.compression)
+        flags = FLAG_AEAD | self.frame_flags | codec_flags
+        if not is_last:
+            flags |= FLAG_MORE
+        return build_frame(self._seal(chunk, enc_key, self._frame_aad(flags, index), nonce), flags)
+
+    def _is_authenticated(self, frames) -> bool:
+        """Return True if the message carries authenticated ciphertext."""
+        return bool(frames[0].flags & FLAG_AEAD)
+
+    def _open_message(self, frames, enc_key: bytes) -> bytes:
+        """Decrypt every frame of a message; raises InvalidTag on a bad key."""
+        first = frames[0]
+        if first.version == LEGACY_VERSION or not self._is_authenticated(frames):
+            payload = b''.join(frame.payload for frame in frames)
+            with self.profiler.stage('decryption', len(payload)):
+                return self._encrypt_data(payload, enc_key)
+
+        return b''.join(self._open_frame_data(frame, enc_key, index) for index, frame in enumerate(frames))
+
+    def _open_frame_data(self, frame, enc_key: bytes, index: int) -> bytes:
+        """Decrypt frame ``index`` of an AEAD message and decompress its chunk."""
+        chunk = self._open(frame.payload, enc_key, self._frame_aad(frame.flags, index))
+        with self.profiler.stage('decompression', len(chunk)):
+            return decompress_payload(chunk, frame.flags)
 
     def _data_to_zero_width(self, data: bytes) -> str:
-        """Convert data to zero-width characters."""
-        result = ''
-        for byte in data:
-            # Use 3 characters per byte (8 bits = 3 chars with 8 possibilities each)
-            char1 = self.ZERO_WIDTH_CHARS[byte >> 5]  # Top 3 bits
-            char2 = self.ZERO_WIDTH_CHARS[(byte >> 2) & 0x07]  # Middle 3 bits
-            char3 = self.ZERO_WIDTH_CHARS[byte & 0x03]  # Bottom 2 bits (pad to 3 bits)
-            result += char1 + char2 + char3
-
-        return result
+        """Convert data to zero-width characters, three per byte."""
+        with self.profiler.stage('symbol mapping', len(data)):
+            return ''.join(map(self._ENCODE_TABLE.__getitem__, data))
+
+    def _data_to_utf8(self, data: bytes) -> bytes:
+        """Convert data to the UTF-8 encoding of its zero-width characters."""
+        with self.profiler.stage('symbol mapping', len(data)):
+            return b''.join(map(self._UTF8_TABLE.__getitem__, data))
+
+    def header_bytes(self, stego_text: str, size: int = 4) -> bytes:
+        """Return the bytes carried by the first zero-width characters of the text."""
+        needed = size * 3
+        chars = ''
+        for run in self._EXTRACT_RE.finditer(stego_text):
+            chars += stego_text[run.start():min(run.end(), run.start() + needed - len(chars))]
+            if len(chars) >= needed:
+                break
+        return self._triplets_to_data(chars[:len(chars) - len(chars) % 3])
 
     def _zero_width_to_data(self, zw_text: str) -> bytes:
         """Convert zero-width characters back to data."""
         # Extract zero-width characters
-        zw_chars = [c for c in zw_text if c in self.ZERO_WIDTH_CHARS]
+        with self.profiler.stage('extraction', len(zw_text)):
+            zw_chars = ''.join(self._EXTRACT_RE.findall(zw_text))
 
         if len(zw_chars) % 3 != 0:
             return b''
-
-        data = bytearray()
-        char_to_idx = {char: idx for idx, char in enumerate(self.ZERO_WIDTH_CHARS)}
-
-        for i in range(0, len(zw_chars), 3):
-            try:
-                idx1 = char_to_idx[zw_chars[i]]
-                idx2 = char_to_idx[zw_chars[i + 1]]
-                idx3 = char_to_idx[zw_chars[i + 2]]
-
-                # Reconstruct byte
-                byte_val = (idx1 << 5) | (idx2 << 2) | (idx3 & 0x03)
-                data.append(byte_val)
-            except (KeyError, IndexError):
-                return b''
-
-        return bytes(data)
-
-    def encode(self, cover_text: str, secret_data: str, key: str = None) -> str:
-        """Encode secret data using AIT_Steg method."""
-        if not secret_data:
+        return self._triplets_to_data(zw_chars)
+
+    def _triplets_to_data(self, zw_chars: str) -> bytes:
+        """Convert whole triplets of zero-width characters to bytes."""
+        # One 3-bit value per byte, then split into the three triplet positions
+        return self._values_to_data(zw_chars.translate(self._DECODE_TABLE).encode('latin-1'))
+
+    def _values_to_data(self, values: bytes) -> bytes:
+        """Convert whole triplets of 3-bit values (one per byte) to bytes."""
+        with self.profiler.stage('bit unpacking', len(values)):
+            high = int.from_bytes(values[0::3], byteorder='big')
+            middle = int.from_bytes(values[1::3], byteorder='big')
+            low = int.from_bytes(values[2::3].translate(_LOW_BITS), byteorder='big')
+
+            # Reconstruct every byte at once: the fields never carry into each other
+            return (high * 32 + middle * 4 + low).to_bytes(len(values) // 3, byteorder='big')
+
+    def encode_bytes(self, cover_text: str, secret: bytes, key: str = None) -> str:
+        """Encode a binary secret using AIT_Steg method."""
+        if not secret:
             return cover_text
 
-        # Convert secret to bytes
-        secret_bytes = secret_data.encode('utf-8')
-
         # Derive encryption key
         enc_key = self._derive_key_from_content(cover_text, key)
 
-        # Encrypt the data
-        encrypted_data = self._encrypt_data(secret_bytes, enc_key)
-
-        # Add length prefix
-        data_length = len(encrypted_data)
-        length_bytes = data_length.to_bytes(2, byteorder='big')
-
-        # Convert to zero-width characters
-        payload = length_bytes + encrypted_data
-        zw_chars = self._data_to_zero_width(payload)
+        # Encrypt the data and frame it
+        zw_chars = self._data_to_zero_width(self._build_frames(secret, enc_key))
 
         # Insert zero-width characters throughout the text
-        result = cover_text + zw_chars
+        with self.profiler.stage('insertion', len(cover_text)):
+            return cover_text + zw_chars
 
-        return result
+    def encode(self, cover_text: str, secret_data: str, key: str = None) -> str:
+        """Encode secret data using AIT_Steg method."""
+        return self.encode_bytes(cover_text, secret_data.encode('utf-8'), key)
 
-    def decode(self, stego_text: str, key: str = None) -> str:
-        """Decode secret data from AIT_Steg method."""
+    def estimate(self, cover_text: str, payload_len: int) -> Estimate:
+        """Estimate the cost of appending ``payload_len`` bytes without encoding.
+
+        Capacity is unbounded for AES-GCM; the legacy xor frame holds at most
+        65535 bytes.
+        """
+        if self.cipher == 'xor':
+            framed = 2 + payload_len if payload_len else 0
+            capacity = LEGACY_MAX_LENGTH
+        else:
+            # Every frame carries a nonce and an authentication tag
+            framed = framed_size(payload_len, extra=self._NONCE_SIZE + 16)
+            capacity = None
+
+        chars = 3 * framed
+        return Estimate(method=type(self).__name__, payload_len=payload_len, framed_len=framed,
+                        capacity=capacity, carriers=chars, carrier_unit='chars', overflow=0,
+                        output_size=len(cover_text) + chars, overhead_chars=chars,
+                        encode_seconds=self._predict_seconds(len(cover_text), framed))
+
+    def _first_message(self, stego_text: str, key: str = None):
+        """Return the frames of the first message in the text, or None."""
         # Extract data from zero-width characters
-        payload = self._zero_width_to_data(stego_text)
+        return self._read_first(self._zero_width_to_data(stego_text), key)
 
-        if len(payload) < 2:
-            return ''
+    def _read_first(self, payload: bytes, key: str = None):
+        """Return the frames of the first message in extracted data, or None."""
+        try:
+            with self.profiler.stage('deframing', len(payload)):
+                return FrameReader(payload).next_message()
+        except FrameError:
+            if not key:
+                raise ValueError("Decoding failed - corrupted data")
+            return None
+
+    def _text_key(self, stego_text: str, key: str = None) -> bytes:
+        """Derive the decryption key for a whole stego text."""
+        if key:
+            # Only the salt is needed, so strip just enough of the text
+            return self._derive_key_from_content(self._cover_prefix(stego_text), key)
+
+        # Derive key (extract cover text by removing zero-width chars)
+        with self.profiler.stage('extraction', len(stego_text)):
+            cover_text = self._EXTRACT_RE.sub('', stego_text)
+        return self._derive_key_from_content(cover_text, None)
+
+    def _keyring_match(self, stego_text: str, key: str, keyring, hours: int, binary: bool = False):
+        """Decode with the key, the keyring and past hour buckets; raises if none match."""
+        candidates = ([key] if key else []) + list(keyring or [])
+        match = self.decode_keyring(stego_text, candidates, hours, binary=binary)
+        if match is None:
+            raise ValueError("Decoding failed - no candidate key matched")
+        return match.secret
+
+    def decode_bytes(self, stego_text: str, key: str = None, keyring=None, hours: int = 0) -> bytes:
+        """Decode a binary secret from AIT_Steg method.
+
+        Errors are handled as in decode(), but the secret is returned as is:
+        legacy XOR messages skip the printable-text check, except when
+        trying keyring candidates, where nothing else tells them apart.
+        """
+        if keyring or hours:
+            return self._keyring_match(stego_text, key, keyring, hours, binary=True)
+
+        frames = self._first_message(stego_text, key)
+        if frames is None:
+            return b''
+        return self._decrypt_bytes(frames, self._text_key(stego_text, key), key)
+
+    def _sealed_chars(self, chunk: bytes, enc_key: bytes, index: int, is_last: bool, nonce: bytes) -> str:
+        """Seal one frame of the secret and convert it to zero-width characters."""
+        return self._data_to_zero_width(self._seal_frame(chunk, enc_key, index, is_last, nonce))
+
+    def _chunk_values(self, text: str) -> bytes:
+        """Return the 3-bit value of every zero-width character in a chunk of text."""
+        with self.profiler.stage('extraction', len(text)):
+            zw_chars = ''.join(self._EXTRACT_RE.findall(text))
+        return zw_chars.translate(self._DECODE_TABLE).encode('latin-1')
+
+    def _encode_chunks(self, cover_text: str, secret: bytes, key: str, pool) -> str:
+        """Seal and map the secret one frame per chunk.
+
+        The key is derived here and the nonces are drawn here in frame
+        order, as the serial path draws them. The xor cipher writes a single
+        legacy frame of at most 65535 bytes, which is not worth splitting.
+        """
+        if not secret:
+            return cover_text
+        enc_key = self._derive_key_from_content(cover_text, key)
+        if self.cipher == 'xor':
+            return cover_text + self._data_to_zero_width(self._build_frames(secret, enc_key))
+
+        chunks, last = zip(*iter_chunks(secret))
+        nonces = [os.urandom(self._NONCE_SIZE) for _ in chunks]
+        sealed = pool.map(self._sealed_chars, chunks, [enc_key] * len(chunks), range(len(chunks)),
+                          last, nonces)
+        return cover_text + ''.join(sealed)
+
+    def _decode_chunks(self, stego_text: str, key: str, pool) -> bytes:
+        """Extract the zero-width values chunk by chunk, then decrypt as decode_bytes() does.
+
+        Without a user key the cover is still stripped and hashed in this
+        process, for the dynamic key.
+        """
+        values = b''.join(pool.map(self._chunk_values, pool.split(stego_text)))
+        frames = self._read_first(self._values_to_data(values) if len(values) % 3 == 0 else b'', key)
+        if frames is None:
+            return b''
+        return self._decrypt_bytes(frames, self._text_key(stego_text, key), key)
 
-        # Read length
-        data_length = int.from_bytes(payload[:2], byteorder='big')
+    def decode(self, stego_text: str, key: str = None, keyring=None, hours: int = 0) -> str:
+        """Decode secret data from AIT_Steg method.
 
-        if data_length == 0 or len(payload) < 2 + data_length:
+        ``keyring`` is a list of candidate user keys and ``hours`` a number of
+        past hour buckets to try for the dynamic key; see decode_keyring().
+        """
+        if keyring or hours:
+            return self._keyring_match(stego_text, key, keyring, hours)
+
+        frames = self._first_message(stego_text, key)
+        if frames is None:
             return ''
+        return self._decrypt_payload(frames, self._text_key(stego_text, key), key)
 
-        encrypted_data = payload[2:2 + data_length]
+    def _decrypt_bytes(self, frames, enc_key: bytes, key: str = None) -> bytes:
+        """Decrypt a message; raises ValueError when an AEAD message fails authentication.
 
-        # Derive key (try to extract cover text by removing zero-width chars)
-        cover_text = ''.join(c for c in stego_text if c not in self.ZERO_WIDTH_CHARS)
+        Only AEAD messages can fail: legacy XOR messages decrypt under any
+        key and are checked by _decrypt_payload() instead.
+        """
+        try:
+            return self._open_message(frames, enc_key)  # XOR is symmetric
+        except InvalidTag:
+            # Authentication failed, so the key is wrong or the data corrupted
+            raise ValueError("Decoding failed - incorrect key or corrupted data")
 
-        # Try with provided key first
-        if key:
-            enc_key = self._derive_key_from_content(cover_text, key)
-        else:
-            # Try dynamic key generation, but raise exception if it fails
-            enc_key = self._derive_key_from_content(cover_text, None)
+    def _decrypt_payload(self, frames, enc_key: bytes, key: str = None) -> str:
+        """Decrypt a message and check that the result is the secret text."""
+        decrypted_data = self._decrypt_bytes(frames, enc_key, key)
 
-        # Decrypt
-        decrypted_data = self._encrypt_data(encrypted_data, enc_key)  # XOR is symmetric
+        if self._is_authenticated(frames):
+            try:
+                return decrypted_data.decode('utf-8')
+            except UnicodeDecodeError:
+                return ''
 
         try:
             decoded = decrypted_data.decode('utf-8')
-            # Check if decoded text makes sense (basic validation)
-            if not key and len([c for c in decoded if ord(c) > 127 or ord(c) < 32]) > len(decoded) * 0.3:
-                # Too many non-printable characters, likely wrong key
+            if not key and not _plausible_text(decoded):
                 raise ValueError("Decoding failed - incorrect key or corrupted data")
             return decoded
         except UnicodeDecodeError:
             if not key:
                 raise ValueError("Decoding failed - key required or corrupted data")
             return ''
+
+    def _try_key(self, frames, enc_key: bytes, binary: bool = False):
+        """Return the secret if ``enc_key`` opens the message, else None."""
+        if self._is_authenticated(frames):
+            try:
+                data = self._open_message(frames, enc_key)
+            except InvalidTag:
+                return None
+            if binary:
+                return data
+            try:
+                return data.decode('utf-8')
+            except UnicodeDecodeError:
+                return None
+
+        # Legacy frames carry no tag, so fall back to the text heuristic
+        data = self._open_message(frames, enc_key)
+        try:
+            decoded = data.decode('utf-8')
+        except UnicodeDecodeError:
+            return None
+        if not _plausible_text(decoded):
+            return None
+        return data if binary else decoded
+
+    def decode_keyring(self, stego_text: str, keyring=(), hours: int = 0, max_workers: int = None,
+                       binary: bool = False):
+        """Decode by trying several candidate keys, returning a KeyringMatch or None.
+
+        Candidates are the user keys in ``keyring`` followed by dynamic keys
+        for the current hour and the ``hours`` hour buckets before it (only
+        the current hour when the keyring is empty). The text is parsed once
+        and the candidates are derived and tried concurrently; the first one
+        that authenticates wins and the remaining trials are cancelled. With
+        ``binary`` the matched secret is returned as bytes.
+        """
+        try:
+            frames = FrameReader(self._zero_width_to_data(stego_text)).next_message()
+        except FrameError:
+            return None
+        if frames is None:
+            return None
+
+        candidates = [(user_key, None) for user_key in keyring]
+        if hours or not candidates:
+            current = self._current_hour()
+            candidates += [(None, current - back) for back in range(hours + 1)]
+
+        salt = self._cover_prefix(stego_text).encode('utf-8')
+        if any(user_key is None for user_key, _ in candidates):
+            cover_text = self._EXTRACT_RE.sub('', stego_text)
+            content_hash = hashlib.sha256(cover_text.encode('utf-8')).hexdigest()
+
+        def attempt(candidate):
+            user_key, hour = candidate
+            base_key = user_key if user_key is not None else self._dynamic_key(content_hash, hour)
+            secret = self._try_key(frames, self._derive_key(base_key, salt), binary)
+            return None if secret is None else KeyringMatch(secret, user_key, hour)
+
+        if len(candidates) == 1:
+            return attempt(candidates[0])
+
+        # PBKDF2 and AES-GCM release the GIL, so threads run the trials in parallel
+        with ThreadPoolExecutor(max_workers=max_workers or min(len(candidates), os.cpu_count() or 1)) as pool:
+            pending = {pool.submit(attempt, candidate) for candidate in candidates}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    match = future.result()
+                    if match is not None:
+                        for other in pending:
+                            other.cancel()
+                        return match
+
+        return None
+
+    def encode_stream(self, cover_iter, secret_reader, out_writer, key: str = None):
+        """Copy the cover to out_writer, then append the secret one frame at a time.
+
+        The cover is hashed as it passes through, so the dynamic key needs no
+        second pass. The xor cipher writes a single legacy frame, which holds
+        at most 65535 bytes and is buffered whole.
+        """
+        cover = _StreamCover(hashed=not key)
+        for chunk in iter_source(cover_iter):
+            out_writer.write(chunk)
+            cover.update(chunk)
+
+        def derive_key():
+            return self._derive_key(key or self._dynamic_key(cover.hexdigest()), cover.salt())
+
+        for frames in self._iter_sealed(secret_reader, derive_key):
+            out_writer.write(self._data_to_zero_width(frames))
+
+    def _iter_sealed(self, secret_reader, derive_key):
+        """Yield the framed secret read from secret_reader, encrypted for the cipher.
+
+        ``derive_key`` returns the encryption key; it is called once the
+        secret turns out not to be empty, so the cover has been read by
+        then. The xor cipher yields a single legacy frame, which holds at
+        most 65535 bytes and is buffered whole.
+        """
+        chunks = iter_secret_chunks(secret_reader)
+        first = next(chunks, None)
+        if first is None:
+            return
+
+        enc_key = derive_key()
+        if self.cipher == 'xor':
+            secret_bytes = first[0] + b''.join(chunk for chunk, _ in chunks)
+            yield self._build_frames(secret_bytes, enc_key)
+            return
+
+        for index, (chunk, is_last) in enumerate(chain([first], chunks)):
+            yield self._seal_frame(chunk, enc_key, index, is_last)
+
+    def encode_file(self, cover_path: str, secret_reader, output_path: str, key: str = None):
+        """Copy a cover file byte for byte, then append the secret as UTF-8 sequences.
+
+        Nothing is decoded to str: the cover is hashed and copied in blocks
+        and every frame is written from precomputed byte sequences.
+        """
+        if self._UTF8 is None:
+            with open(cover_path, 'r', encoding='utf-8') as cover, \
+                    open(output_path, 'w', encoding='utf-8') as output:
+                self.encode_stream(cover, secret_reader, output, key)
+            return
+
+        content_hash = hashlib.sha256()
+        head = bytearray()
+        with open(cover_path, 'rb') as cover, open(output_path, 'wb') as output:
+            for block in copy_file(cover, output):
+                if len(head) < 16:
+                    head += block[:16 - len(head)]
+                if not key:
+                    content_hash.update(block)
+
+            def derive_key():
+                return self._derive_key(key or self._dynamic_key(content_hash.hexdigest()), bytes(head))
+
+            for frames in self._iter_sealed(secret_reader, derive_key):
+                output.write(self._data_to_utf8(frames))
+
+    def decode_buffer_bytes(self, buffer, key: str = None) -> bytes:
+        """Binary decode of UTF-8 stego text in a bytes-like buffer or an mmap.
+
+        Same result as decode_bytes(): the zero-width sequences are read and
+        the cover is hashed straight from the raw bytes, without decoding
+        them to str.
+        """
+        if self._UTF8 is None:
+            return self.decode_bytes(bytes(buffer).decode('utf-8'), key)
+
+        with self.profiler.stage('extraction', len(buffer)):
+            values = self._UTF8.extract(buffer)
+        try:
+            payload = self._values_to_data(values) if len(values) % 3 == 0 else b''
+            with self.profiler.stage('deframing', len(payload)):
+                frames = FrameReader(payload).next_message()
+        except FrameError:
+            if not key:
+                raise ValueError("Decoding failed - corrupted data")
+            return b''
+        if frames is None:
+            return b''
+
+        content_hash = hashlib.sha256()
+        head = bytearray()
+        with self.profiler.stage('cover hashing', len(buffer)):
+            for part in self._UTF8.iter_cover(buffer):
+                if len(head) < 16:
+                    head += part[:16 - len(head)]
+                if not key:
+                    content_hash.update(part)
+                elif len(head) >= 16:
+                    # A user key only needs the salt
+                    break
+        base_key = key or self._dynamic_key(content_hash.hexdigest())
+        return self._decrypt_bytes(frames, self._derive_key(base_key, bytes(head)), key)
+
+    def decode_path_bytes(self, path: str, key: str = None) -> bytes:
+        """decode_buffer_bytes() on a memory-mapped file."""
+        with map_file(path) as buffer:
+            return self.decode_buffer_bytes(buffer, key)
+
+    def _iter_stream_bytes(self, chunks, cover):
+        """Yield the bytes carried by zero-width characters, feeding the rest to ``cover``."""
+        pending = ''
+        for chunk in chunks:
+            cover.update(self._EXTRACT_RE.sub('', chunk))
+            pending += ''.join(self._EXTRACT_RE.findall(chunk))
+            whole = len(pending) - len(pending) % 3
+            if whole:
+                yield self._zero_width_to_data(pending[:whole])
+                pending = pending[whole:]
+
+    def decode_stream(self, reader, key: str = None):
+        """Yield the secret in chunks while reading the stego text incrementally.
+
+        With a user key, AEAD frames are opened and yielded as they arrive.
+        The dynamic key hashes the whole cover, so without a key the rest of
+        the text is read (hashed, not kept) before the buffered message is
+        decrypted. Raises ValueError when the message does not open.
+        """
+        cover = _StreamCover(hashed=not key)
+        data = self._iter_stream_bytes(iter_source(reader), cover)
+        frames = FrameReader(ChunkReader(data))
+
+        buffered = []
+        opened = 0
+        enc_key = None
+        try:
+            while True:
+                frame = frames.next_frame()
+                if frame is None:
+                    break
+                buffered.append(frame)
+                if key and frame.version == FRAME_VERSION and frame.flags & FLAG_AEAD and cover.has_salt():
+                    # The salt is known, so frames can be opened right away
+                    enc_key = enc_key or self._derive_key(key, cover.salt())
+                    for pending in buffered:
+                        yield self._open_frame(pending, enc_key, opened)
+                        opened += 1
+                    buffered = []
+                if frame.version != FRAME_VERSION or not frame.flags & FLAG_MORE:
+                    break
+        except FrameError:
+            raise ValueError("Decoding failed - corrupted data")
+
+        if not buffered:
+            return
+
+        # Read the rest of the text to complete the salt or the cover hash
+        for _ in data:
+            pass
+
+        enc_key = self._derive_key(key or self._dynamic_key(cover.hexdigest()), cover.salt())
+        if self._is_authenticated(buffered):
+            try:
+                yield self._open_message(buffered, enc_key)
+            except InvalidTag:
+                raise ValueError("Decoding failed - incorrect key or corrupted data")
+            return
+
+        # Legacy frames carry no tag, so keep the text checks of decode()
+        secret = self._decrypt_payload(buffered, enc_key, key)
+        if not secret:
+            raise ValueError("Decoding failed - incorrect key or corrupted data")
+        yield secret.encode('utf-8')
+
+    def _open_frame(self, frame, enc_key: bytes, index: int) -> bytes:
+        """Open frame ``index`` of an AEAD message; raises ValueError on failure."""
+        try:
+            return self._open_frame_data(frame, enc_key, index)
+        except InvalidTag:
+            raise ValueError("Decoding failed - incorrect key or corrupted data")
+
+    def _find_messages(self, stego_text: str):
+        """Locate every message by the positions of its zero-width characters."""
+        starts = []
+        runs = []
+        with self.profiler.stage('extraction', len(stego_text)):
+            for run in self._EXTRACT_RE.finditer(stego_text):
+                starts.extend(range(run.start(), run.end()))
+                runs.append(run.group())
+        return scan_carriers(starts, None, ''.join(runs), 3, self._triplets_to_data)
+
+    def _message_payload(self, stego_text: str, offset: int, frames, key: str = None):
+        """Decrypt a message found at ``offset``, or return None if no cover candidate opens it.
+
+        The cover is taken to start after the previous zero-width character
+        or at the start of the line, as when independent stego texts are
+        pasted one after another (a chat log), or at the start of the text,
+        as when the message was appended to an earlier stego text (see
+        decode_tail()); the first candidate that authenticates wins.
+        """
+        segment_start = max(stego_text.rfind(char, 0, offset) for char in self._CHARSET) + 1
+        line_start = stego_text.rfind('\n', 0, offset) + 1
+        for start in dict.fromkeys((segment_start, line_start, 0)):
+            cover_text = stego_text[start:offset] if not key else stego_text[start:min(start + 16, offset)]
+            secret = self._try_key(frames, self._derive_key_from_content(cover_text, key), binary=True)
+            if secret is not None:
+                return secret
+        return None
+
+    def _run_message(self, values: bytes):
+        """Locate the first message in the 3-bit values of a trailing run.
+
+        Returns ``(start, frames)`` where ``start`` is the character offset of
+        the message within the run, or None when the run holds no message.
+        """
+        if len(values) % 3:
+            return None
+        try:
+            frames = FrameReader(self._values_to_data(values)).next_message()
+        except FrameError:
+            return None
+        if frames is None:
+            return None
+        return frames[0].start * 3, frames
+
+    def _tail_message(self, stego_text: str, key: str = None):
+        """Return ``(frames, enc_key)`` for the first message of the trailing run, or None."""
+        offset, run = trailing_run(stego_text, self._CHARSET)
+        message = self._run_message(run.translate(self._DECODE_TABLE).encode('latin-1'))
+        if message is None:
+            return None
+
+        start, frames = message
+        cover_end = offset + start
+        # A user key only needs the salt, so avoid copying a large cover
+        cover_text = stego_text[:cover_end] if not key else stego_text[:min(16, cover_end)]
+        return frames, self._derive_key_from_content(cover_text, key)
+
+    def _file_message(self, path: str, key: str = None):
+        """Return ``(frames, enc_key)`` for the first message of a file's trailing run, or None."""
+        offset, run = read_trailing_bytes(path, self._CHARSET)
+        if self._UTF8 is None:
+            values = run.decode('utf-8').translate(self._DECODE_TABLE).encode('latin-1')
+        else:
+            values = self._UTF8.symbols(run)
+        message = self._run_message(values)
+        if message is None:
+            return None
+
+        start, frames = message
+        # Every zero-width character is three bytes in UTF-8
+        return frames, self._derive_key_from_file(path, offset + start * 3, key)
+
+    def decode_tail_bytes(self, stego_text: str, key: str = None) -> bytes:
+        """Binary version of decode_tail()."""
+        message = self._tail_message(stego_text, key)
+        return b'' if message is None else self._decrypt_bytes(*message, key)
+
+    def decode_file_bytes(self, path: str, key: str = None) -> bytes:
+        """Binary version of decode_file()."""
+        message = self._file_message(path, key)
+        return b'' if message is None else self._decrypt_bytes(*message, key)
+
+    def decode_tail(self, stego_text: str, key: str = None) -> str:
+        """Decode the first message of the trailing run of zero-width characters.
+
+        Messages appended one after another share the run, so this returns
+        the message decode() returns; runs that cover text separates from
+        the end of the text are not read. Everything before the frame is
+        treated as the cover text, which is exactly what the encoder saw
+        when the frame was appended.
+        """
+        message = self._tail_message(stego_text, key)
+        return '' if message is None else self._decrypt_payload(*message, key)
+
+    def decode_file(self, path: str, key: str = None) -> str:
+        """decode_tail() on a file, reading the run from its tail.
+
+        With a user key only the first 16 bytes of the cover are read; the
+        dynamic key needs a streaming hash over the cover instead.
+        """
+        message = self._file_message(path, key)
+        return '' if message is None else self._decrypt_payload(*message, key)
+
+
+class _StreamCover:
+    """Cover text seen by a streaming encoder or decoder: salt prefix and hash."""
+
+    def __init__(self, hashed: bool = True):
+        self._prefix = ''
+        self._hash = hashlib.sha256() if hashed else None
+
+    def update(self, text: str):
+        if len(self._prefix) < 16:
+            self._prefix += text[:16 - len(self._prefix)]
+        if self._hash is not None:
+            self._hash.update(text.encode('utf-8'))
+
+    def has_salt(self) -> bool:
+        return len(self._prefix) >= 16
+
+    def salt(self) -> bytes:
+        return self._prefix.encode('utf-8')
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
+AITStegMethod._build_tables()
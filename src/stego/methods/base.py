@@ -1,11 +1,71 @@
 """Base class for steganography methods."""
 
+import time
 from abc import ABC, abstractmethod
+from collections import namedtuple
+from ..framing import FrameError, check_compression, frame_data, method_flags
+from ..profiling import NULL_PROFILER
+from ..scanning import Message
+from ..streaming import iter_source
+
+
+class Estimate(namedtuple('Estimate', ['method', 'payload_len', 'framed_len', 'capacity', 'carriers',
+                                       'carrier_unit', 'overflow', 'output_size', 'overhead_chars',
+                                       'encode_seconds'])):
+    """Predicted cost of embedding a payload in a cover, from StegoMethod.estimate().
+
+    ``capacity`` is the largest payload (bytes) the cover holds cleanly, or
+    None when it is unbounded. ``carriers`` counts the characters, symbols
+    or words emitted (``carrier_unit``); ``overflow`` counts those that do
+    not fit the cover (recycled words, trailing symbols). ``output_size`` is
+    in characters and ``overhead_chars`` is its difference from the cover.
+    Figures assume an uncompressed payload, so they are upper bounds when
+    compression is on.
+    """
+
+    __slots__ = ()
+
+    @property
+    def fits(self) -> bool:
+        """True if the payload fits the cover without overflow."""
+        return (self.capacity is None or self.payload_len <= self.capacity) and not self.overflow
 
 
 class StegoMethod(ABC):
     """Abstract base class for steganography methods."""
 
+    # Codec used to compress secrets before embedding (see framing.CODECS)
+    compression = None
+
+    # Encode cost model used by estimate(), in seconds: fixed cost, per cover
+    # character and per framed payload byte (measured on a reference machine)
+    ENCODE_COST = (0.0, 0.0, 0.0)
+
+    # Id recorded in the header of every frame, so stego decode can name the
+    # method (1-15, see framing.FLAG_METHOD_MASK); 0 records none
+    METHOD_ID = 0
+
+    # Receives per-stage timings (see profiling.Profiler); a no-op by default
+    profiler = NULL_PROFILER
+
+    def __init__(self, compression: str = None, profiler=None):
+        check_compression(compression)
+        self.compression = compression
+        self.profiler = profiler or NULL_PROFILER
+
+    @property
+    def frame_flags(self) -> int:
+        """Flag bits every frame written by this method carries."""
+        return method_flags(self.METHOD_ID)
+
+    def header_bytes(self, stego_text: str, size: int = 4) -> bytes:
+        """Return the first ``size`` bytes carried by the text, for probing frame headers.
+
+        Only the first carrier symbols are read. This default has no carrier
+        model and returns b''.
+        """
+        return b''
+
     @abstractmethod
     def encode(self, cover_text: str, secret_data: str, key: str = None) -> str:
         """Encode secret data into cover text."""
@@ -15,3 +75,134 @@ class StegoMethod(ABC):
     def decode(self, stego_text: str, key: str = None) -> str:
         """Decode secret data from stego text."""
         pass
+
+    def encode_bytes(self, cover_text: str, secret: bytes, key: str = None) -> str:
+        """Encode a binary secret into cover text.
+
+        The built-in methods work on bytes natively; this default goes
+        through encode() and so only accepts UTF-8 secrets.
+        """
+        return self.encode(cover_text, secret.decode('utf-8'), key)
+
+    def decode_bytes(self, stego_text: str, key: str = None) -> bytes:
+        """Decode a binary secret from stego text.
+
+        The built-in methods work on bytes natively; this default goes
+        through decode() and so only returns UTF-8 secrets.
+        """
+        return self.decode(stego_text, key).encode('utf-8')
+
+    def encode_stream(self, cover_iter, secret_reader, out_writer, key: str = None):
+        """Encode a secret read from a binary reader, writing the stego text to out_writer.
+
+        ``cover_iter`` is a text reader or an iterable of ``str`` chunks. This
+        default collects everything in memory; the built-in methods override
+        it with incremental versions.
+        """
+        cover_text = ''.join(iter_source(cover_iter))
+        out_writer.write(self.encode_bytes(cover_text, secret_reader.read(), key))
+
+    def decode_stream(self, reader, key: str = None):
+        """Decode stego text from a text reader or iterable of ``str`` chunks.
+
+        Returns an iterator over the secret as chunks of bytes. A frame that
+        fails its checksum raises FrameError while iterating. This default
+        collects the whole text in memory; the built-in methods override it.
+        """
+        secret = self.decode_bytes(''.join(iter_source(reader)), key)
+        if secret:
+            yield secret
+
+    def _find_messages(self, stego_text: str):
+        """Yield ``(offset, length, frames)`` for every message in the text, in order.
+
+        Methods with a carrier model implement this with
+        scanning.scan_carriers(); None means the method has none.
+        """
+        return None
+
+    def _message_payload(self, stego_text: str, offset: int, frames, key: str = None):
+        """Return the secret of a message found at ``offset``, or None if it cannot be read."""
+        try:
+            return frame_data(frames)
+        except FrameError:
+            return None
+
+    def iter_messages(self, stego_text: str, key: str = None):
+        """Yield a Message ``(offset, length, payload)`` for every message in the text.
+
+        Messages are found wherever they start, so a chat log holding many
+        of them yields each in turn, and decoded lazily. Without a carrier
+        model this default yields the whole text as a single message.
+        """
+        found = self._find_messages(stego_text)
+        if found is None:
+            secret = self.decode_bytes(stego_text, key)
+            if secret:
+                yield Message(0, len(stego_text), secret)
+            return
+
+        for offset, length, frames in found:
+            yield Message(offset, length, self._message_payload(stego_text, offset, frames, key))
+
+    def index_messages(self, stego_text: str) -> list:
+        """Return ``(offset, length)`` for every message in the text, without opening them.
+
+        Pass an entry to message_at() to read that message alone.
+        """
+        found = self._find_messages(stego_text)
+        if found is None:
+            return [(message.offset, message.length) for message in self.iter_messages(stego_text)]
+        return [(offset, length) for offset, length, _ in found]
+
+    def message_at(self, stego_text: str, offset: int, length: int, key: str = None):
+        """Return the secret of the message at an index_messages() entry.
+
+        Only ``stego_text[offset:offset + length]`` is decoded. Returns None
+        if the message cannot be opened; raises ValueError if no message
+        starts at ``offset``.
+        """
+        span = stego_text[offset:offset + length]
+        found = self._find_messages(span)
+        if found is None:
+            return self.decode_bytes(span, key)
+
+        for found_offset, _, frames in found:
+            if found_offset == 0:
+                return self._message_payload(stego_text, offset, frames, key)
+        raise ValueError(f"No message at offset {offset}")
+
+    def _encode_chunks(self, cover_text: str, secret: bytes, key: str, pool) -> str:
+        """encode_bytes() with its work run in chunks on a parallel.ChunkPool.
+
+        Methods that can cut their work at safe boundaries override this;
+        the default runs encode_bytes() in this process.
+        """
+        return self.encode_bytes(cover_text, secret, key)
+
+    def _decode_chunks(self, stego_text: str, key: str, pool) -> bytes:
+        """decode_bytes() with its work run in chunks on a parallel.ChunkPool."""
+        return self.decode_bytes(stego_text, key)
+
+    def _predict_seconds(self, cover_len: int, framed_len: int) -> float:
+        """Predict the encode time from ENCODE_COST."""
+        if not framed_len:
+            # Nothing to embed: the cover is returned as is
+            return 0.0
+        fixed, per_char, per_byte = self.ENCODE_COST
+        return fixed + per_char * cover_len + per_byte * framed_len
+
+    def estimate(self, cover_text: str, payload_len: int) -> Estimate:
+        """Estimate capacity and cost of embedding ``payload_len`` bytes in the cover.
+
+        The built-in methods compute this from the cover alone, without
+        encoding. This default has no model, so it times an encode of a
+        dummy payload instead.
+        """
+        start = time.perf_counter()
+        output = self.encode_bytes(cover_text, bytes(payload_len))
+        seconds = time.perf_counter() - start
+        return Estimate(method=type(self).__name__, payload_len=payload_len, framed_len=None,
+                        capacity=None, carriers=None, carrier_unit=None, overflow=0,
+                        output_size=len(output), overhead_chars=len(output) - len(cover_text),
+                        encode_seconds=seconds)
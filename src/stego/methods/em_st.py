@@ -1,6 +1,16 @@
 """Em_st method - Emoticon-based encoding system."""
 
-from .base import StegoMethod
+import re
+from itertools import chain
+from .base import Estimate, StegoMethod
+from ..framing import FrameError, frame_message, framed_size, payload_capacity, read_message
+from ..scanning import scan_carriers
+from ..streaming import (ChunkReader, iter_aligned, iter_payloads, iter_secret_frames,
+                         iter_source, iter_words, write_joined)
+
+# Nibble value recorded for extended symbols, removed before decoding
+_SKIP_NIBBLE = 16
+_SKIP = bytes([_SKIP_NIBBLE])
 
 
 class EmStMethod(StegoMethod):
@@ -30,52 +40,83 @@ class EmStMethod(StegoMethod):
     EXTENDED_SYMBOLS = ['""', "''", '**', '//', '\\\\', '||', '&&',
                         '@@', '##', '$$', '%%', '^^', '~~']
 
-    def _binary_to_symbols(self, binary_string: str) -> list:
-        """Convert binary string to symbols."""
-        symbols = []
-
-        # Process in 4-bit chunks
-        for i in range(0, len(binary_string), 4):
-            chunk = binary_string[i:i + 4].ljust(4, '0')  # Pad if needed
-            if chunk in self.SYMBOL_MAP:
-                symbols.append(self.SYMBOL_MAP[chunk])
-
-        return symbols
-
-    def _symbols_to_binary(self, stego_text: str) -> str:
-        """Extract symbols and convert back to binary."""
-        # Create reverse mapping
-        reverse_map = {v: k for k, v in self.SYMBOL_MAP.items()}
-
-        # Find all symbols in text
-        binary_string = ""
-
-        # Sort symbols by length (longest first) to avoid wrong matches
-        all_symbols = list(self.SYMBOL_MAP.values()) + self.EXTENDED_SYMBOLS
-        symbols_sorted = sorted(set(all_symbols), key=len, reverse=True)
-
-        # Extract symbols from text
-        text_copy = stego_text
-        positions = []
-
-        for symbol in symbols_sorted:
-            pos = 0
-            while pos < len(text_copy):
-                idx = text_copy.find(symbol, pos)
-                if idx == -1:
+    # Cost model for estimate(), see StegoMethod.ENCODE_COST
+    ENCODE_COST = (1.4e-5, 2.6e-8, 1.9e-7)
+
+    # Frame header id, see StegoMethod.METHOD_ID
+    METHOD_ID = 4
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._build_tables()
+
+    @classmethod
+    def _build_tables(cls):
+        """Precompute the symbol tables and the compiled symbol matcher."""
+        nibble_symbols = [cls.SYMBOL_MAP[format(i, '04b')] for i in range(16)]
+
+        # Each byte becomes two symbols, high nibble first
+        cls._BYTE_SYMBOLS = tuple((nibble_symbols[byte >> 4], nibble_symbols[byte & 0x0F])
+                                  for byte in range(256))
+
+        # Extended symbols are matched so their characters cannot start a
+        # false match, then dropped through the _SKIP_NIBBLE marker
+        cls._SYMBOL_NIBBLES = dict.fromkeys(cls.EXTENDED_SYMBOLS, _SKIP_NIBBLE)
+        cls._SYMBOL_NIBBLES.update((symbol, i) for i, symbol in enumerate(nibble_symbols))
+
+        # One plain alternation, longest first so a longer symbol wins over
+        # its prefix; without groups the engine can skip ahead on first chars
+        ordered = sorted(cls._SYMBOL_NIBBLES, key=lambda symbol: (-len(symbol), symbol))
+        cls._SYMBOL_RE = re.compile('|'.join(map(re.escape, ordered)))
+
+    def _bytes_to_symbols(self, data: bytes) -> list:
+        """Convert bytes to symbols, two per byte."""
+        with self.profiler.stage('symbol mapping', len(data)):
+            return list(chain.from_iterable(map(self._BYTE_SYMBOLS.__getitem__, data)))
+
+    def _extract_nibbles(self, stego_text: str) -> bytes:
+        """Extract symbols in one left-to-right pass and return their nibble values."""
+        with self.profiler.stage('extraction', len(stego_text)):
+            nibbles = bytes(map(self._SYMBOL_NIBBLES.__getitem__, self._SYMBOL_RE.findall(stego_text)))
+            return nibbles.translate(None, _SKIP)
+
+    def header_bytes(self, stego_text: str, size: int = 4) -> bytes:
+        """Return the bytes carried by the first symbols of the text."""
+        nibbles = bytearray()
+        for match in self._SYMBOL_RE.finditer(stego_text):
+            nibble = self._SYMBOL_NIBBLES[match.group()]
+            if nibble != _SKIP_NIBBLE:
+                nibbles.append(nibble)
+                if len(nibbles) == size * 2:
                     break
-                positions.append((idx, symbol))
-                pos = idx + 1
-
-        # Sort by position to maintain order
-        positions.sort(key=lambda x: x[0])
-
-        # Convert to binary
-        for _, symbol in positions:
-            if symbol in reverse_map:
-                binary_string += reverse_map[symbol]
-
-        return binary_string
+        return self._nibbles_to_bytes(bytes(nibbles))
+
+    def _nibbles_to_bytes(self, nibbles: bytes) -> bytes:
+        """Pack nibble values into bytes; a trailing odd nibble is ignored."""
+        count = len(nibbles) // 2
+        if not count:
+            return b''
+
+        with self.profiler.stage('bit unpacking', len(nibbles)):
+            # Nibbles are below 16, so the shifted high halves never carry
+            high = int.from_bytes(nibbles[0:count * 2:2], byteorder='big')
+            low = int.from_bytes(nibbles[1:count * 2:2], byteorder='big')
+            return (high * 16 + low).to_bytes(count, byteorder='big')
+
+    def _find_messages(self, stego_text: str):
+        """Locate every message by the positions of its symbols."""
+        starts = []
+        ends = []
+        nibbles = bytearray()
+        symbol_nibbles = self._SYMBOL_NIBBLES
+        with self.profiler.stage('extraction', len(stego_text)):
+            for match in self._SYMBOL_RE.finditer(stego_text):
+                nibble = symbol_nibbles[match.group()]
+                if nibble != _SKIP_NIBBLE:
+                    starts.append(match.start())
+                    ends.append(match.end())
+                    nibbles.append(nibble)
+        return scan_carriers(starts, ends, bytes(nibbles), 2, self._nibbles_to_bytes)
 
     def _insert_symbols_in_text(self, cover_text: str, symbols: list) -> str:
         """Insert symbols into cover text at word boundaries."""
@@ -84,81 +125,147 @@ class EmStMethod(StegoMethod):
         if not symbols:
             return cover_text
 
-        result_words = []
-        symbol_index = 0
-
-        # Insert symbols between words and at the end
-        for i, word in enumerate(words):
-            result_words.append(word)
-
-            # Add symbol after word if we have more symbols
-            if symbol_index < len(symbols):
-                result_words.append(symbols[symbol_index])
-                symbol_index += 1
+        # Insert one symbol after each word while symbols last
+        paired = min(len(words), len(symbols))
+        result_words = [None] * (paired * 2)
+        result_words[0::2] = words[:paired]
+        result_words[1::2] = symbols[:paired]
 
-        # Add remaining symbols at the end
-        while symbol_index < len(symbols):
-            result_words.append(symbols[symbol_index])
-            symbol_index += 1
+        # Remaining words, then remaining symbols at the end
+        result_words += words[paired:]
+        result_words += symbols[paired:]
 
         return ' '.join(result_words)
 
-    def encode(self, cover_text: str, secret_data: str, key: str = None) -> str:
-        """Encode secret data using Em_st method."""
-        if not secret_data:
+    def encode_bytes(self, cover_text: str, secret: bytes, key: str = None) -> str:
+        """Encode a binary secret using Em_st method."""
+        if not secret:
             return cover_text
 
-        # Convert secret to bytes and then binary
-        secret_bytes = secret_data.encode('utf-8')
+        with self.profiler.stage('framing', len(secret)):
+            framed = frame_message(secret, flags=self.frame_flags, compression=self.compression)
 
-        # Add length prefix (16-bit length)
-        data_length = len(secret_bytes)
-        length_binary = format(data_length, '016b')
+        # Convert the framed secret to symbols
+        symbols = self._bytes_to_symbols(framed)
 
-        # Combine length and data
-        binary_string = length_binary + ''.join(format(byte, '08b') for byte in secret_bytes)
+        # Insert symbols into cover text
+        with self.profiler.stage('insertion', len(cover_text)):
+            return self._insert_symbols_in_text(cover_text, symbols)
+
+    def decode_bytes(self, stego_text: str, key: str = None) -> bytes:
+        """Decode a binary secret; raises FrameError if a frame is corrupt."""
+        data = self._nibbles_to_bytes(self._extract_nibbles(stego_text))
+        with self.profiler.stage('deframing', len(data)):
+            return read_message(data)
+
+    def _insert_chunk(self, text: str, data: bytes, skip: int, count: int) -> str:
+        """Insert ``count`` symbols of data after the words of a chunk of cover.
+
+        The first ``skip`` symbols of data belong to the previous chunk;
+        symbols beyond the chunk's last word are appended at its end.
+        """
+        symbols = self._bytes_to_symbols(data)[skip:skip + count]
+        if not symbols:
+            return ' '.join(text.split())
+        return self._insert_symbols_in_text(text, symbols)
 
-        # Convert binary to symbols
-        symbols = self._binary_to_symbols(binary_string)
+    def _encode_chunks(self, cover_text: str, secret: bytes, key: str, pool) -> str:
+        """Insert symbols chunk by chunk; the last chunk also takes the symbols left over."""
+        if not secret:
+            return cover_text
 
-        # Insert symbols into cover text
-        encoded_text = self._insert_symbols_in_text(cover_text, symbols)
+        with self.profiler.stage('framing', len(secret)):
+            framed = frame_message(secret, flags=self.frame_flags, compression=self.compression)
+
+        symbols = 2 * len(framed)
+        chunks = pool.split_words(cover_text)
+        data, skips, counts = [], [], []
+        for index, (_, first, words) in enumerate(chunks):
+            start = min(first, symbols)
+            end = symbols if index == len(chunks) - 1 else min(first + words, symbols)
+            data.append(framed[start // 2:(end + 1) // 2])
+            skips.append(start % 2)
+            counts.append(end - start)
+
+        parts = pool.map(self._insert_chunk, [text for text, _, _ in chunks], data, skips, counts)
+        return ' '.join(part for part in parts if part)
+
+    def _decode_chunks(self, stego_text: str, key: str, pool) -> bytes:
+        """Extract the symbols of whole-word chunks, then pack and deframe."""
+        nibbles = b''.join(pool.map(self._extract_nibbles, pool.split(stego_text, at_space=True)))
+        data = self._nibbles_to_bytes(nibbles)
+        with self.profiler.stage('deframing', len(data)):
+            return read_message(data)
 
-        return encoded_text
+    def encode(self, cover_text: str, secret_data: str, key: str = None) -> str:
+        """Encode secret data using Em_st method."""
+        return self.encode_bytes(cover_text, secret_data.encode('utf-8'), key)
 
     def decode(self, stego_text: str, key: str = None) -> str:
         """Decode secret data from Em_st method."""
-        # Extract binary data from symbols
-        binary_string = self._symbols_to_binary(stego_text)
-
-        if len(binary_string) < 16:  # Need at least length prefix
-            return ''
-
-        # Read length prefix
-        length_binary = binary_string[:16]
-        data_length = int(length_binary, 2)
-
-        if data_length == 0:
-            return ''
-
-        # Extract data based on length
-        data_bits_needed = data_length * 8
-        total_bits_needed = 16 + data_bits_needed
-
-        if len(binary_string) < total_bits_needed:
+        try:
+            return self.decode_bytes(stego_text, key).decode('utf-8')
+        except (FrameError, UnicodeDecodeError):
             return ''
 
-        # Extract data binary
-        data_binary = binary_string[16:total_bits_needed]
+    def estimate(self, cover_text: str, payload_len: int) -> Estimate:
+        """Estimate the cost of embedding ``payload_len`` bytes without encoding.
 
-        # Convert binary to bytes
-        secret_bytes = bytearray()
-        for i in range(0, len(data_binary), 8):
-            if i + 8 <= len(data_binary):
-                byte_binary = data_binary[i:i + 8]
-                secret_bytes.append(int(byte_binary, 2))
-
-        try:
-            return secret_bytes.decode('utf-8')
-        except UnicodeDecodeError:
-            return ''
+        Capacity is one symbol per cover word; symbols beyond the last word
+        are appended at the end and counted as overflow.
+        """
+        words = cover_text.split()
+        framed = framed_size(payload_len)
+        symbols = 2 * framed
+
+        if symbols:
+            # Words and symbols joined by single spaces, symbols are two characters
+            output_size = sum(map(len, words)) + 2 * symbols + len(words) + symbols - 1
+        else:
+            output_size = len(cover_text)
+
+        return Estimate(method=type(self).__name__, payload_len=payload_len, framed_len=framed,
+                        capacity=payload_capacity(len(words) // 2), carriers=symbols,
+                        carrier_unit='symbols', overflow=max(0, symbols - len(words)),
+                        output_size=output_size, overhead_chars=output_size - len(cover_text),
+                        encode_seconds=self._predict_seconds(len(cover_text), framed))
+
+    def encode_stream(self, cover_iter, secret_reader, out_writer, key: str = None):
+        """Encode while reading the cover word by word and the secret frame by frame."""
+        frames = iter_secret_frames(secret_reader, flags=self.frame_flags, compression=self.compression)
+        first = next(frames, None)
+        if first is None:
+            # Nothing to hide: the cover is copied unchanged
+            for chunk in iter_source(cover_iter):
+                out_writer.write(chunk)
+            return
+
+        symbols = chain.from_iterable(map(self._bytes_to_symbols, chain([first], frames)))
+        write_joined(out_writer, self._iter_tokens(iter_words(iter_source(cover_iter)), symbols))
+
+    def _iter_tokens(self, words, symbols):
+        """Interleave words and symbols exactly as _insert_symbols_in_text does."""
+        for word in words:
+            yield word
+            symbol = next(symbols, None)
+            if symbol is not None:
+                yield symbol
+        yield from symbols
+
+    def _iter_stream_bytes(self, chunks):
+        """Yield the bytes carried by the symbols of text chunks."""
+        pending = b''
+        # Symbols never span whitespace, so aligned chunks can be scanned on their own
+        for chunk in iter_aligned(chunks):
+            pending += self._extract_nibbles(chunk)
+            whole = len(pending) - len(pending) % 2
+            if whole:
+                yield self._nibbles_to_bytes(pending[:whole])
+                pending = pending[whole:]
+
+    def decode_stream(self, reader, key: str = None):
+        """Yield the secret in chunks while reading the stego text incrementally."""
+        return iter_payloads(ChunkReader(self._iter_stream_bytes(iter_source(reader))))
+
+
+EmStMethod._build_tables()
@@ -1,6 +1,12 @@
 """4spach method - Four invisible Unicode characters for binary encoding."""
 
-from .base import StegoMethod
+import re
+from .base import Estimate, StegoMethod
+from ..framing import FrameError, data_frame, frame_message, framed_size, iter_chunks, read_message
+from ..scanning import scan_carriers
+from ..streaming import ChunkReader, iter_payloads, iter_secret_frames, iter_source
+from ..tail import read_trailing_bytes, trailing_run
+from ..utf8 import ZeroWidthCodec, copy_file, encode_table, map_file
 
 
 class FourSpachMethod(StegoMethod):
@@ -14,69 +20,246 @@ class FourSpachMethod(StegoMethod):
         '11': '\uFEFF',  # Zero Width No-Break Space
     }
 
-    def encode(self, cover_text: str, secret_data: str, key: str = None) -> str:
-        """Encode secret data using 4spach method."""
-        if not secret_data:
+    # Cost model for estimate(), see StegoMethod.ENCODE_COST
+    ENCODE_COST = (8.5e-6, 2.7e-10, 7.8e-8)
+
+    # Frame header id, see StegoMethod.METHOD_ID
+    METHOD_ID = 1
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._build_tables()
+
+    @classmethod
+    def _build_tables(cls):
+        """Precompute the byte <-> character tables for UNICODE_CHARS."""
+        digits = [cls.UNICODE_CHARS[format(i, '02b')] for i in range(4)]
+
+        # Each byte becomes four characters, most significant bit pair first
+        cls._ENCODE_TABLE = tuple(
+            ''.join(digits[(byte >> shift) & 0x03] for shift in (6, 4, 2, 0))
+            for byte in range(256)
+        )
+
+        # Reverse table: invisible character -> base-4 digit
+        cls._DECODE_TABLE = str.maketrans({char: str(i) for i, char in enumerate(digits)})
+        cls._EXTRACT_RE = re.compile('[' + ''.join(map(re.escape, digits)) + ']+')
+        cls._CHARSET = ''.join(digits)
+
+        # The same tables on raw UTF-8 bytes (see utf8); a subclass whose
+        # characters are not three-byte sequences keeps to the str paths
+        cls._UTF8_TABLE = encode_table(cls._ENCODE_TABLE)
+        try:
+            cls._UTF8 = ZeroWidthCodec(digits, b'0123')
+        except ValueError:
+            cls._UTF8 = None
+
+    def _bytes_to_chars(self, data: bytes) -> str:
+        """Convert bytes to invisible characters, four per byte."""
+        with self.profiler.stage('symbol mapping', len(data)):
+            return ''.join(map(self._ENCODE_TABLE.__getitem__, data))
+
+    def _bytes_to_utf8(self, data: bytes) -> bytes:
+        """Convert bytes to the UTF-8 encoding of their invisible characters."""
+        with self.profiler.stage('symbol mapping', len(data)):
+            return b''.join(map(self._UTF8_TABLE.__getitem__, data))
+
+    def _chars_to_bytes(self, chars: str) -> bytes:
+        """Convert a run of invisible characters back to bytes.
+
+        Trailing characters that do not make up a whole byte are ignored.
+        """
+        return self._digits_to_bytes(chars[:len(chars) - len(chars) % 4].translate(self._DECODE_TABLE))
+
+    def _digits_to_bytes(self, digits) -> bytes:
+        """Convert base-4 digits ('0' to '3', as str or bytes) to bytes, four per byte."""
+        count = len(digits) // 4
+        if not count:
+            return b''
+        with self.profiler.stage('bit unpacking', len(digits)):
+            return int(digits[:count * 4], 4).to_bytes(count, byteorder='big')
+
+    def _extract_chars(self, stego_text: str) -> str:
+        """Collect every invisible character in the text, in order."""
+        with self.profiler.stage('extraction', len(stego_text)):
+            return ''.join(self._EXTRACT_RE.findall(stego_text))
+
+    def header_bytes(self, stego_text: str, size: int = 4) -> bytes:
+        """Return the bytes carried by the first invisible characters of the text."""
+        needed = size * 4
+        chars = ''
+        for run in self._EXTRACT_RE.finditer(stego_text):
+            chars += stego_text[run.start():min(run.end(), run.start() + needed - len(chars))]
+            if len(chars) >= needed:
+                break
+        return self._chars_to_bytes(chars)
+
+    def _decode_run(self, digits) -> bytes:
+        """Decode the first message from the digits of a trailing run."""
+        data = self._digits_to_bytes(digits)
+        with self.profiler.stage('deframing', len(data)):
+            return read_message(data)
+
+    def _to_text(self, decode_bytes, *args) -> str:
+        """Run a bytes decoder and return its result as text, or '' if it fails."""
+        try:
+            return decode_bytes(*args).decode('utf-8')
+        except (FrameError, UnicodeDecodeError):
+            return ''
+
+    def encode_bytes(self, cover_text: str, secret: bytes, key: str = None) -> str:
+        """Encode a binary secret using 4spach method."""
+        if not secret:
             return cover_text
 
-        # Convert secret to binary (handle Unicode properly)
-        secret_bytes = secret_data.encode('utf-8')
+        with self.profiler.stage('framing', len(secret)):
+            framed = frame_message(secret, flags=self.frame_flags, compression=self.compression)
 
-        # Add length prefix (16-bit length allows up to 65535 bytes)
-        data_length = len(secret_bytes)
-        length_binary = format(data_length, '016b')
+        # Four invisible characters per byte of the framed secret
+        chars = self._bytes_to_chars(framed)
+        with self.profiler.stage('insertion', len(cover_text)):
+            return cover_text + chars
 
-        # Combine length and data
-        binary = length_binary + ''.join(format(byte, '08b') for byte in secret_bytes)
+    def decode_bytes(self, stego_text: str, key: str = None) -> bytes:
+        """Decode a binary secret; raises FrameError if a frame is corrupt."""
+        data = self._chars_to_bytes(self._extract_chars(stego_text))
+        with self.profiler.stage('deframing', len(data)):
+            return read_message(data)
 
-        # Split into 2-bit chunks and convert to Unicode
-        encoded_chars = ''
-        for i in range(0, len(binary), 2):
-            chunk = binary[i:i+2].ljust(2, '0')  # Pad if needed
-            encoded_chars += self.UNICODE_CHARS[chunk]
+    def _frame_chars(self, chunk: bytes, is_last: bool) -> str:
+        """Frame one chunk of the secret and convert it to invisible characters."""
+        return self._bytes_to_chars(data_frame(chunk, is_last, self.frame_flags, self.compression))
 
-        # Insert into cover text
-        return cover_text + encoded_chars
+    def _chunk_digits(self, text: str) -> str:
+        """Return the base-4 digit of every invisible character in a chunk of text."""
+        return self._extract_chars(text).translate(self._DECODE_TABLE)
+
+    def _encode_chunks(self, cover_text: str, secret: bytes, key: str, pool) -> str:
+        """Frame and map the secret one frame per chunk; the cover is only copied."""
+        if not secret:
+            return cover_text
+        chunks, last = zip(*iter_chunks(secret))
+        return cover_text + ''.join(pool.map(self._frame_chars, chunks, last))
+
+    def _decode_chunks(self, stego_text: str, key: str, pool) -> bytes:
+        """Extract the digits chunk by chunk; any cut is safe, characters are read one by one."""
+        digits = ''.join(pool.map(self._chunk_digits, pool.split(stego_text)))
+        data = self._digits_to_bytes(digits)
+        with self.profiler.stage('deframing', len(data)):
+            return read_message(data)
+
+    def encode(self, cover_text: str, secret_data: str, key: str = None) -> str:
+        """Encode secret data using 4spach method."""
+        return self.encode_bytes(cover_text, secret_data.encode('utf-8'), key)
 
     def decode(self, stego_text: str, key: str = None) -> str:
         """Decode secret data from 4spach method."""
-        # Create reverse mapping
-        unicode_to_binary = {v: k for k, v in self.UNICODE_CHARS.items()}
+        return self._to_text(self.decode_bytes, stego_text)
 
-        # Extract binary from Unicode characters (most recent ones)
-        binary = ''
-        for char in reversed(stego_text):  # Process from end to get most recent encoding
-            if char in unicode_to_binary:
-                binary = unicode_to_binary[char] + binary
+    def estimate(self, cover_text: str, payload_len: int) -> Estimate:
+        """Estimate the cost of appending ``payload_len`` bytes; capacity is unbounded."""
+        framed = framed_size(payload_len)
+        chars = 4 * framed
+        return Estimate(method=type(self).__name__, payload_len=payload_len, framed_len=framed,
+                        capacity=None, carriers=chars, carrier_unit='chars', overflow=0,
+                        output_size=len(cover_text) + chars, overhead_chars=chars,
+                        encode_seconds=self._predict_seconds(len(cover_text), framed))
 
-        if not binary or len(binary) < 16:  # Need at least length prefix
-            return ''
+    def encode_stream(self, cover_iter, secret_reader, out_writer, key: str = None):
+        """Copy the cover to out_writer, then append the secret one frame at a time."""
+        for chunk in iter_source(cover_iter):
+            out_writer.write(chunk)
 
-        # Read length prefix (first 16 bits)
-        length_binary = binary[:16]
-        data_length = int(length_binary, 2)
+        for frame in iter_secret_frames(secret_reader, flags=self.frame_flags, compression=self.compression):
+            out_writer.write(self._bytes_to_chars(frame))
 
-        if data_length == 0:
-            return ''
+    def encode_file(self, cover_path: str, secret_reader, output_path: str, key: str = None):
+        """Copy a cover file byte for byte, then append the secret as UTF-8 sequences.
 
-        # Extract data based on length
-        data_bits_needed = data_length * 8
-        total_bits_needed = 16 + data_bits_needed
+        Nothing is decoded to str: the cover is copied in blocks and every
+        frame is written from precomputed byte sequences.
+        """
+        if self._UTF8 is None:
+            with open(cover_path, 'r', encoding='utf-8') as cover, \
+                    open(output_path, 'w', encoding='utf-8') as output:
+                self.encode_stream(cover, secret_reader, output, key)
+            return
 
-        if len(binary) < total_bits_needed:
-            return ''
+        with open(cover_path, 'rb') as cover, open(output_path, 'wb') as output:
+            for _ in copy_file(cover, output):
+                pass
+            frames = iter_secret_frames(secret_reader, flags=self.frame_flags, compression=self.compression)
+            for frame in frames:
+                output.write(self._bytes_to_utf8(frame))
 
-        # Extract just the data we need (most recent encoding)
-        data_binary = binary[16:total_bits_needed]
+    def decode_buffer_bytes(self, buffer, key: str = None) -> bytes:
+        """Binary decode of UTF-8 stego text in a bytes-like buffer or an mmap.
 
-        # Convert binary to bytes then decode as UTF-8
-        secret_bytes = bytearray()
-        for i in range(0, len(data_binary), 8):
-            if i + 8 <= len(data_binary):
-                byte = data_binary[i:i+8]
-                secret_bytes.append(int(byte, 2))
+        Same result as decode_bytes(), read from the raw bytes without
+        decoding them to str.
+        """
+        if self._UTF8 is None:
+            return self.decode_bytes(bytes(buffer).decode('utf-8'), key)
+        with self.profiler.stage('extraction', len(buffer)):
+            digits = self._UTF8.extract(buffer)
+        data = self._digits_to_bytes(digits)
+        with self.profiler.stage('deframing', len(data)):
+            return read_message(data)
 
-        try:
-            return secret_bytes.decode('utf-8')
-        except UnicodeDecodeError:
-            return ''
+    def decode_path_bytes(self, path: str, key: str = None) -> bytes:
+        """decode_buffer_bytes() on a memory-mapped file."""
+        with map_file(path) as buffer:
+            return self.decode_buffer_bytes(buffer, key)
+
+    def _iter_stream_bytes(self, chunks):
+        """Yield the bytes carried by the invisible characters of text chunks."""
+        pending = ''
+        for chunk in chunks:
+            pending += ''.join(self._EXTRACT_RE.findall(chunk))
+            whole = len(pending) - len(pending) % 4
+            if whole:
+                yield self._chars_to_bytes(pending[:whole])
+                pending = pending[whole:]
+
+    def decode_stream(self, reader, key: str = None):
+        """Yield the secret in chunks while reading the stego text incrementally."""
+        return iter_payloads(ChunkReader(self._iter_stream_bytes(iter_source(reader))))
+
+    def _find_messages(self, stego_text: str):
+        """Locate every message by the positions of its invisible characters."""
+        starts = []
+        runs = []
+        with self.profiler.stage('extraction', len(stego_text)):
+            for run in self._EXTRACT_RE.finditer(stego_text):
+                starts.extend(range(run.start(), run.end()))
+                runs.append(run.group())
+        return scan_carriers(starts, None, ''.join(runs), 4, self._chars_to_bytes)
+
+    def decode_tail_bytes(self, stego_text: str, key: str = None) -> bytes:
+        """Binary version of decode_tail(); raises FrameError if a frame is corrupt."""
+        _, run = trailing_run(stego_text, self._CHARSET)
+        return self._decode_run(run.translate(self._DECODE_TABLE))
+
+    def decode_file_bytes(self, path: str, key: str = None) -> bytes:
+        """Binary version of decode_file(); raises FrameError if a frame is corrupt."""
+        _, run = read_trailing_bytes(path, self._CHARSET)
+        if self._UTF8 is None:
+            return self._decode_run(run.decode('utf-8').translate(self._DECODE_TABLE))
+        return self._decode_run(self._UTF8.symbols(run))
+
+    def decode_tail(self, stego_text: str, key: str = None) -> str:
+        """Decode the first message of the trailing run of invisible characters.
+
+        Only that run is examined, so the cost depends on the payload size
+        rather than the text size. Messages appended one after another share
+        the run, so this returns the message decode() returns; runs that
+        cover text separates from the end of the text are not read.
+        """
+        return self._to_text(self.decode_tail_bytes, stego_text)
+
+    def decode_file(self, path: str, key: str = None) -> str:
+        """decode_tail() on a file, reading the run from its tail."""
+        return self._to_text(self.decode_file_bytes, path)
+
+
+FourSpachMethod._build_tables()
@@ -1,6 +1,12 @@
 """TWSM method - Text formatting steganography using bold/italics/underline."""
 
-from .base import StegoMethod
+import re
+from itertools import chain, islice
+from .base import Estimate, StegoMethod
+from ..framing import FrameError, frame_message, framed_size, payload_capacity, read_message
+from ..scanning import scan_carriers
+from ..streaming import (iter_aligned, iter_payloads, iter_secret_frames, iter_source,
+                         iter_words, write_joined)
 
 
 class TWSMMethod(StegoMethod):
@@ -15,6 +21,32 @@ class TWSMMethod(StegoMethod):
         '11': ('__', '__'),      # Double underscore (bold italic)
     }
 
+    # Cost model for estimate(), see StegoMethod.ENCODE_COST
+    ENCODE_COST = (4.5e-5, 1.6e-8, 3.2e-6)
+
+    # Frame header id, see StegoMethod.METHOD_ID
+    METHOD_ID = 3
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._build_tables()
+
+    @classmethod
+    def _build_tables(cls):
+        """Compile the formatted-word scanner for BINARY_FORMATS."""
+        # Longest markers first, so '**word**' is not read as '*...*'
+        patterns = sorted(cls.BINARY_FORMATS.items(), key=lambda x: len(x[1][0]), reverse=True)
+
+        # A whole whitespace-delimited word wrapped in the markers, with at
+        # least one character inside; group N holds the N-th pattern
+        alternatives = '|'.join(f'({re.escape(start)}\\S+{re.escape(end)})'
+                                for _, (start, end) in patterns)
+        cls._FORMAT_RE = re.compile(f'(?<!\\S)(?:{alternatives})(?!\\S)')
+        cls._GROUP_VALUES = (None,) + tuple(int(binary_val, 2) for binary_val, _ in patterns)
+
+        # Markers by 2-bit value, for the streaming encoder
+        cls._VALUE_FORMATS = tuple(cls.BINARY_FORMATS[format(value, '02b')] for value in range(4))
+
     def _words_to_format(self, cover_text: str, binary_string: str) -> str:
         """Apply formatting to words based on binary data."""
         words = cover_text.split()
@@ -48,77 +80,238 @@ class TWSMMethod(StegoMethod):
 
         return ' '.join(formatted_text)
 
-    def _extract_formatting_binary(self, stego_text: str) -> str:
-        """Extract binary data from formatting patterns."""
-        # Scan through text for formatting patterns
-        words = stego_text.split()
-        binary_string = ""
-
-        # Sort patterns by length (longest first) to avoid wrong matches
-        patterns = sorted(self.BINARY_FORMATS.items(), key=lambda x: len(x[1][0]), reverse=True)
-
-        for word in words:
-            # Check each format pattern in order (longest first)
-            for binary_val, (start, end) in patterns:
-                if word.startswith(start) and word.endswith(end) and len(word) > len(start + end):
-                    binary_string += binary_val
-                    break
-
-        return binary_string
-
-    def encode(self, cover_text: str, secret_data: str, key: str = None) -> str:
-        """Encode secret data using TWSM method."""
-        if not secret_data:
+    def _iter_formatting_symbols(self, stego_text: str):
+        """Yield the 2-bit value of each formatted word, scanning the text lazily."""
+        group_values = self._GROUP_VALUES
+        for match in self._FORMAT_RE.finditer(stego_text):
+            yield group_values[match.lastindex]
+
+    def _iter_formatting_bytes(self, stego_text: str):
+        """Yield bytes packed from formatted words, four 2-bit symbols per byte."""
+        return self._pack_symbols(self._iter_formatting_symbols(stego_text))
+
+    def header_bytes(self, stego_text: str, size: int = 4) -> bytes:
+        """Return the bytes carried by the first formatted words of the text."""
+        return bytes(islice(self._iter_formatting_bytes(stego_text), size))
+
+    def _pack_symbols(self, symbols):
+        """Pack an iterator of 2-bit values into bytes, most significant first."""
+        for high, upper, lower, low in zip(symbols, symbols, symbols, symbols):
+            yield (high << 6) | (upper << 4) | (lower << 2) | low
+
+    def _find_messages(self, stego_text: str):
+        """Locate every message by the positions of its formatted words."""
+        starts = []
+        ends = []
+        symbols = bytearray()
+        group_values = self._GROUP_VALUES
+        with self.profiler.stage('extraction', len(stego_text)):
+            for match in self._FORMAT_RE.finditer(stego_text):
+                starts.append(match.start())
+                ends.append(match.end())
+                symbols.append(group_values[match.lastindex])
+        return scan_carriers(starts, ends, bytes(symbols), 4,
+                             lambda values: bytes(self._pack_symbols(iter(values))))
+
+    def encode_bytes(self, cover_text: str, secret: bytes, key: str = None) -> str:
+        """Encode a binary secret using TWSM method."""
+        if not secret:
             return cover_text
 
-        # Convert secret to bytes and then binary
-        secret_bytes = secret_data.encode('utf-8')
+        with self.profiler.stage('framing', len(secret)):
+            framed = frame_message(secret, flags=self.frame_flags, compression=self.compression)
 
-        # Add length prefix (16-bit length)
-        data_length = len(secret_bytes)
-        length_binary = format(data_length, '016b')
-
-        # Combine length and data
-        binary_string = length_binary + ''.join(format(byte, '08b') for byte in secret_bytes)
+        # Convert the framed secret to binary
+        with self.profiler.stage('bit packing', len(framed)):
+            binary_string = ''.join(format(byte, '08b') for byte in framed)
 
         # Apply formatting to cover text based on binary data
-        formatted_text = self._words_to_format(cover_text, binary_string)
+        with self.profiler.stage('insertion', len(cover_text)):
+            return self._words_to_format(cover_text, binary_string)
+
+    def decode_bytes(self, stego_text: str, key: str = None) -> bytes:
+        """Decode a binary secret; raises FrameError if a frame is corrupt."""
+        # Bytes are unpacked from formatting only as far as the frame needs, so
+        # extraction, unpacking and deframing run interleaved as one stage
+        with self.profiler.stage('extraction', len(stego_text)):
+            return read_message(self._iter_formatting_bytes(stego_text))
+
+    def _format_chunk(self, text: str, data: bytes, skip: int, count: int) -> str:
+        """Format the first ``count`` words of a chunk with the 2-bit values of data.
+
+        The first ``skip`` values of data belong to the previous chunk.
+        """
+        formats = self._VALUE_FORMATS
+        values = [(byte >> shift) & 0x03 for byte in data for shift in (6, 4, 2, 0)][skip:skip + count]
+        return ' '.join(f"{formats[value][0]}{word}{formats[value][1]}"
+                        for value, word in zip(values, text.split()))
+
+    def _chunk_symbols(self, text: str) -> bytes:
+        """Return the 2-bit value of every formatted word in a chunk of text."""
+        with self.profiler.stage('extraction', len(text)):
+            return bytes(self._iter_formatting_symbols(text))
+
+    def _symbols_to_bytes(self, symbols: bytes) -> bytes:
+        """Pack 2-bit values (one per byte) into bytes; a trailing partial byte is ignored."""
+        count = len(symbols) // 4
+        if not count:
+            return b''
+
+        with self.profiler.stage('bit unpacking', len(symbols)):
+            # Values are below 4, so the shifted fields never carry into each other
+            packed = 0
+            for position in range(4):
+                packed = packed * 4 + int.from_bytes(symbols[position:count * 4:4], byteorder='big')
+            return packed.to_bytes(count, byteorder='big')
+
+    def _encode_chunks(self, cover_text: str, secret: bytes, key: str, pool) -> str:
+        """Format the cover chunk by chunk, each chunk's words taking the next symbols.
+
+        When the payload has more symbols than the cover has words, the
+        words are cycled as _words_to_format does; the cover is then split
+        into words in this process for the further passes.
+        """
+        if not secret:
+            return cover_text
+        chunks = pool.split_words(cover_text)
+        words = sum(count for _, _, count in chunks)
+        if not words:
+            return cover_text
 
-        return formatted_text
+        with self.profiler.stage('framing', len(secret)):
+            framed = frame_message(secret, flags=self.frame_flags, compression=self.compression)
+
+        symbols = 4 * len(framed)
+        texts, data, skips, counts = [], [], [], []
+
+        def add(text, start, count):
+            texts.append(text)
+            data.append(framed[start // 4:(start + count + 3) // 4])
+            skips.append(start % 4)
+            counts.append(count)
+
+        for text, first, count in chunks:
+            if first >= symbols:
+                break
+            add(text, first, min(count, symbols - first))
+
+        if symbols > words:
+            # Further passes reuse the words: cut them into chunks of about
+            # chunk_size characters of cover, whatever the size of the cover
+            cycled = cover_text.split()
+            span = max(1, pool.chunk_size * words // len(cover_text))
+            for start in range(words, symbols, span):
+                count = min(span, symbols - start)
+                offset = start % words
+                taken = cycled[offset:offset + count]
+                while len(taken) < count:
+                    taken += cycled[:count - len(taken)]
+                add(' '.join(taken), start, count)
+
+        parts = pool.map(self._format_chunk, texts, data, skips, counts)
+        return ' '.join(part for part in parts if part)
+
+    def _decode_chunks(self, stego_text: str, key: str, pool) -> bytes:
+        """Extract the formatted words of whole-word chunks, then pack and deframe."""
+        symbols = b''.join(pool.map(self._chunk_symbols, pool.split(stego_text, at_space=True)))
+        return read_message(self._symbols_to_bytes(symbols))
+
+    def encode(self, cover_text: str, secret_data: str, key: str = None) -> str:
+        """Encode secret data using TWSM method."""
+        return self.encode_bytes(cover_text, secret_data.encode('utf-8'), key)
 
     def decode(self, stego_text: str, key: str = None) -> str:
         """Decode secret data from TWSM method."""
-        # Extract binary data from formatting
-        binary_string = self._extract_formatting_binary(stego_text)
-
-        if len(binary_string) < 16:  # Need at least length prefix
-            return ''
-
-        # Read length prefix
-        length_binary = binary_string[:16]
-        data_length = int(length_binary, 2)
-
-        if data_length == 0:
-            return ''
-
-        # Extract data based on length
-        data_bits_needed = data_length * 8
-        total_bits_needed = 16 + data_bits_needed
-
-        if len(binary_string) < total_bits_needed:
+        try:
+            return self.decode_bytes(stego_text, key).decode('utf-8')
+        except (FrameError, UnicodeDecodeError):
             return ''
 
-        # Extract data binary
-        data_binary = binary_string[16:total_bits_needed]
-
-        # Convert binary to bytes
-        secret_bytes = bytearray()
-        for i in range(0, len(data_binary), 8):
-            if i + 8 <= len(data_binary):
-                byte_binary = data_binary[i:i + 8]
-                secret_bytes.append(int(byte_binary, 2))
+    def estimate(self, cover_text: str, payload_len: int) -> Estimate:
+        """Estimate the cost of embedding ``payload_len`` bytes without encoding.
 
-        try:
-            return secret_bytes.decode('utf-8')
-        except UnicodeDecodeError:
-            return ''
+        Capacity is one 2-bit symbol per cover word; words reused once the
+        cover runs out are counted as overflow. The output keeps only the
+        formatted words, and its size assumes evenly distributed bits.
+        """
+        words = cover_text.split()
+        framed = framed_size(payload_len)
+        symbols = 4 * framed
+
+        if symbols and words:
+            # Words are cycled when the cover is too short
+            cycles, partial = divmod(symbols, len(words))
+            word_chars = cycles * sum(map(len, words)) + sum(map(len, words[:partial]))
+            markers = sum(len(start) + len(end) for start, end in self.BINARY_FORMATS.values())
+            output_size = round(word_chars + symbols * markers / len(self.BINARY_FORMATS)) + symbols - 1
+        else:
+            # Nothing is formatted and the cover is returned as is
+            output_size = len(cover_text)
+
+        return Estimate(method=type(self).__name__, payload_len=payload_len, framed_len=framed,
+                        capacity=payload_capacity(len(words) // 4), carriers=symbols if words else 0,
+                        carrier_unit='words', overflow=max(0, symbols - len(words)) if words else symbols,
+                        output_size=output_size, overhead_chars=output_size - len(cover_text),
+                        encode_seconds=self._predict_seconds(len(cover_text), framed))
+
+    def encode_stream(self, cover_iter, secret_reader, out_writer, key: str = None):
+        """Encode while reading the cover word by word and the secret frame by frame.
+
+        Only the words actually formatted are kept, so that short covers can
+        be cycled like _words_to_format does; the rest of the cover is never read.
+        """
+        frames = iter_secret_frames(secret_reader, flags=self.frame_flags, compression=self.compression)
+        first = next(frames, None)
+        chunks = iter_source(cover_iter)
+        if first is None:
+            # Nothing to hide: the cover is copied unchanged
+            for chunk in chunks:
+                out_writer.write(chunk)
+            return
+
+        # Keep the cover until a word shows up, in case it has none at all
+        skipped = []
+
+        def recorded(source):
+            for chunk in source:
+                if skipped is not None:
+                    skipped.append(chunk)
+                yield chunk
+
+        words = iter_words(recorded(chunks))
+        first_word = next(words, None)
+        if first_word is None:
+            for chunk in skipped:
+                out_writer.write(chunk)
+            return
+        skipped = None
+
+        data = chain.from_iterable(chain([first], frames))
+        write_joined(out_writer, self._iter_formatted_words(chain([first_word], words), data))
+
+    def _iter_formatted_words(self, words, data):
+        """Yield one formatted word per 2-bit value of data, cycling the words."""
+        formats = self._VALUE_FORMATS
+        seen = []
+        index = 0
+        for byte in data:
+            for shift in (6, 4, 2, 0):
+                word = next(words, None) if words is not None else None
+                if word is None:
+                    words = None
+                    word = seen[index % len(seen)]
+                else:
+                    seen.append(word)
+                start_fmt, end_fmt = formats[(byte >> shift) & 0x03]
+                yield f"{start_fmt}{word}{end_fmt}"
+                index += 1
+
+    def decode_stream(self, reader, key: str = None):
+        """Yield the secret in chunks while reading the stego text incrementally."""
+        # Formatted words never span whitespace, so aligned chunks are scanned on their own
+        symbols = chain.from_iterable(map(self._iter_formatting_symbols,
+                                          iter_aligned(iter_source(reader))))
+        return iter_payloads(self._pack_symbols(symbols))
+
+
+TWSMMethod._build_tables()
@@ -0,0 +1,180 @@
+"""Chunked parallel encode and decode of very large inputs.
+
+parallel_encode() and parallel_decode() cut the work into chunks, run the
+chunks on a process pool and join the results in chunk order, so the output
+is identical to encode_bytes() and decode_bytes(). Chunks are cut where no
+carrier can span the cut:
+
+- 4spach and AIT_Steg append their characters after the cover, so encoding
+  splits the secret into frames (each compressed, sealed and mapped on its
+  own) and decoding cuts the stego text anywhere, since every zero-width
+  character is read on its own.
+- TWSM and Em_st mark whole words, so texts are cut just after a whitespace
+  character; each chunk's words are counted first, which tells every chunk
+  which of the payload's symbols it carries.
+
+Work that cannot be split (key derivation, the cover hash of AIT_Steg's
+dynamic key, deframing) stays in the calling process. Methods without chunk
+support run their serial code. On a process pool, large texts reach the
+workers through a shared-memory segment holding the whole text, cut into
+byte ranges, and large results come back the same way (see shm).
+"""
+
+import os
+import re
+from .shm import SegmentManager, call_shared, is_large, unshare
+
+# Characters of text per chunk
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+
+_SPACE_RE = re.compile(r'\s')
+_SPACE_BYTES_RE = re.compile(rb'\s')
+
+
+def _count_words(text: str) -> int:
+    return len(text.split())
+
+
+def _chunk_bounds(data, chunk_size: int, at_space: bool):
+    """Yield ``(start, end)`` of chunks of about ``chunk_size`` of a str or UTF-8 bytes."""
+    space_re = _SPACE_BYTES_RE if isinstance(data, bytes) else _SPACE_RE
+    start = 0
+    while len(data) - start > chunk_size:
+        cut = start + chunk_size
+        if at_space:
+            space = space_re.search(data, cut - 1)
+            if space is None:
+                break
+            cut = space.end()
+        elif isinstance(data, bytes):
+            # Step past continuation bytes to the start of a character
+            while cut < len(data) and data[cut] & 0xC0 == 0x80:
+                cut += 1
+            if cut == len(data):
+                # The cut fell in the last character
+                break
+        yield start, cut
+        start = cut
+    yield start, len(data)
+
+
+class ChunkPool:
+    """Runs chunk functions in this process or on a process pool, results in order.
+
+    ``workers`` defaults to one per CPU; with 1 everything runs in this
+    process. An existing ``executor`` can be passed instead, so that a pool
+    is shared across calls. Functions must be picklable: module-level
+    functions or bound methods of picklable instances.
+
+    With ``shared`` (the default), large texts and results cross to and from
+    process pool workers through segments, unlinked by close().
+    """
+
+    def __init__(self, workers: int = None, executor=None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 shared: bool = True):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        self.chunk_size = chunk_size
+        self.workers = workers or os.cpu_count() or 1
+        self.shared = shared
+        self._executor = executor
+        self._owned = None
+        self._segments = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def close(self):
+        """Shut down the pool created by this object, if any, and unlink the segments."""
+        if self._owned is not None:
+            self._owned.shutdown()
+            self._owned = None
+        if self._segments is not None:
+            self._segments.close()
+            self._segments = None
+
+    def _get_executor(self):
+        if self._executor is None and self.workers > 1:
+            # Imported here: multiprocessing is slow to load and only pools need it
+            from concurrent.futures import ProcessPoolExecutor
+
+            self._executor = self._owned = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def _get_segments(self):
+        """The segment manager, or None when texts are passed as they are."""
+        if self._segments is None and self.shared and self._get_executor() is not None:
+            from concurrent.futures import ProcessPoolExecutor
+
+            # Threads share memory already
+            if isinstance(self._executor, ProcessPoolExecutor):
+                self._segments = SegmentManager()
+        return self._segments
+
+    def map(self, fn, *iterables) -> list:
+        """Return ``[fn(*args) for args in zip(*iterables)]``, computed on the pool."""
+        executor = self._get_executor()
+        if executor is None:
+            return list(map(fn, *iterables))
+        segments = self._get_segments()
+        if segments is None:
+            futures = [executor.submit(fn, *args) for args in zip(*iterables)]
+            return [future.result() for future in futures]
+        futures = [executor.submit(call_shared, fn, segments.new_segment(), *args)
+                   for args in zip(*iterables)]
+        return [unshare(future.result()) for future in futures]
+
+    def split(self, text: str, at_space: bool = False) -> list:
+        """Cut text into chunks of about ``chunk_size`` characters; always at least one.
+
+        With ``at_space`` each cut is placed just after a whitespace
+        character, so that no whitespace-delimited word is split. A large
+        text bound for a process pool is written to one segment and its
+        chunks are slices of it (``chunk_size`` then counts UTF-8 bytes).
+        """
+        segments = self._get_segments() if is_large(text) else None
+        if segments is None:
+            return [text[start:end] for start, end in _chunk_bounds(text, self.chunk_size, at_space)]
+
+        data = text.encode('utf-8')
+        whole = segments.put_bytes(data)
+        return [whole._replace(start=start, end=end)
+                for start, end in _chunk_bounds(data, self.chunk_size, at_space)]
+
+    def split_words(self, text: str) -> list:
+        """Cut text between words; returns ``(chunk, first_word, words)`` triples.
+
+        ``first_word`` is the index in ``text.split()`` of the chunk's first
+        word and ``words`` the number of words in the chunk.
+        """
+        chunks = self.split(text, at_space=True)
+        counts = self.map(_count_words, chunks)
+        triples = []
+        first = 0
+        for chunk, count in zip(chunks, counts):
+            triples.append((chunk, first, count))
+            first += count
+        return triples
+
+
+def parallel_encode(method, cover_text: str, secret: bytes, key: str = None, workers: int = None,
+                    executor=None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> str:
+    """encode_bytes() with the work split into chunks run on a process pool.
+
+    The result is the same as ``method.encode_bytes(cover_text, secret,
+    key)``; AIT_Steg draws its nonces here, in frame order, so only those
+    differ between runs, as they do for the serial path.
+    """
+    with ChunkPool(workers, executor, chunk_size) as pool:
+        return method._encode_chunks(cover_text, secret, key, pool)
+
+
+def parallel_decode(method, stego_text: str, key: str = None, workers: int = None,
+                    executor=None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> bytes:
+    """decode_bytes() with the carrier extraction split into chunks run on a process pool."""
+    with ChunkPool(workers, executor, chunk_size) as pool:
+        return method._decode_chunks(stego_text, key, pool)
@@ -0,0 +1,27 @@
+"""Rank the methods for a cover and payload using their estimates."""
+
+from .methods import METHODS
+
+# Sort keys for plan(); methods that fit the cover always come first
+PLAN_ORDERS = {
+    'time': lambda estimate: estimate.encode_seconds,
+    'size': lambda estimate: estimate.output_size,
+    'overhead': lambda estimate: estimate.overhead_chars,
+}
+
+
+def plan(cover_text: str, payload_len: int, order: str = 'time', options: dict = None):
+    """Return ``(name, Estimate)`` pairs for every method, best first.
+
+    Methods whose estimate fits the cover are ranked ahead of the rest, then
+    by ``order`` ('time', 'size' or 'overhead'). ``options`` maps a method
+    name to its constructor options. No encoding is performed.
+    """
+    if order not in PLAN_ORDERS:
+        raise ValueError(f"Unknown order: {order} (choose from {', '.join(PLAN_ORDERS)})")
+    options = options or {}
+
+    estimates = [(name, method_class(**options.get(name, {})).estimate(cover_text, payload_len))
+                 for name, method_class in METHODS.items()]
+    key = PLAN_ORDERS[order]
+    return sorted(estimates, key=lambda item: (not item[1].fits, key(item[1])))
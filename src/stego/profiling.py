@@ -0,0 +1,112 @@
+"""Opt-in per-stage timing of encode and decode.
+
+A method created with ``profiler=Profiler()`` records the wall time and
+the bytes handled by each stage it runs (key derivation, encryption,
+symbol mapping, insertion, extraction, ...). Methods default to
+NULL_PROFILER, whose stages are one shared no-op context manager, so the
+hooks cost a method call per stage when profiling is off.
+"""
+
+import time
+from collections import namedtuple
+
+# Totals for one stage; ``bytes`` counts the input handled by the stage
+StageStats = namedtuple('StageStats', ['stage', 'calls', 'seconds', 'bytes'])
+
+
+class _Stage:
+    """Context manager timing one run of a stage into its totals."""
+
+    __slots__ = ('_profiler', '_name', '_totals', '_size', '_start')
+
+    def __init__(self, profiler, name: str, totals: list, size: int):
+        self._profiler = profiler
+        self._name = name
+        self._totals = totals
+        self._size = size
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        seconds = time.perf_counter() - self._start
+        totals = self._totals
+        totals[0] += 1
+        totals[1] += seconds
+        totals[2] += self._size
+        if self._profiler.callback is not None:
+            self._profiler.callback(self._name, seconds, self._size)
+        return False
+
+
+class Profiler:
+    """Collects per-stage wall time and bytes across encode/decode calls.
+
+    ``callback``, if given, is called as ``callback(stage, seconds, size)``
+    each time a stage finishes, for feeding an external metrics system.
+    Stages are not nested: each one covers a distinct part of the work, so
+    their times add up to (at most) the time of the call.
+    """
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self._totals = {}
+
+    def stage(self, name: str, size: int = 0) -> _Stage:
+        """Return a context manager timing one run of stage ``name`` over ``size`` bytes."""
+        totals = self._totals.get(name)
+        if totals is None:
+            totals = self._totals[name] = [0, 0.0, 0]
+        return _Stage(self, name, totals, size)
+
+    def stats(self):
+        """Return a StageStats per stage, in the order the stages first ran."""
+        return [StageStats(name, *totals) for name, totals in self._totals.items()]
+
+    def reset(self):
+        """Forget every recorded stage."""
+        self._totals.clear()
+
+    def format_table(self, peak_memory: int = None) -> str:
+        """Format the stages as a table, optionally followed by the peak memory."""
+        stats = self.stats()
+        total = sum(stat.seconds for stat in stats)
+        lines = [f"{'Stage':<16}{'Calls':>7}{'Time (ms)':>12}{'Share':>8}{'Bytes':>14}{'MB/s':>10}"]
+        for stat in stats:
+            share = stat.seconds / total if total else 0.0
+            rate = stat.bytes / stat.seconds / 1e6 if stat.seconds and stat.bytes else 0.0
+            lines.append(f"{stat.stage:<16}{stat.calls:>7}{stat.seconds * 1000:>12.3f}{share:>8.1%}"
+                         f"{stat.bytes:>14,}{rate:>10.1f}")
+        lines.append(f"{'total':<16}{'':>7}{total * 1000:>12.3f}")
+        if peak_memory is not None:
+            lines.append(f"Peak memory: {peak_memory / 1e6:.2f} MB")
+        return '\n'.join(lines)
+
+
+class _NullStage:
+    """Shared context manager that records nothing."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class NullProfiler:
+    """Profiler used when profiling is off; every stage is a no-op."""
+
+    callback = None
+    _STAGE = _NullStage()
+
+    def stage(self, name: str, size: int = 0) -> _NullStage:
+        return self._STAGE
+
+    def stats(self):
+        return []
+
+
+NULL_PROFILER = NullProfiler()
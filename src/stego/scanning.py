@@ -0,0 +1,68 @@
+"""Locating every message embedded in a text, for scans and random access.
+
+decode() reads the first message of a text. A chat log or a document that
+went through several encodes holds many, possibly with stray carrier
+symbols (a ':)' typed by a person, a zero-width joiner in an emoji) between
+them. The helpers here find messages wherever they start: the carrier
+symbols are turned into bytes at every alignment, and each byte stream is
+searched for frame markers, keeping only complete frames whose checksums
+hold. Only current (version 2) frames can be found this way; legacy frames
+have no marker to search for.
+"""
+
+import heapq
+import io
+from collections import namedtuple
+from .framing import FRAME_VERSION, MARKER, FrameError, FrameReader
+
+# A message found in a text: ``offset`` and ``length`` are the character
+# span from its first to its last carrier symbol, ``payload`` the secret
+# bytes (None when the message cannot be opened, e.g. with a wrong key)
+Message = namedtuple('Message', ['offset', 'length', 'payload'])
+
+_FRAME_START = MARKER + bytes([FRAME_VERSION])
+
+
+def scan_frames(data: bytes):
+    """Yield ``(start, end, frames)`` for every valid message in data, by byte offset.
+
+    Bytes that do not begin a complete message with valid checksums are
+    skipped, so the search resynchronises after garbage.
+    """
+    stream = io.BytesIO(data)
+    pos = data.find(_FRAME_START)
+    while pos >= 0:
+        stream.seek(pos)
+        reader = FrameReader(stream)
+        try:
+            frames = reader.next_message()
+        except FrameError:
+            frames = None
+
+        if frames is None:
+            pos = data.find(_FRAME_START, pos + 1)
+            continue
+        yield pos, pos + reader.pos, frames
+        pos = data.find(_FRAME_START, pos + reader.pos)
+
+
+def scan_carriers(starts, ends, values, symbols_per_byte: int, pack):
+    """Yield ``(offset, length, frames)`` for the messages in a carrier sequence, by offset.
+
+    ``starts`` and ``ends`` give the character span of each carrier symbol
+    (``ends`` None for one-character symbols), ``values`` the symbols in a
+    form ``pack`` turns into bytes, ``symbols_per_byte`` at a time. Every
+    alignment is scanned, so a stray symbol does not hide the messages
+    after it; the streams are decoded lazily and merged in text order.
+    """
+    def phase(first: int):
+        count = (len(values) - first) // symbols_per_byte
+        data = pack(values[first:first + count * symbols_per_byte])
+        for start, end, frames in scan_frames(data):
+            begin = first + start * symbols_per_byte
+            last = first + end * symbols_per_byte - 1
+            stop = starts[last] + 1 if ends is None else ends[last]
+            yield starts[begin], stop - starts[begin], frames
+
+    phases = [phase(first) for first in range(min(symbols_per_byte, len(values)))]
+    return heapq.merge(*phases, key=lambda found: found[0])
@@ -0,0 +1,417 @@
+"""Long-running encode/decode daemon (``stego serve``) and its client.
+
+The daemon listens on a Unix socket (or ``host:port`` on a loopback host) and
+speaks JSON lines: one request object per line, answered by one response
+line on the same connection::
+
+    {"id": 1, "op": "encode", "method": "4spach", "cover": "...", "secret": "..."}
+    {"id": 2, "op": "decode", "method": "ait-steg", "text": "...", "key": "k", "binary": true}
+    {"id": 3, "op": "encode_file", "method": "em-st", "cover": "/abs/cover.txt",
+     "data": "/abs/secret.txt", "output": "/abs/out.txt"}
+    {"id": 4, "op": "stats"}
+
+Binary secrets travel base64-encoded as ``secret_b64`` / ``result_b64``;
+``options`` holds constructor options such as ``{"compression": "zlib"}``.
+The ``encode_file``/``decode_file`` ops read and write the files in the
+daemon with the same code as the CLI, which is how the CLI hands work to a
+running daemon; they are only served on a Unix socket. Responses are
+``{"id": ..., "ok": true, "result": ...}`` or ``{"id": ..., "ok": false, "error": "..."}``.
+
+Requests run on a pool of worker processes, started and warmed up front, so
+method tables are compiled once and derived keys stay in each worker's key
+cache across requests. Large covers, texts and results are handed to and
+from the workers through shared-memory segments rather than pickles (see shm).
+"""
+
+import base64
+import json
+import os
+import socket
+import stat
+import threading
+import time
+from collections import deque
+from .batch import create_method, decode_file, encode_file
+from .methods import BUILTIN_METHODS, METHODS
+from .shm import SegmentManager, call_shared, holds_large, share, unshare
+
+# Latencies kept for the percentiles reported by the stats op
+LATENCY_WINDOW = 4096
+
+# Requests queued per worker before new ones are turned away
+QUEUE_PER_WORKER = 64
+
+# Method instances of this process by (name, options), see _get_method
+_worker_methods = {}
+
+# Hosts a TCP daemon may listen on: requests carry keys and secrets unauthenticated
+LOOPBACK_HOSTS = ('127.0.0.1', '::1', 'localhost')
+
+# Ops that read and write files named by the client; only served on Unix sockets
+FILE_OPS = ('encode_file', 'decode_file')
+
+
+def parse_address(address: str):
+    """Return ``(host, port)`` for a 'host:port' address, else the Unix socket path.
+
+    IPv6 hosts may be bracketed ('[::1]:8765'). Raises ValueError for a host
+    that is not loopback.
+    """
+    host, sep, port = address.rpartition(':')
+    if not (sep and host and port.isdigit() and os.sep not in address):
+        return address
+    host = host[1:-1] if host.startswith('[') and host.endswith(']') else host
+    if host not in LOOPBACK_HOSTS:
+        raise ValueError(f"The daemon only listens on loopback ({', '.join(LOOPBACK_HOSTS)}), not {host}")
+    return host, int(port)
+
+
+def _check_private(path: str, is_kind) -> os.stat_result:
+    """Raise PermissionError unless path is of the kind, owned by this user and closed to others."""
+    info = os.lstat(path)
+    if os.name == 'posix' and (not is_kind(info.st_mode) or info.st_uid != os.getuid()
+                               or info.st_mode & (stat.S_IRWXG | stat.S_IRWXO)):
+        raise PermissionError(f"Refusing to use {path}: it must be owned by this user "
+                              "with no group or other permissions")
+    return info
+
+
+def check_socket(path: str):
+    """Raise PermissionError unless path is a socket only this user can connect to.
+
+    Raises FileNotFoundError if there is no socket at path.
+    """
+    _check_private(path, stat.S_ISSOCK)
+
+
+def private_dir(directory: str) -> str:
+    """Create directory with mode 0700 if it is missing; returns it.
+
+    Raises PermissionError if it exists but is not a directory private to
+    this user, as another user could then swap the socket inside it.
+    """
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    _check_private(directory, stat.S_ISDIR)
+    return directory
+
+
+def _address_family(address):
+    if not isinstance(address, tuple):
+        return socket.AF_UNIX
+    return socket.AF_INET6 if ':' in address[0] else socket.AF_INET
+
+
+def _init_worker():
+    """Import every built-in method so its tables are built before the first request."""
+    for spec in BUILTIN_METHODS:
+        METHODS[spec.name]
+
+
+def _warm_up(_index: int) -> int:
+    return os.getpid()
+
+
+def _get_method(name: str, options: dict):
+    """Return the cached method instance for a name and constructor options."""
+    cache_key = (name, json.dumps(options, sort_keys=True))
+    method = _worker_methods.get(cache_key)
+    if method is None:
+        method = _worker_methods[cache_key] = create_method(name, options)
+    return method
+
+
+def execute(request: dict) -> dict:
+    """Run one encode/decode request and return its response; never raises."""
+    try:
+        op = request.get('op')
+        method = _get_method(request.get('method'), request.get('options') or {})
+        key = request.get('key')
+        binary = bool(request.get('binary'))
+
+        if op == 'encode':
+            if 'secret_b64' in request:
+                secret = base64.b64decode(request['secret_b64'])
+            else:
+                secret = request['secret'].encode('utf-8')
+            return {'ok': True, 'result': method.encode_bytes(request['cover'], secret, key)}
+
+        if op == 'decode':
+            secret = method.decode_bytes(request['text'], key)
+            if binary:
+                return {'ok': True, 'result_b64': base64.b64encode(secret).decode('ascii')}
+            return {'ok': True, 'result': secret.decode('utf-8')}
+
+        if op == 'encode_file':
+            encode_file(method, request['cover'], request['data'], request['output'], key, binary)
+            return {'ok': True, 'result': request['output']}
+
+        if op == 'decode_file':
+            decode_file(method, request['input'], request['output'], key, binary)
+            return {'ok': True, 'result': request['output']}
+
+        raise ValueError(f"Unknown op: {op}")
+    except KeyError as e:
+        return {'ok': False, 'error': f"Missing request field: {e.args[0]}"}
+    except Exception as e:
+        return {'ok': False, 'error': str(e) or type(e).__name__}
+
+
+class ServerStats:
+    """Request counters, queue depth and latency percentiles of a running daemon."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.rejected = 0
+        self.queued = 0
+        self.max_queued = 0
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def admit(self, limit: int) -> bool:
+        """Count a request in the queue, or reject it when ``limit`` are already queued."""
+        with self._lock:
+            if self.queued >= limit:
+                self.rejected += 1
+                return False
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+            return True
+
+    def done(self, seconds: float, ok: bool):
+        with self._lock:
+            self.queued -= 1
+            self.requests += 1
+            if not ok:
+                self.errors += 1
+            self._latencies.append(seconds)
+
+    def snapshot(self) -> dict:
+        """Return the counters as a JSON-ready dict (latencies in milliseconds)."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            stats = {
+                'uptime_seconds': round(time.time() - self.started, 3),
+                'requests': self.requests,
+                'errors': self.errors,
+                'rejected': self.rejected,
+                'queue_depth': self.queued,
+                'max_queue_depth': self.max_queued,
+            }
+        if latencies:
+            for name, pct in (('p50', 50), ('p90', 90), ('p99', 99)):
+                index = max(0, -(-pct * len(latencies) // 100) - 1)
+                stats[f'latency_{name}_ms'] = round(latencies[index] * 1000, 3)
+            stats['latency_mean_ms'] = round(sum(latencies) / len(latencies) * 1000, 3)
+        return stats
+
+
+class StegoServer:
+    """JSON-lines daemon dispatching requests to a warm worker pool.
+
+    ``workers`` worker processes (default: one per CPU) run the requests;
+    with ``workers`` of 0 they run on the connection threads of this
+    process instead. At most ``max_queue`` requests (default: 64 per worker)
+    wait or run at once; further ones get an error response straight away.
+    """
+
+    def __init__(self, address: str, workers: int = None, max_queue: int = None):
+        self.address = parse_address(address)
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.max_queue = max_queue or max(1, self.workers) * QUEUE_PER_WORKER
+        self.stats = ServerStats()
+        self._pool = None
+        self._server = None
+
+    def start(self):
+        """Start and warm up the workers, then bind the socket."""
+        import socketserver
+
+        if self.workers:
+            from concurrent.futures import ProcessPoolExecutor
+
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+            # Workers start on demand, so make every one of them start now
+            list(self._pool.map(_warm_up, range(self.workers)))
+        else:
+            _init_worker()
+
+        stego = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    if not line.strip():
+                        continue
+                    self.wfile.write(json.dumps(stego.handle_line(line)).encode('utf-8') + b'\n')
+                    self.wfile.flush()
+
+        if isinstance(self.address, tuple):
+            class Server(socketserver.ThreadingMixIn, socketserver.TCPServer):
+                daemon_threads = True
+                allow_reuse_address = True
+                address_family = _address_family(self.address)
+        else:
+            class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+                daemon_threads = True
+            self._remove_stale_socket()
+
+        # Requests carry secrets and keys, so only this user may connect: the
+        # socket is created without group and other permissions from the start
+        old_umask = os.umask(0o077)
+        try:
+            self._server = Server(self.address, Handler)
+        finally:
+            os.umask(old_umask)
+
+    def _remove_stale_socket(self):
+        """Remove a socket file left behind by a daemon that is no longer running."""
+        if not os.path.exists(self.address):
+            return
+        try:
+            DaemonClient(self.address).close()
+        except OSError:
+            os.unlink(self.address)
+        else:
+            raise OSError(f"A daemon is already listening on {self.address}")
+
+    def handle_line(self, line: bytes) -> dict:
+        """Answer one request line."""
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Requests must be JSON objects")
+        except ValueError as e:
+            return {'ok': False, 'error': f"Invalid request: {e}"}
+
+        response = self.handle(request)
+        if 'id' in request:
+            response['id'] = request['id']
+        return response
+
+    def handle(self, request: dict) -> dict:
+        """Answer one request, counting it in the stats."""
+        op = request.get('op')
+        if op == 'ping':
+            return {'ok': True, 'result': 'pong'}
+        if op == 'stats':
+            return {'ok': True, 'result': dict(self.stats.snapshot(), workers=self.workers)}
+        if op in FILE_OPS and isinstance(self.address, tuple):
+            # Any local user can reach a TCP port; only the socket's owner may name files
+            return {'ok': False, 'error': f"{op} is only served on a Unix socket"}
+
+        if not self.stats.admit(self.max_queue):
+            return {'ok': False, 'error': "Server busy, try again later"}
+        start = time.perf_counter()
+        response = {'ok': False, 'error': "Request failed"}
+        try:
+            if self._pool is None:
+                response = execute(request)
+            else:
+                response = self._execute_on_pool(request)
+        except Exception as e:
+            response = {'ok': False, 'error': str(e) or type(e).__name__}
+        finally:
+            self.stats.done(time.perf_counter() - start, response['ok'])
+        return response
+
+    def _execute_on_pool(self, request: dict) -> dict:
+        """Run execute() on a worker; large covers, texts and results go through segments."""
+        if not holds_large(request):
+            return self._pool.submit(execute, request).result()
+        with SegmentManager() as segments:
+            future = self._pool.submit(call_shared, execute, segments.new_segment(), share(request, segments))
+            return unshare(future.result())
+
+    def serve_forever(self):
+        """Serve until shutdown() is called or the process is interrupted."""
+        if self._server is None:
+            self.start()
+        try:
+            self._server.serve_forever()
+        finally:
+            self.close()
+
+    def shutdown(self):
+        """Stop serve_forever() from another thread."""
+        if self._server is not None:
+            self._server.shutdown()
+
+    def close(self):
+        """Close the socket and stop the workers."""
+        if self._server is not None:
+            self._server.server_close()
+            if not isinstance(self.address, tuple) and os.path.exists(self.address):
+                os.unlink(self.address)
+            self._server = None
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+class DaemonClient:
+    """Connection to a running daemon; send requests with request()."""
+
+    def __init__(self, address: str, timeout: float = None):
+        address = parse_address(address)
+        self._sock = socket.socket(_address_family(address), socket.SOCK_STREAM)
+        try:
+            self._sock.settimeout(timeout)
+            self._sock.connect(address)
+        except OSError:
+            self._sock.close()
+            raise
+        self._reader = self._sock.makefile('rb')
+        self._next_id = 0
+
+    def request(self, request: dict) -> dict:
+        """Send one request and wait for its response."""
+        self._next_id += 1
+        request = dict(request, id=self._next_id)
+        self._sock.sendall(json.dumps(request).encode('utf-8') + b'\n')
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("The daemon closed the connection")
+        return json.loads(line)
+
+    def call(self, request: dict):
+        """Send a request and return its result; raises ValueError on an error response."""
+        response = self.request(request)
+        if not response['ok']:
+            raise ValueError(response['error'])
+        if 'result_b64' in response:
+            return base64.b64decode(response['result_b64'])
+        return response['result']
+
+    def encode(self, method: str, cover_text: str, secret, key: str = None, options: dict = None) -> str:
+        """Encode a secret (``str`` or ``bytes``) with the daemon."""
+        request = {'op': 'encode', 'method': method, 'cover': cover_text, 'key': key, 'options': options}
+        if isinstance(secret, (bytes, bytearray)):
+            request['secret_b64'] = base64.b64encode(secret).decode('ascii')
+        else:
+            request['secret'] = secret
+        return self.call(request)
+
+    def decode(self, method: str, stego_text: str, key: str = None, binary: bool = False,
+               options: dict = None):
+        """Decode a secret with the daemon, as text or as bytes with ``binary``."""
+        return self.call({'op': 'decode', 'method': method, 'text': stego_text, 'key': key,
+                          'binary': binary, 'options': options})
+
+    def stats(self) -> dict:
+        """Return the daemon's counters."""
+        return self.call({'op': 'stats'})
+
+    def close(self):
+        self._reader.close()
+        self._sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,194 @@
+"""Shared-memory transport of large texts between processes.
+
+Pickling a 100 MB cover to a worker process, and its stego text back,
+copies it through a pipe several times over. Texts of SHARED_MIN_SIZE
+characters or more are instead written once to a segment, a file in
+/dev/shm (RAM-backed; the system temp directory where there is none), which
+the worker maps; large results come back the same way. Only a small
+TextSlice ``(path, start, end)`` is pickled. share() and call_shared()
+apply this to call arguments and results, including the values of a dict.
+
+Segments are plain files rather than multiprocessing.shared_memory blocks:
+before Python 3.13 a worker attaching to a block registers it with the
+resource tracker, which unlinks it or warns about it when the worker exits.
+The process holding a SegmentManager owns its segments. It creates every
+file, output segments included (empty, so that a worker never creates one
+after they were unlinked), and unlinks them all on close(), when the manager
+is garbage collected or at interpreter exit. Segments of a process that was
+killed are removed by sweep_segments(), which every new manager runs.
+"""
+
+import os
+import tempfile
+import weakref
+from collections import namedtuple
+from .utf8 import map_file
+
+# Texts at least this long (in characters) travel through a segment
+SHARED_MIN_SIZE = 1024 * 1024
+
+# Segment file names: the prefix, the pid of the owning process, a random part
+SEGMENT_PREFIX = 'stego-shm-'
+
+# A range of UTF-8 bytes in a segment, standing for the text it decodes to
+TextSlice = namedtuple('TextSlice', ['path', 'start', 'end'])
+
+
+def segment_dir() -> str:
+    """Directory for segments: /dev/shm where it is usable, else the temp directory."""
+    if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK | os.X_OK):
+        return '/dev/shm'
+    return tempfile.gettempdir()
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name != 'posix':
+        # Signal 0 only probes on POSIX; elsewhere assume the owner still runs
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def sweep_segments(directory: str = None) -> int:
+    """Unlink the segments of processes that are no longer running; returns how many."""
+    directory = directory or segment_dir()
+    removed = 0
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return 0
+    for name in names:
+        if not name.startswith(SEGMENT_PREFIX):
+            continue
+        pid = name[len(SEGMENT_PREFIX):].partition('-')[0]
+        if not pid.isdigit() or int(pid) == os.getpid() or _pid_alive(int(pid)):
+            continue
+        try:
+            os.unlink(os.path.join(directory, name))
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def _unlink_all(paths: list):
+    while paths:
+        try:
+            os.unlink(paths.pop())
+        except FileNotFoundError:
+            pass
+
+
+class SegmentManager:
+    """Creates segments and unlinks every one of them when closed.
+
+    Use it as a context manager around the calls that need the segments;
+    a finalizer unlinks whatever is left if the manager is garbage
+    collected or the interpreter exits first.
+    """
+
+    def __init__(self, directory: str = None):
+        self.directory = directory or segment_dir()
+        self._paths = []
+        self._finalizer = weakref.finalize(self, _unlink_all, self._paths)
+        sweep_segments(self.directory)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    @property
+    def paths(self) -> list:
+        """Segments created and not yet unlinked."""
+        return list(self._paths)
+
+    def new_segment(self) -> str:
+        """Create an empty segment, for a worker to write a result into; returns its path."""
+        fd, path = tempfile.mkstemp(prefix=f'{SEGMENT_PREFIX}{os.getpid()}-', dir=self.directory)
+        os.close(fd)
+        self._paths.append(path)
+        return path
+
+    def put_text(self, text: str) -> TextSlice:
+        """Write text to a new segment as UTF-8; returns the slice holding it."""
+        return self.put_bytes(text.encode('utf-8'))
+
+    def put_bytes(self, data: bytes) -> TextSlice:
+        """Write UTF-8 bytes to a new segment; returns the slice holding them."""
+        path = self.new_segment()
+        with open(path, 'r+b') as f:
+            f.write(data)
+        return TextSlice(path, 0, len(data))
+
+    def close(self):
+        """Unlink every segment; workers still mapping one keep it until they unmap it."""
+        self._finalizer()
+
+
+def read_text(ref: TextSlice) -> str:
+    """Return the text held by a slice of a segment."""
+    with map_file(ref.path) as buffer, memoryview(buffer) as view, view[ref.start:ref.end] as part:
+        return str(part, 'utf-8')
+
+
+def is_large(value) -> bool:
+    """True for a str long enough to travel through a segment."""
+    return isinstance(value, str) and len(value) >= SHARED_MIN_SIZE
+
+
+def holds_large(value) -> bool:
+    """True for a large str, or a dict with a large str value."""
+    return is_large(value) or isinstance(value, dict) and any(map(is_large, value.values()))
+
+
+def share(value, segments: SegmentManager):
+    """Replace a large str, or the large str values of a dict, by segment slices."""
+    if is_large(value):
+        return segments.put_text(value)
+    if holds_large(value):
+        return {name: share(item, segments) for name, item in value.items()}
+    return value
+
+
+def unshare(value):
+    """Undo share(): read back the text of every slice."""
+    if isinstance(value, TextSlice):
+        return read_text(value)
+    if isinstance(value, dict) and any(isinstance(item, TextSlice) for item in value.values()):
+        return {name: unshare(item) for name, item in value.items()}
+    return value
+
+
+def _store(value, output, path: str):
+    """Write a large str, or the large str values of a dict, to an open output segment."""
+    if is_large(value):
+        start = output.tell()
+        output.write(value.encode('utf-8'))
+        return TextSlice(path, start, output.tell())
+    if holds_large(value):
+        return {name: _store(item, output, path) for name, item in value.items()}
+    return value
+
+
+def call_shared(fn, output_path: str, *args):
+    """Run ``fn(*args)`` in a worker with shared arguments and result.
+
+    Slices among the arguments (or dict arguments) are read back first.
+    A large result is written to ``output_path``, an empty segment created
+    by the caller's SegmentManager, and returned as slices; undo with
+    unshare(). Module level, so process pools can pickle it.
+    """
+    result = fn(*map(unshare, args))
+    if output_path is None or not holds_large(result):
+        return result
+    # Opened without creating: a segment already unlinked by its owner stays gone
+    with open(output_path, 'r+b') as output:
+        return _store(result, output, output_path)
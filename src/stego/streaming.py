@@ -0,0 +1,202 @@
+"""Helpers for the incremental encode_stream/decode_stream APIs.
+
+Covers and stego texts arrive as an iterable of ``str`` chunks (a text file
+object, a generator of blocks, ...). Secrets are read from a binary reader
+and framed one frame at a time, so memory use does not depend on the size
+of the cover.
+"""
+
+import codecs
+import re
+from itertools import islice
+from .framing import FLAG_MORE, FRAME_SIZE, FRAME_VERSION, FrameReader, data_frame, decompress_payload
+
+# Characters read per block when pulling from a text reader
+BLOCK_SIZE = 64 * 1024
+
+# Longest whitespace-free text iter_aligned() holds back before cutting it anyway
+MAX_CARRY = 16 * BLOCK_SIZE
+
+_WORD_RE = re.compile(r'\S+')
+
+# Greedy, so it ends just past the last whitespace character
+_LAST_SPACE_RE = re.compile(r'.*\s', re.DOTALL)
+
+
+def iter_blocks(reader, block_size: int = BLOCK_SIZE):
+    """Yield blocks from anything with ``read(n)``, until it is exhausted."""
+    while True:
+        block = reader.read(block_size)
+        if not block:
+            return
+        yield block
+
+
+def iter_source(source, block_size: int = BLOCK_SIZE):
+    """Yield chunks from a reader (via ``read``) or from an iterable of chunks."""
+    if hasattr(source, 'read'):
+        return iter_blocks(source, block_size)
+    return iter(source)
+
+
+def iter_aligned(chunks, max_carry: int = MAX_CARRY):
+    """Re-cut text chunks so that each one ends on a whitespace boundary.
+
+    A whitespace-delimited token is never split between two chunks, which
+    lets word-based scanners process each chunk on its own. The exception
+    is a token longer than ``max_carry`` characters (a line of base64, a
+    long run of zero-width characters): it is cut between two characters
+    once that much is held back, so memory stays bounded.
+    """
+    carry = []
+    carried = 0
+    for chunk in chunks:
+        # The carry holds no whitespace, so only the new chunk is searched
+        cut = _last_space(chunk)
+        if cut:
+            carry.append(chunk[:cut])
+            yield ''.join(carry)
+            carry = [chunk[cut:]]
+            carried = len(chunk) - cut
+            continue
+        carry.append(chunk)
+        carried += len(chunk)
+        if carried >= max_carry:
+            yield ''.join(carry)
+            carry = []
+            carried = 0
+    if carried:
+        yield ''.join(carry)
+
+
+def _last_space(text: str) -> int:
+    """Return the index just past the last whitespace character, or 0."""
+    match = _LAST_SPACE_RE.match(text)
+    return match.end() if match else 0
+
+
+def iter_words(chunks):
+    """Yield whitespace-delimited words from text chunks (like ``str.split()``)."""
+    for chunk in iter_aligned(chunks):
+        for match in _WORD_RE.finditer(chunk):
+            yield match.group()
+
+
+def read_exactly(reader, size: int) -> bytes:
+    """Read ``size`` bytes from a binary reader; fewer only at end of input."""
+    data = reader.read(size)
+    while data and len(data) < size:
+        more = reader.read(size - len(data))
+        if not more:
+            break
+        data += more
+    return data
+
+
+def iter_secret_chunks(secret_reader, frame_size: int = FRAME_SIZE):
+    """Yield ``(chunk, is_last)`` pairs read from a binary secret reader.
+
+    One chunk of lookahead tells whether the current chunk is the last.
+    Nothing is yielded for an empty secret.
+    """
+    chunk = read_exactly(secret_reader, frame_size)
+    while chunk:
+        following = read_exactly(secret_reader, frame_size)
+        yield chunk, not following
+        chunk = following
+
+
+def iter_secret_frames(secret_reader, frame_size: int = FRAME_SIZE, flags: int = 0,
+                       compression: str = None):
+    """Yield the frames of a message read incrementally from a secret reader."""
+    for chunk, is_last in iter_secret_chunks(secret_reader, frame_size):
+        yield data_frame(chunk, is_last, flags, compression)
+
+
+def iter_payloads(source):
+    """Yield the frame payloads of the first message in ``source`` as they arrive.
+
+    Unlike read_message() nothing is buffered: each frame is yielded as soon
+    as its checksum verifies (decompressed if needed). A message cut short
+    simply ends early.
+    """
+    reader = FrameReader(source)
+    while True:
+        frame = reader.next_frame()
+        if frame is None:
+            return
+        yield decompress_payload(frame.payload, frame.flags)
+        if frame.version != FRAME_VERSION or not frame.flags & FLAG_MORE:
+            return
+
+
+def write_joined(out_writer, tokens, separator: str = ' ', batch_size: int = 4096):
+    """Write tokens joined by ``separator``, like ``separator.join(tokens)``."""
+    tokens = iter(tokens)
+    lead = ''
+    while True:
+        batch = list(islice(tokens, batch_size))
+        if not batch:
+            return
+        out_writer.write(lead + separator.join(batch))
+        lead = separator
+
+
+def write_decoded(out_writer, chunks, encoding: str = 'utf-8') -> int:
+    """Write byte chunks to a text writer; a character may span two chunks.
+
+    Returns the number of characters written.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    written = 0
+    for chunk in chunks:
+        written += out_writer.write(decoder.decode(chunk))
+    return written + out_writer.write(decoder.decode(b'', final=True))
+
+
+class ChunkReader:
+    """Expose an iterator of ``bytes`` chunks as a binary ``read(n)`` reader."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = b''
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+class EncodedReader:
+    """Expose a text reader as a binary reader of its encoded bytes."""
+
+    def __init__(self, text_reader, encoding: str = 'utf-8', block_size: int = BLOCK_SIZE):
+        self._reader = ChunkReader(block.encode(encoding)
+                                   for block in iter_blocks(text_reader, block_size))
+
+    def read(self, size: int = -1) -> bytes:
+        return self._reader.read(size)
+
+
+class PeekedReader:
+    """A binary reader with some already-read bytes put back in front."""
+
+    def __init__(self, head: bytes, reader):
+        self._head = head
+        self._reader = reader
+
+    def read(self, size: int = -1) -> bytes:
+        if not self._head:
+            return self._reader.read(size)
+        if size < 0:
+            data, self._head = self._head + self._reader.read(), b''
+            return data
+        data, self._head = self._head[:size], self._head[size:]
+        return data
@@ -0,0 +1,113 @@
+"""Helpers for locating payloads appended to the end of a text or file.
+
+Append-style methods (4spach, AIT_Steg) place their invisible characters
+after the cover text. These helpers find that trailing run by looking
+backwards from the end, so the work done depends on the payload size
+rather than on the size of the cover.
+"""
+
+import os
+import re
+from functools import lru_cache
+
+# Trailing whitespace tolerated after the payload (editors often add a newline)
+_TRAILING_SPACE = ' \t\r\n'
+
+# Size of the first block read from the end of a file; doubled as needed
+TAIL_BLOCK_SIZE = 64 * 1024
+
+
+@lru_cache(maxsize=None)
+def _text_pattern(chars: str):
+    # The lookbehind only lets a match start at the beginning of a run
+    char_class = '[' + re.escape(chars) + ']'
+    return re.compile('(?<!' + char_class + ')' + char_class + '+[' + _TRAILING_SPACE + ']*\\Z')
+
+
+@lru_cache(maxsize=None)
+def _bytes_pattern(chars: str):
+    encoded = [re.escape(c.encode('utf-8')) for c in chars]
+    not_after = b''.join(b'(?<!' + seq + b')' for seq in encoded)
+    return re.compile(not_after + b'(?:' + b'|'.join(encoded) + b')+['
+                      + _TRAILING_SPACE.encode('ascii') + b']*\\Z')
+
+
+def _run_end(run: str) -> int:
+    return len(run.rstrip(_TRAILING_SPACE))
+
+
+def trailing_run(text: str, chars: str, block_size: int = TAIL_BLOCK_SIZE):
+    """Find the run of ``chars`` at the end of ``text``.
+
+    Returns ``(offset, run)`` where ``offset`` is the index of the first
+    character of the run. ``run`` is empty when the text does not end
+    with any of ``chars``.
+    """
+    pattern = _text_pattern(''.join(sorted(set(chars))))
+    size = block_size
+
+    while True:
+        start = max(0, len(text) - size)
+        match = pattern.search(text[start:])
+
+        # A run touching the block start may continue further back
+        if match is None or match.start() > 0 or start == 0:
+            break
+        size *= 2
+
+    if match is None:
+        return len(text), ''
+    run = match.group()
+    return start + match.start(), run[:_run_end(run)]
+
+
+def read_trailing_run(path: str, chars: str, block_size: int = TAIL_BLOCK_SIZE):
+    """Find the run of ``chars`` at the end of a UTF-8 encoded file.
+
+    Only the tail of the file is read. Returns ``(offset, run)`` where
+    ``offset`` is the byte offset of the run within the file.
+    """
+    offset, run = read_trailing_bytes(path, chars, block_size)
+    return offset, run.decode('utf-8')
+
+
+def read_trailing_bytes(path: str, chars: str, block_size: int = TAIL_BLOCK_SIZE):
+    """Like read_trailing_run(), but return the run as raw UTF-8 bytes."""
+    pattern = _bytes_pattern(''.join(sorted(set(chars))))
+    size = block_size
+
+    with open(path, 'rb') as f:
+        file_size = f.seek(0, os.SEEK_END)
+
+        while True:
+            start = max(0, file_size - size)
+            f.seek(start)
+            block = f.read(file_size - start)
+            match = pattern.search(block)
+
+            # The block may begin inside a three-byte character
+            if match is None or match.start() >= 3 or start == 0:
+                break
+            size *= 2
+
+    if match is None:
+        return file_size, b''
+    return start + match.start(), match.group().rstrip(_TRAILING_SPACE.encode('ascii'))
+
+
+def read_head(path: str, length: int) -> bytes:
+    """Read up to ``length`` bytes from the start of a file."""
+    with open(path, 'rb') as f:
+        return f.read(length)
+
+
+def iter_file_blocks(path: str, end: int, block_size: int = TAIL_BLOCK_SIZE):
+    """Yield the bytes of a file up to offset ``end`` in fixed-size blocks."""
+    with open(path, 'rb') as f:
+        remaining = end
+        while remaining > 0:
+            block = f.read(min(block_size, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            yield block
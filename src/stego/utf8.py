@@ -0,0 +1,119 @@
+"""Bytes-native handling of zero-width characters in UTF-8 text.
+
+Every zero-width character used by 4spach and AIT_Steg is a three-byte
+UTF-8 sequence, and no two of them share a last byte. A run of them can
+therefore be found in raw bytes (a bytes object or an mmap) and turned into
+symbol values by taking every third byte, without decoding the text to
+``str``; encoding writes precomputed byte sequences straight to a binary
+output. UTF-8 is self-synchronising, so a sequence can never be matched
+inside another character.
+"""
+
+import mmap
+import os
+import re
+from contextlib import contextmanager
+
+# Bytes copied at a time from a cover file to the output
+COPY_BLOCK_SIZE = 1024 * 1024
+
+
+class ZeroWidthCodec:
+    """Byte-level tables for a set of three-byte zero-width characters.
+
+    ``chars[i]`` decodes to ``symbols[i]`` (e.g. b'0123' for base-4 digits).
+    Raises ValueError if the characters do not fit the scheme.
+    """
+
+    def __init__(self, chars, symbols: bytes):
+        sequences = [char.encode('utf-8') for char in chars]
+        if any(len(seq) != 3 for seq in sequences) or len({seq[2] for seq in sequences}) != len(sequences):
+            raise ValueError("Characters must be three-byte UTF-8 sequences with distinct last bytes")
+        self.sequences = tuple(sequences)
+        self._symbols = bytes.maketrans(bytes(seq[2] for seq in sequences), symbols)
+
+        # Sequences grouped by lead byte, then by second byte
+        tree = {}
+        for seq in sequences:
+            tree.setdefault(seq[:1], {}).setdefault(seq[1:2], []).append(seq[2:])
+
+        def tails(lead):
+            return b'|'.join(re.escape(second) + b'[' + b''.join(map(re.escape, sorted(lasts))) + b']'
+                             for second, lasts in tree[lead].items())
+
+        one = b'(?:' + b'|'.join(re.escape(lead) + b'(?:' + tails(lead) + b')' for lead in tree) + b')'
+        self._leads = tuple(tree)
+        self._run_re = re.compile(one + b'+')
+        # Same runs, but led by a plain byte class, which the engine skips to quickly
+        first = b'[' + b''.join(map(re.escape, tree)) + b'](?:' + b'|'.join(
+            b'(?<=' + re.escape(lead) + b')(?:' + tails(lead) + b')' for lead in tree) + b')'
+        self._search_re = re.compile(first + one + b'*')
+
+    def iter_runs(self, buffer):
+        """Yield a match for every run of zero-width sequences in a bytes object or mmap.
+
+        Candidates are located with find(), which skips text without any of
+        the lead bytes at memchr speed; when a lead byte belongs to another
+        character (curly quotes, dashes) the regex takes over from there.
+        """
+        upcoming = {lead: buffer.find(lead) for lead in self._leads}
+        pos = 0
+        while True:
+            for lead, at in upcoming.items():
+                if 0 <= at < pos:
+                    upcoming[lead] = buffer.find(lead, pos)
+            start = min((at for at in upcoming.values() if at >= 0), default=-1)
+            if start < 0:
+                return
+            run = self._run_re.match(buffer, start)
+            if run is None:
+                run = self._search_re.search(buffer, start + 1)
+                if run is None:
+                    return
+            yield run
+            pos = run.end()
+
+    def symbols(self, run) -> bytes:
+        """Return the symbol of each character in a run of zero-width sequences."""
+        return bytes(run[2::3]).translate(self._symbols)
+
+    def extract(self, buffer) -> bytes:
+        """Return the symbols of every zero-width character in a buffer, in order."""
+        return self.symbols(b''.join(run.group() for run in self.iter_runs(buffer)))
+
+    def iter_cover(self, buffer):
+        """Yield the parts of a buffer between zero-width runs, as memoryviews."""
+        view = memoryview(buffer)
+        pos = 0
+        for run in self.iter_runs(buffer):
+            if run.start() > pos:
+                yield view[pos:run.start()]
+            pos = run.end()
+        if pos < len(view):
+            yield view[pos:]
+
+
+def encode_table(char_table) -> tuple:
+    """Return the UTF-8 bytes of every entry of a byte -> characters table."""
+    return tuple(chars.encode('utf-8') for chars in char_table)
+
+
+def copy_file(source, output, block_size: int = COPY_BLOCK_SIZE):
+    """Copy a binary reader to a binary writer, yielding each block after writing it."""
+    while True:
+        block = source.read(block_size)
+        if not block:
+            return
+        output.write(block)
+        yield block
+
+
+@contextmanager
+def map_file(path: str):
+    """Map a file read-only; yields b'' for an empty file, which cannot be mapped."""
+    with open(path, 'rb') as f:
+        if not os.fstat(f.fileno()).st_size:
+            yield b''
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
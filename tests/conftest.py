@@ -4,6 +4,9 @@ import pytest
 import tempfile
 import os
 
+# CLI tests run locally even when a `stego serve` daemon is running
+os.environ['STEGO_DAEMON'] = 'off'
+
 
 @pytest.fixture
 def temp_dir():
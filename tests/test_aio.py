@@ -0,0 +1,100 @@
+"""Tests for the asyncio API."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from stego.aio import async_decode, async_decode_many, async_encode, async_encode_many
+from stego.methods import METHODS
+from stego.methods.fourspach import FourSpachMethod
+
+
+class SlowMethod(FourSpachMethod):
+    """4spach with a delay, recording how many encodes overlap."""
+
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+
+    def encode(self, cover_text, secret_data, key=None):
+        cls = type(self)
+        with cls.lock:
+            cls.running += 1
+            cls.peak = max(cls.peak, cls.running)
+        time.sleep(0.02)
+        with cls.lock:
+            cls.running -= 1
+        if secret_data == 'fail':
+            raise ValueError('fail')
+        return super().encode(cover_text, secret_data, key)
+
+
+class TestAsync:
+    """Test cases for the async coroutines."""
+
+    @pytest.mark.parametrize('name', sorted(METHODS))
+    def test_round_trip(self, name, sample_cover_text, sample_secret):
+        """Test text and binary round trips for every method by name."""
+        async def main():
+            encoded = await async_encode(name, sample_cover_text, sample_secret, 'key')
+            decoded = await async_decode(name, encoded, 'key')
+            encoded_bytes = await async_encode(name, sample_cover_text, b'\x00\xff', 'key')
+            decoded_bytes = await async_decode(name, encoded_bytes, 'key', binary=True)
+            return decoded, decoded_bytes
+
+        assert asyncio.run(main()) == (sample_secret, b'\x00\xff')
+
+    def test_process_executor(self, sample_cover_text):
+        """Test offloading to a process pool, with results in input order."""
+        secrets = [f'secret {index}' for index in range(6)]
+
+        async def main():
+            with ProcessPoolExecutor(max_workers=2) as pool:
+                encoded = await async_encode_many('em-st', [(sample_cover_text, s) for s in secrets],
+                                                  executor=pool, concurrency=3)
+                return await async_decode_many(METHODS['em-st'](), encoded, executor=pool)
+
+        assert asyncio.run(main()) == secrets
+
+    def test_concurrency_window(self):
+        """Test that at most ``concurrency`` calls run at once."""
+        SlowMethod.peak = 0
+
+        async def main():
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                return await async_encode_many(SlowMethod(), [('cover', str(i)) for i in range(10)],
+                                               executor=pool, concurrency=3)
+
+        results = asyncio.run(main())
+        assert [FourSpachMethod().decode(text) for text in results] == [str(i) for i in range(10)]
+        assert SlowMethod.peak == 3
+
+    def test_shared_limiter(self):
+        """Test that a shared semaphore bounds single calls across tasks."""
+        SlowMethod.peak = 0
+
+        async def main():
+            limiter = asyncio.Semaphore(2)
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                calls = [async_encode(SlowMethod(), 'cover', str(i), executor=pool, limiter=limiter)
+                         for i in range(6)]
+                return await asyncio.gather(*calls)
+
+        assert len(asyncio.run(main())) == 6
+        assert SlowMethod.peak == 2
+
+    def test_failure_is_raised(self):
+        """Test that a failing call raises from the bulk helper."""
+        async def main():
+            await async_encode_many(SlowMethod(), [('cover', 'a'), ('cover', 'fail'), ('cover', 'b')])
+
+        with pytest.raises(ValueError):
+            asyncio.run(main())
+
+    def test_invalid_concurrency(self):
+        """Test that the window must hold at least one call."""
+        with pytest.raises(ValueError):
+            asyncio.run(async_decode_many('4spach', ['x'], concurrency=0))
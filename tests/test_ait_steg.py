@@ -1,7 +1,8 @@
 """Tests for AIT_Steg steganography method."""
 
 import pytest
-from stego.methods.ait_steg import AITStegMethod
+from stego.framing import MARKER
+from stego.methods.ait_steg import AITStegMethod, _plausible_text
 
 
 class TestAITStegMethod:
@@ -33,16 +34,16 @@ class TestAITStegMethod:
             method.decode(encoded, None)
 
     def test_wrong_key_fails(self, sample_cover_text, sample_secret):
-        """Test that wrong key produces wrong result."""
+        """Test that a wrong key is rejected by the tag check."""
         method = AITStegMethod()
         correct_key = "correct_password"
         wrong_key = "wrong_password"
 
         encoded = method.encode(sample_cover_text, sample_secret, correct_key)
-        decoded_wrong = method.decode(encoded, wrong_key)
-
-        # Should not match original secret
-        assert decoded_wrong != sample_secret
+        with pytest.raises(ValueError, match="incorrect key"):
+            method.decode(encoded, wrong_key)
+        with pytest.raises(ValueError, match="incorrect key"):
+            method.decode_tail(encoded, wrong_key)
 
     def test_dynamic_key_generation(self, sample_cover_text, sample_secret):
         """Test that method can generate dynamic keys based on content or time."""
@@ -88,3 +89,171 @@ class TestAITStegMethod:
         encoded = method.encode(sample_cover_text, sample_secret)
         decoded = method.decode(encoded)
         assert decoded == sample_secret
+
+    def test_decode_tail_matches_decode(self, sample_cover_text, temp_dir):
+        """Test that tail decoding returns the first of messages appended one after another."""
+        import os
+        method = AITStegMethod()
+        key = "tail_key"
+
+        text = method.encode(method.encode(sample_cover_text, "first", key), "second", key)
+        assert method.decode(text, key) == "first"
+        assert method.decode_tail(text, key) == "first"
+
+        path = os.path.join(temp_dir, "stego.txt")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        assert method.decode_file(path, key) == "first"
+        assert method.decode_tail(sample_cover_text, key) == ""
+
+        # Only the trailing run is read: an earlier run cut off by cover text is not
+        chat_log = method.encode(method.encode(sample_cover_text, "first", key) + " reply", "second", key)
+        assert method.decode_tail(chat_log, key) == "second"
+
+    def test_decode_file(self, temp_dir, sample_cover_text, sample_secret):
+        """Test decoding from the tail of a file, with and without a user key."""
+        import os
+        method = AITStegMethod()
+        path = os.path.join(temp_dir, "stego.txt")
+        cover = sample_cover_text * 1000
+
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(method.encode(cover, sample_secret, "file_key"))
+        assert method.decode_file(path, "file_key") == sample_secret
+
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(method.encode(cover, sample_secret))
+        assert method.decode_file(path) == sample_secret
+
+    def test_zero_width_round_trip_all_bytes(self):
+        """Test that every byte value survives the zero-width serialization."""
+        method = AITStegMethod()
+        data = bytes(range(256)) * 4
+
+        zw_text = method._data_to_zero_width(data)
+        assert len(zw_text) == len(data) * 3
+        assert method._zero_width_to_data("cover " + zw_text + " more") == data
+        assert method._zero_width_to_data(zw_text[:-1]) == b''
+
+    def test_aead_frame_rejects_wrong_key(self, sample_cover_text, sample_secret):
+        """Test that the authenticated cipher rejects a wrong key via the tag check."""
+        method = AITStegMethod()
+        assert method.cipher == 'aes-gcm'
+
+        encoded = method.encode(sample_cover_text, sample_secret, "right_key")
+        payload = method._zero_width_to_data(encoded)
+        assert payload.startswith(MARKER)
+
+        assert method.decode(encoded, "right_key") == sample_secret
+        with pytest.raises(ValueError):
+            method.decode(encoded, "wrong_key")
+        with pytest.raises(ValueError):
+            method.decode(encoded)
+
+    def test_aead_frame_detects_tampering(self, sample_cover_text, sample_secret):
+        """Test that a modified ciphertext fails authentication."""
+        method = AITStegMethod()
+        encoded = method.encode(sample_cover_text, sample_secret, "key")
+
+        # Swap the last zero-width character for a different one
+        last = encoded[-1]
+        replacement = next(c for c in method.ZERO_WIDTH_CHARS[:4] if c != last)
+        assert method.decode(encoded[:-1] + replacement, "key") == ''
+
+    def test_legacy_xor_cipher(self, sample_cover_text, sample_secret):
+        """Test that the legacy XOR format can still be written and read."""
+        legacy = AITStegMethod(cipher='xor')
+        encoded = legacy.encode(sample_cover_text, sample_secret, "key")
+
+        payload = legacy._zero_width_to_data(encoded)
+        assert int.from_bytes(payload[:2], 'big') == len(sample_secret.encode('utf-8'))
+
+        # The default instance detects the legacy frame on decode
+        assert AITStegMethod().decode(encoded, "key") == sample_secret
+        assert AITStegMethod().decode_tail(encoded, "key") == sample_secret
+
+    def test_plausible_text(self):
+        """Test the plaintext check applied to legacy messages, which carry no tag."""
+        assert _plausible_text("secret message") and _plausible_text("")
+        assert _plausible_text("café naïve ça")
+        assert not _plausible_text("\x01\x02\x1fé\x7fa")
+
+    def test_unknown_cipher(self):
+        """Test that an unknown cipher name is rejected."""
+        with pytest.raises(ValueError):
+            AITStegMethod(cipher='rot13')
+
+    def test_keyring_reports_matching_key(self, sample_cover_text, sample_secret):
+        """Test trying several candidate keys against one text."""
+        method = AITStegMethod()
+        encoded = method.encode(sample_cover_text, sample_secret, "key-2")
+
+        match = method.decode_keyring(encoded, ["key-1", "key-2", "key-3"])
+        assert match.secret == sample_secret
+        assert match.key == "key-2"
+        assert match.hour is None
+
+        assert method.decode(encoded, keyring=["key-0", "key-2"]) == sample_secret
+        assert method.decode_keyring(encoded, ["key-1", "key-3"]) is None
+        with pytest.raises(ValueError):
+            method.decode(encoded, keyring=["key-1"])
+
+    def test_keyring_hour_window(self, monkeypatch, sample_cover_text, sample_secret):
+        """Test that a dynamic key still decodes after the hour rolls over."""
+        method = AITStegMethod()
+        now = 1_700_000_000
+
+        monkeypatch.setattr('time.time', lambda: now)
+        encoded = method.encode(sample_cover_text, sample_secret)
+
+        monkeypatch.setattr('time.time', lambda: now + 2 * 3600)
+        with pytest.raises(ValueError):
+            method.decode(encoded)
+
+        match = method.decode_keyring(encoded, hours=3)
+        assert match.secret == sample_secret
+        assert match.key is None
+        assert match.hour == now // 3600
+        assert method.decode(encoded, hours=2) == sample_secret
+
+    def test_large_secret_spans_frames(self, sample_cover_text):
+        """Test secrets larger than one frame and the legacy 16-bit limit."""
+        method = AITStegMethod()
+        secret = "large secret " * 12000  # 156000 bytes
+
+        encoded = method.encode(sample_cover_text, secret, "key")
+        assert method.decode(encoded, "key") == secret
+        assert method.decode_tail(encoded, "key") == secret
+        with pytest.raises(ValueError):
+            method.decode(encoded, "wrong")
+
+        with pytest.raises(ValueError):
+            AITStegMethod(cipher='xor').encode(sample_cover_text, secret, "key")
+
+    def test_binary_round_trip(self, sample_cover_text):
+        """Test that arbitrary bytes survive encode_bytes/decode_bytes."""
+        method = AITStegMethod()
+        secret = bytes(range(256)) + b'\xff\xfe'
+
+        encoded = method.encode_bytes(sample_cover_text, secret, "key")
+        assert method.decode_bytes(encoded, "key") == secret
+        assert method.decode_tail_bytes(encoded, "key") == secret
+        with pytest.raises(ValueError):
+            method.decode_bytes(encoded, "wrong")
+        assert method.decode_bytes(encoded, keyring=["wrong", "key"]) == secret
+        assert method.decode(encoded, "key") == ''
+
+        encoded = method.encode_bytes(sample_cover_text, secret)
+        assert method.decode_bytes(encoded) == secret
+
+    def test_compression(self, sample_cover_text):
+        """Test that a compressed secret is shorter and round trips."""
+        secret = "compressible text " * 50
+
+        plain = AITStegMethod().encode(sample_cover_text, secret, "key")
+        encoded = AITStegMethod(compression='bz2').encode(sample_cover_text, secret, "key")
+        assert len(encoded) < len(plain)
+        assert AITStegMethod().decode(encoded, "key") == secret
+
+        with pytest.raises(ValueError):
+            AITStegMethod(cipher='xor', compression='zlib')
@@ -0,0 +1,171 @@
+"""Tests for batch encoding and decoding."""
+
+import json
+import os
+import subprocess
+
+import pytest
+
+from stego.batch import BatchSummary, load_jobs, run_batch
+
+
+@pytest.fixture
+def secrets_dir(temp_dir):
+    """A directory of small secret files plus a shared cover."""
+    secrets = os.path.join(temp_dir, 'secrets')
+    os.mkdir(secrets)
+    for index in range(6):
+        with open(os.path.join(secrets, f'msg{index}.txt'), 'w', encoding='utf-8') as f:
+            f.write(f'secret number {index}')
+
+    cover = os.path.join(temp_dir, 'cover.txt')
+    with open(cover, 'w', encoding='utf-8') as f:
+        f.write('The quick brown fox jumps over the lazy dog')
+    return secrets, cover
+
+
+class TestLoadJobs:
+    """Test cases for reading jobs from directories and manifests."""
+
+    def test_directory_jobs(self, secrets_dir, temp_dir):
+        """Test that every file in a directory becomes a job."""
+        secrets, cover = secrets_dir
+        jobs = list(load_jobs(secrets, 'encode', output_dir=temp_dir, cover=cover))
+
+        assert [job['id'] for job in jobs] == [f'msg{index}.txt' for index in range(6)]
+        assert all(job['cover'] == cover for job in jobs)
+
+    def test_directory_needs_cover_and_output(self, secrets_dir):
+        """Test that directory encoding requires a cover and an output directory."""
+        secrets, cover = secrets_dir
+        with pytest.raises(ValueError):
+            list(load_jobs(secrets, 'encode', output_dir='out'))
+        with pytest.raises(ValueError):
+            list(load_jobs(secrets, 'decode', cover=cover))
+
+    def test_manifest_paths_and_invalid_lines(self, temp_dir):
+        """Test manifest path resolution and that bad lines become invalid jobs."""
+        manifest = os.path.join(temp_dir, 'jobs.jsonl')
+        with open(manifest, 'w', encoding='utf-8') as f:
+            f.write('{"id": "a", "input": "a.txt"}\n\nnot json\n[1, 2]\n')
+
+        jobs = list(load_jobs(manifest, 'decode', output_dir='out', key='k'))
+        assert jobs[0]['input'] == os.path.join(temp_dir, 'a.txt')
+        assert jobs[0]['output'] == os.path.join('out', 'a.txt')
+        assert jobs[0]['key'] == 'k'
+        assert 'invalid' in jobs[1] and 'invalid' in jobs[2]
+
+
+class TestRunBatch:
+    """Test cases for running batches."""
+
+    @pytest.mark.parametrize('workers', [1, 2])
+    def test_round_trip(self, secrets_dir, temp_dir, workers):
+        """Test encoding then decoding a directory, in-process and on a pool."""
+        secrets, cover = secrets_dir
+        encoded = os.path.join(temp_dir, 'encoded')
+        decoded = os.path.join(temp_dir, 'decoded')
+        os.mkdir(encoded)
+        os.mkdir(decoded)
+
+        jobs = load_jobs(secrets, 'encode', output_dir=encoded, cover=cover)
+        results = list(run_batch(jobs, '4spach', 'encode', workers=workers))
+        assert [result.index for result in results] == list(range(6))
+        assert all(result.status == 'ok' for result in results)
+
+        jobs = load_jobs(encoded, 'decode', output_dir=decoded)
+        results = list(run_batch(jobs, '4spach', 'decode', workers=workers, ordered=False))
+        assert sorted(result.index for result in results) == list(range(6))
+
+        for name in os.listdir(secrets):
+            with open(os.path.join(secrets, name), encoding='utf-8') as f1, \
+                    open(os.path.join(decoded, name), encoding='utf-8') as f2:
+                assert f1.read() == f2.read()
+
+    def test_errors_are_recorded(self, temp_dir):
+        """Test that failing jobs produce error records and the batch continues."""
+        jobs = [{'id': 'missing', 'input': os.path.join(temp_dir, 'nope.txt'), 'output': 'x'},
+                {'id': 'incomplete'},
+                {'id': 'invalid', 'invalid': 'bad line'}]
+        results = list(run_batch(jobs, 'twsm', 'decode', workers=1))
+
+        assert [result.status for result in results] == ['error'] * 3
+        assert 'Missing job fields' in results[1].error
+        assert results[2].error == 'bad line'
+
+        summary = BatchSummary()
+        for result in results:
+            summary.add(result)
+        assert summary.failed == 3
+        assert 'Processed 3 jobs' in str(summary)
+
+    @pytest.mark.parametrize('name', ['4spach', 'twsm'])
+    def test_empty_decode_is_an_error(self, temp_dir, name):
+        """Test that a text without a message gives an error record and no output file."""
+        plain = os.path.join(temp_dir, 'plain.txt')
+        with open(plain, 'w', encoding='utf-8') as f:
+            f.write('Nothing hidden in this text.')
+        output = os.path.join(temp_dir, 'out.txt')
+
+        [result] = run_batch([{'input': plain, 'output': output}], name, 'decode', workers=1)
+        assert result.status == 'error'
+        assert 'no message found' in result.error
+        assert not os.path.exists(output)
+
+    def test_unknown_method(self):
+        """Test that an unknown method is rejected."""
+        with pytest.raises(ValueError):
+            list(run_batch([{}], 'nope', 'encode', workers=1))
+
+
+class TestBatchCLI:
+    """Integration tests for the batch subcommands."""
+
+    def test_encode_decode_batch(self, secrets_dir, temp_dir):
+        """Test encode-batch and decode-batch with reports and a summary."""
+        secrets, cover = secrets_dir
+        encoded = os.path.join(temp_dir, 'encoded')
+        decoded = os.path.join(temp_dir, 'decoded')
+        report = os.path.join(temp_dir, 'report.jsonl')
+
+        result = subprocess.run(['stego', 'em-st', 'encode-batch', '--jobs', secrets, '--cover', cover,
+                                 '--output-dir', encoded, '--workers', '2'],
+                                capture_output=True, text=True)
+        assert result.returncode == 0
+        assert len(result.stdout.splitlines()) == 6
+        assert 'Processed 6 jobs (6 ok, 0 failed)' in result.stderr
+
+        result = subprocess.run(['stego', 'em-st', 'decode-batch', '--jobs', encoded,
+                                 '--output-dir', decoded, '--unordered', '--report', report],
+                                capture_output=True, text=True)
+        assert result.returncode == 0
+        with open(report, encoding='utf-8') as f:
+            records = [json.loads(line) for line in f]
+        assert {record['status'] for record in records} == {'ok'}
+        assert sorted(os.listdir(decoded)) == sorted(os.listdir(secrets))
+
+    def test_failed_job_sets_exit_code(self, temp_dir):
+        """Test that a failed job is reported and makes the command exit non-zero."""
+        manifest = os.path.join(temp_dir, 'jobs.jsonl')
+        with open(manifest, 'w', encoding='utf-8') as f:
+            f.write('{"input": "missing.txt", "output": "out.txt"}\n')
+
+        result = subprocess.run(['stego', 'twsm', 'decode-batch', '--jobs', manifest, '--workers', '1'],
+                                capture_output=True, text=True)
+        assert result.returncode == 1
+        assert json.loads(result.stdout)['status'] == 'error'
+
+    def test_wrong_key_sets_exit_code(self, secrets_dir, temp_dir):
+        """Test that a batch that recovers nothing exits non-zero."""
+        secrets, cover = secrets_dir
+        encoded = os.path.join(temp_dir, 'encoded')
+        result = subprocess.run(['stego', 'ait-steg', 'encode-batch', '--jobs', secrets, '--cover', cover,
+                                 '--output-dir', encoded, '--key', 'right', '--workers', '1'],
+                                capture_output=True, text=True)
+        assert result.returncode == 0
+
+        result = subprocess.run(['stego', 'ait-steg', 'decode-batch', '--jobs', encoded, '--key', 'wrong',
+                                 '--output-dir', os.path.join(temp_dir, 'decoded'), '--workers', '1'],
+                                capture_output=True, text=True)
+        assert result.returncode == 1
+        assert {json.loads(line)['status'] for line in result.stdout.splitlines()} == {'error'}
@@ -0,0 +1,96 @@
+"""Tests for the benchmark suite."""
+
+import copy
+import json
+import os
+import subprocess
+
+import pytest
+
+from stego.bench import compare, make_cover, make_payload, parse_size, percentile, run_suite
+from stego.methods import METHODS
+
+
+@pytest.fixture(scope='module')
+def report():
+    """A report for a tiny matrix."""
+    return run_suite(cover_sizes=(4096,), payload_sizes=(64, 256), repeat=2)
+
+
+class TestBench:
+    """Test cases for running and comparing benchmarks."""
+
+    def test_inputs_are_deterministic(self):
+        """Test that covers and payloads are identical between calls."""
+        assert make_cover(5000) == make_cover(5000)
+        assert len(make_cover(100000)) == 100000
+        assert make_payload(1024) == make_payload(1024)
+        assert len(make_payload(1024)) == 1024
+
+    def test_parse_size(self):
+        """Test size suffixes."""
+        assert parse_size('64K') == 65536
+        assert parse_size('100M') == 100 * 1024 * 1024
+        assert parse_size('512') == 512
+        assert parse_size('1kb') == 1024
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles."""
+        timings = list(range(1, 101))
+        assert percentile(timings, 50) == 50
+        assert percentile(timings, 99) == 99
+        assert percentile([3.0], 90) == 3.0
+
+    def test_report_covers_matrix(self, report):
+        """Test that every method, operation and size is measured."""
+        cases = {(r['method'], r['operation'], r['payload_size']) for r in report['results']}
+        assert len(cases) == len(METHODS) * 2 * 2
+        assert all(r['p50_ms'] <= r['p99_ms'] and r['peak_memory_bytes'] > 0 for r in report['results'])
+        assert report['meta']['repeat'] == 2
+        json.dumps(report)
+
+    def test_unknown_method(self):
+        """Test that an unknown method is rejected."""
+        with pytest.raises(ValueError):
+            run_suite(methods=['nope'], cover_sizes=(1024,), payload_sizes=(16,))
+
+    def test_compare(self, report):
+        """Test that only slowdowns beyond the threshold are flagged."""
+        assert compare(report, report) == []
+
+        slower = copy.deepcopy(report)
+        slower['results'][0]['p50_ms'] *= 1.5
+        slower['results'][1]['p50_ms'] *= 1.05
+        regressions = compare(slower, report, threshold=0.1)
+        assert len(regressions) == 1
+        assert regressions[0].metric == 'p50_ms'
+        assert regressions[0].change == pytest.approx(0.5)
+
+    def test_cli_compare(self, report, temp_dir):
+        """Test that stego bench --compare exits non-zero on a regression."""
+        baseline = os.path.join(temp_dir, 'baseline.json')
+        current = os.path.join(temp_dir, 'current.json')
+        slower = copy.deepcopy(report)
+        slower['results'][0]['peak_memory_bytes'] *= 3
+        for path, data in ((baseline, report), (current, slower)):
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+
+        result = subprocess.run(['stego', 'bench', '--compare', baseline, '--baseline', baseline],
+                                capture_output=True, text=True)
+        assert result.returncode == 0
+
+        result = subprocess.run(['stego', 'bench', '--compare', current, '--baseline', baseline],
+                                capture_output=True, text=True)
+        assert result.returncode == 1
+        assert 'REGRESSION' in result.stderr
+
+    def test_cli_run(self, temp_dir):
+        """Test a small stego bench run writing JSON."""
+        output = os.path.join(temp_dir, 'results.json')
+        result = subprocess.run(['stego', 'bench', '--methods', '4spach', '--covers', '2K',
+                                 '--payloads', '32', '--repeat', '1', '--output', output],
+                                capture_output=True, text=True)
+        assert result.returncode == 0
+        with open(output, encoding='utf-8') as f:
+            assert len(json.load(f)['results']) == 2
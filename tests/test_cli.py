@@ -3,6 +3,8 @@
 import subprocess
 import os
 
+import pytest
+
 
 class TestCLIIntegration:
     """Integration tests for the CLI interface."""
@@ -232,3 +234,99 @@ class TestCLIIntegration:
             decoded_content = f.read()
 
         assert decoded_content == unicode_secret
+
+    @pytest.mark.parametrize('method', ['4spach', 'ait-steg', 'twsm', 'em-st'])
+    def test_binary_workflow(self, sample_files, method):
+        """Test that --binary round trips bytes that are not valid UTF-8."""
+        secret = bytes(range(256)) + b'\r\n\xff'
+        with open(sample_files['secret'], 'wb') as f:
+            f.write(secret)
+
+        encode_result = subprocess.run([
+            'stego', method, 'encode', '--binary',
+            '--cover', sample_files['cover'],
+            '--data', sample_files['secret'],
+            '--output', sample_files['output']
+        ], capture_output=True, text=True)
+        assert encode_result.returncode == 0
+
+        decode_result = subprocess.run([
+            'stego', method, 'decode', '--binary',
+            '--input', sample_files['output'],
+            '--output', sample_files['decoded']
+        ], capture_output=True, text=True)
+        assert decode_result.returncode == 0
+
+        with open(sample_files['decoded'], 'rb') as f:
+            assert f.read() == secret
+
+    def test_compress_option(self, sample_files):
+        """Test that --compress output is smaller and decodes without options."""
+        with open(sample_files['secret'], 'w', encoding='utf-8') as f:
+            f.write("repeated secret text " * 100)
+
+        sizes = []
+        for extra in ([], ['--compress', 'lzma']):
+            encode_result = subprocess.run([
+                'stego', 'em-st', 'encode', *extra,
+                '--cover', sample_files['cover'],
+                '--data', sample_files['secret'],
+                '--output', sample_files['output']
+            ], capture_output=True, text=True)
+            assert encode_result.returncode == 0
+            sizes.append(os.path.getsize(sample_files['output']))
+        assert sizes[1] < sizes[0]
+
+        decode_result = subprocess.run([
+            'stego', 'em-st', 'decode',
+            '--input', sample_files['output'],
+            '--output', sample_files['decoded']
+        ], capture_output=True, text=True)
+        assert decode_result.returncode == 0
+
+        with open(sample_files['decoded'], 'r', encoding='utf-8') as f:
+            assert f.read() == "repeated secret text " * 100
+
+    @pytest.mark.parametrize('method', ['4spach', 'ait-steg'])
+    def test_decode_two_appended_messages(self, temp_dir, method):
+        """Test that the tail-seeking decode and stego decode return the first of two messages."""
+        cover_file, secret_file, stego_file, output = (
+            os.path.join(temp_dir, name) for name in ('cover.txt', 'secret.txt', 'two.txt', 'decoded.txt'))
+        key = ['--key', 'k'] if method == 'ait-steg' else []
+        text = 'Cover text for two messages.'
+        for secret in ('FIRST', 'SECOND'):
+            with open(cover_file, 'w', encoding='utf-8') as f, open(secret_file, 'w', encoding='utf-8') as g:
+                f.write(text)
+                g.write(secret)
+            result = subprocess.run([
+                'stego', method, 'encode', *key,
+                '--cover', cover_file,
+                '--data', secret_file,
+                '--output', stego_file
+            ], capture_output=True, text=True)
+            assert result.returncode == 0, result.stdout
+            with open(stego_file, encoding='utf-8') as f:
+                text = f.read()
+
+        for args in ([method, 'decode'], ['decode']):
+            result = subprocess.run(['stego', *args, *key, '--input', stego_file, '--output', output],
+                                    capture_output=True, text=True)
+            assert result.returncode == 0, result.stdout
+            with open(output, encoding='utf-8') as f:
+                assert f.read() == 'FIRST'
+
+    def test_ait_steg_wrong_key(self, sample_files):
+        """Test that decoding with a wrong key is an error, with or without naming the method."""
+        encode_result = subprocess.run([
+            'stego', 'ait-steg', 'encode', '--key', 'right',
+            '--cover', sample_files['cover'],
+            '--data', sample_files['secret'],
+            '--output', sample_files['output']
+        ], capture_output=True, text=True)
+        assert encode_result.returncode == 0
+
+        for args in (['ait-steg', 'decode'], ['decode']):
+            result = subprocess.run(['stego', *args, '--key', 'WRONG', '--input', sample_files['output'],
+                                     '--output', sample_files['decoded']], capture_output=True, text=True)
+            assert result.returncode == 1
+            assert 'Error: Decoding failed - incorrect key' in result.stdout
@@ -0,0 +1,108 @@
+"""Tests for the corpus scanner."""
+
+import json
+import os
+import subprocess
+
+import pytest
+
+from stego.corpus import Finding, ScanSummary, fingerprint, iter_paths, scan_file, scan_files, scan_text
+from stego.methods import METHODS
+from stego.methods.ait_steg import AITStegMethod
+
+COVER = "the quick brown fox jumps over the lazy dog " * 20
+
+
+@pytest.fixture
+def corpus_dir(temp_dir):
+    """A directory with one stego text per method and a clean document."""
+    corpus = os.path.join(temp_dir, 'corpus')
+    os.makedirs(os.path.join(corpus, 'sub'))
+    for name in ['4spach', 'ait-steg', 'twsm', 'em-st']:
+        with open(os.path.join(corpus, f'{name}.txt'), 'w', encoding='utf-8') as f:
+            f.write(METHODS[name]().encode_bytes(COVER, b'hidden payload'))
+    with open(os.path.join(corpus, 'sub', 'clean.txt'), 'w', encoding='utf-8') as f:
+        f.write("Nothing to see here :) (really) -- just *text*.")
+    return corpus
+
+
+class TestScanText:
+    """Test cases for fingerprinting and classifying one document."""
+
+    @pytest.mark.parametrize('name', ['4spach', 'ait-steg', 'twsm', 'em-st'])
+    def test_classifies_each_method(self, name):
+        """Test that a message is found with its method, span and size."""
+        text = "Some preamble text.\n" + METHODS[name]().encode_bytes(COVER, b'hidden payload')
+        findings = scan_text(text)
+
+        assert len(findings) == 1
+        found = findings[0]
+        assert found.method == name and found.verified
+        assert found.est_length == len(b'hidden payload')
+        assert found.offset >= len("Some preamble text.\n")
+        assert found.offset + found.length <= len(text)
+
+    def test_clean_text(self):
+        """Test that ordinary text, with the odd emoticon, yields nothing."""
+        assert scan_text(COVER + " :) (see above) -- *really* ") == []
+        assert scan_text("") == []
+
+    def test_several_messages(self):
+        """Test that every message of a log is reported in order."""
+        method = METHODS['4spach']()
+        log = '\n'.join(method.encode_bytes(f"line {i} of the log", b'payload %d' % i) for i in range(3))
+        findings = scan_text(log)
+        assert [found.method for found in findings] == ['4spach'] * 3
+        assert [found.offset for found in findings] == sorted(found.offset for found in findings)
+
+    def test_unverified_legacy_frame(self):
+        """Test that zero-width carriers without a current frame are reported as unverified."""
+        text = AITStegMethod(cipher='xor').encode_bytes(COVER, b'legacy secret data')
+        assert scan_text(text) == [Finding(len(COVER), len(text) - len(COVER), 'ait-steg', 20, False)]
+
+    def test_fingerprint_histograms(self):
+        """Test the carrier counts of a document."""
+        prints = fingerprint("a :) b :( c \u200b\u200c\u200b *d* __e__")
+        assert prints.emoticons == {':)': 1, ':(': 1}
+        assert prints.zero_width == {'\u200b': 2, '\u200c': 1}
+        assert prints.formats == {0: 1, 3: 1}
+        assert prints.runs == [(12, 15)]
+
+
+class TestScanFiles:
+    """Test cases for scanning many files."""
+
+    def test_iter_paths_walks_directories(self, corpus_dir):
+        """Test that directories are walked in sorted order."""
+        names = [os.path.relpath(path, corpus_dir) for path in iter_paths([corpus_dir])]
+        assert names == ['4spach.txt', 'ait-steg.txt', 'em-st.txt', 'twsm.txt', os.path.join('sub', 'clean.txt')]
+
+    @pytest.mark.parametrize('workers', [1, 2])
+    def test_scan_files(self, corpus_dir, workers):
+        """Test that results come back in order, on one or several processes."""
+        results = list(scan_files(iter_paths([corpus_dir]), workers=workers))
+        assert [result.findings[0].method if result.findings else None for result in results] == \
+            ['4spach', 'ait-steg', 'em-st', 'twsm', None]
+
+        summary = ScanSummary()
+        for result in results:
+            summary.add(result)
+        assert (summary.files, summary.flagged, summary.errors) == (5, 4, 0)
+
+    def test_missing_file(self, temp_dir):
+        """Test that an unreadable file is recorded, not raised."""
+        result = scan_file(os.path.join(temp_dir, 'missing.txt'))
+        assert result.error and result.findings == []
+
+    def test_cli(self, corpus_dir, temp_dir):
+        """Test the stego scan command and its JSONL index."""
+        output = os.path.join(temp_dir, 'findings.jsonl')
+        result = subprocess.run(['stego', 'scan', corpus_dir, '--workers', '1', '--output', output],
+                                capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+        assert 'Scanned 5 files (4 flagged' in result.stderr
+
+        with open(output, encoding='utf-8') as f:
+            records = [json.loads(line) for line in f]
+        assert [record['method'] for record in records] == ['4spach', 'ait-steg', 'em-st', 'twsm']
+        assert set(records[0]) == {'file', 'offset', 'length', 'method', 'est_length', 'verified'}
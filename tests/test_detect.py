@@ -0,0 +1,108 @@
+"""Tests for method detection and stego decode."""
+
+import os
+import subprocess
+
+import pytest
+
+from stego.detect import detect_method, probe_headers
+from stego.framing import frame_message, frame_method, legacy_frame
+from stego.methods import BUILTIN_METHODS, METHODS
+from stego.methods.ait_steg import AITStegMethod
+
+COVER = "the quick brown fox jumps over the lazy dog " * 10
+NAMES = [spec.name for spec in BUILTIN_METHODS]
+
+
+class TestFrameHeader:
+    """Test cases for the method id in frame headers."""
+
+    def test_ids_match_specs(self):
+        """Test that each class records the id its registry entry announces."""
+        ids = [spec.method_id for spec in BUILTIN_METHODS]
+        assert [METHODS[name].METHOD_ID for name in NAMES] == ids
+        assert len(set(ids)) == len(ids) and 0 not in ids
+
+    @pytest.mark.parametrize('name', NAMES)
+    def test_every_frame_names_its_method(self, name):
+        """Test that in-memory and streamed encodes write the method id."""
+        method = METHODS[name](compression='zlib')
+        text = method.encode_bytes(COVER, b'secret ' * 50)
+        header = dict(probe_headers(text))[name]
+        assert frame_method(header[3]) == METHODS[name].METHOD_ID
+        assert method.decode_bytes(text) == b'secret ' * 50
+
+    def test_headerless_frames_still_decode(self):
+        """Test that frames without a method id, from earlier versions, still decode."""
+        method = METHODS['4spach']()
+        text = COVER + method._bytes_to_chars(frame_message(b'old secret'))
+        assert method.decode_bytes(text) == b'old secret'
+
+
+class TestDetectMethod:
+    """Test cases for detect_method()."""
+
+    @pytest.mark.parametrize('name', NAMES)
+    def test_detects_from_header(self, name):
+        """Test that each method is named by its frame header."""
+        assert detect_method(METHODS[name]().encode_bytes(COVER, b'hello')) == name
+
+    def test_ignores_stray_emoticons(self):
+        """Test that ordinary emoticons do not hide a zero-width message."""
+        text = "Nice :) see you (soon) -- " + METHODS['4spach']().encode_bytes(COVER, b'hello')
+        assert detect_method(text) == '4spach'
+
+    @pytest.mark.parametrize('name', ['4spach', 'twsm', 'em-st'])
+    def test_headerless_frames(self, name):
+        """Test that a current frame without a method id is named by its header shape."""
+        method = METHODS[name]()
+        data = frame_message(b'hello')
+        if name == '4spach':
+            text = COVER + method._bytes_to_chars(data)
+        elif name == 'em-st':
+            text = method._insert_symbols_in_text(COVER, method._bytes_to_symbols(data))
+        else:
+            text = method._words_to_format(COVER, ''.join(format(byte, '08b') for byte in data))
+        assert detect_method(text) == name
+
+    def test_legacy_frames(self):
+        """Test the carrier heuristic for texts with no frame header at all."""
+        assert detect_method(AITStegMethod(cipher='xor').encode_bytes(COVER, b'legacy secret')) == 'ait-steg'
+        spach = METHODS['4spach']()
+        assert detect_method(COVER + spach._bytes_to_chars(legacy_frame(b'legacy'))) == '4spach'
+
+    def test_plain_text(self):
+        """Test that a text without carriers is not attributed to any method."""
+        assert detect_method("Nothing hidden here.") is None
+
+
+class TestAutoDecodeCLI:
+    """Test cases for stego decode without a method."""
+
+    @pytest.mark.parametrize('auto', [[], ['--auto']])
+    @pytest.mark.parametrize('name', ['4spach', 'ait-steg', 'em-st'])
+    def test_auto_decode(self, name, auto, temp_dir):
+        """Test that the CLI detects the method and decodes, with or without the --auto alias."""
+        stego_file = os.path.join(temp_dir, 'stego.txt')
+        output = os.path.join(temp_dir, 'out.txt')
+        with open(stego_file, 'w', encoding='utf-8') as f:
+            f.write(METHODS[name]().encode(COVER, 'auto secret', 'k'))
+
+        args = ['stego', 'decode', *auto, '--input', stego_file, '--output', output]
+        result = subprocess.run(args + (['--key', 'k'] if name == 'ait-steg' else []),
+                                capture_output=True, text=True)
+        assert result.returncode == 0, result.stdout
+        assert f"Detected method: {name}" in result.stdout
+        with open(output, encoding='utf-8') as f:
+            assert f.read() == 'auto secret'
+
+    def test_auto_decode_plain_text(self, temp_dir):
+        """Test that a text without a message is an error."""
+        stego_file = os.path.join(temp_dir, 'plain.txt')
+        with open(stego_file, 'w', encoding='utf-8') as f:
+            f.write("Nothing hidden here.")
+        result = subprocess.run(['stego', 'decode', '--input', stego_file,
+                                 '--output', os.path.join(temp_dir, 'out.txt')],
+                                capture_output=True, text=True)
+        assert result.returncode == 1
+        assert 'Error: Could not identify the method' in result.stdout
@@ -124,3 +124,37 @@ class TestEmStMethod:
         # Should be more efficient than raw binary encoding
         decoded = method.decode(encoded)
         assert decoded == common_secret
+
+    def test_single_pass_symbol_extraction(self):
+        """Test that symbols are read left to right without overlaps."""
+        method = EmStMethod()
+
+        # ':)' and '()' would overlap in ':)()'; extended symbols are skipped
+        nibbles = method._extract_nibbles("a :)() b ** :D \\\\ --")
+        assert list(nibbles) == [0b0000, 0b1100, 0b0010, 0b1111]
+
+    def test_cover_with_extended_symbols(self, sample_secret):
+        """Test decoding when the cover already contains extended symbols."""
+        method = EmStMethod()
+        cover = "Say \"\" twice ** and ## then && done"
+
+        encoded = method.encode(cover, sample_secret)
+        assert method.decode(encoded) == sample_secret
+
+    def test_binary_round_trip(self, sample_cover_text):
+        """Test that arbitrary bytes survive encode_bytes/decode_bytes."""
+        method = EmStMethod()
+        secret = bytes(range(256)) + b'\xff\xfe'
+
+        encoded = method.encode_bytes(sample_cover_text, secret)
+        assert method.decode_bytes(encoded) == secret
+        assert method.decode(encoded) == ''
+
+    def test_compression(self, sample_cover_text):
+        """Test that a compressed secret is shorter and round trips."""
+        secret = "compressible text " * 50
+
+        plain = EmStMethod().encode(sample_cover_text, secret)
+        encoded = EmStMethod(compression='zlib').encode(sample_cover_text, secret)
+        assert len(encoded) < len(plain)
+        assert EmStMethod().decode(encoded) == secret
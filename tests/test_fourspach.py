@@ -1,5 +1,9 @@
 """Tests for 4spach steganography method."""
 
+import io
+import os
+
+from stego.framing import FRAME_VERSION, MARKER
 from stego.methods.fourspach import FourSpachMethod
 
 
@@ -67,3 +71,105 @@ class TestFourSpachMethod:
             decoded = method.decode(encoded)
             assert decoded == sample_secret
             text = encoded  # Use encoded text as new cover
+
+    def test_legacy_format_still_decodes(self):
+        """Test that texts using the 16-bit length prefix still decode."""
+        method = FourSpachMethod()
+
+        # Length prefix 0x0001 followed by 'A' (0x41 = 01 00 00 01)
+        legacy = 'cover' + '\u200B' * 7 + '\u200C' + '\u200C\u200B\u200B\u200C'
+        assert method.decode(legacy) == 'A'
+        assert method.decode_tail(legacy) == 'A'
+
+    def test_framed_format(self):
+        """Test that new encodings start with the frame marker and version."""
+        method = FourSpachMethod()
+
+        encoded = method.encode('cover', 'A')
+        data = method._chars_to_bytes(encoded[len('cover'):])
+        assert data[:3] == MARKER + bytes([FRAME_VERSION])
+
+    def test_payload_larger_than_legacy_limit(self, sample_cover_text):
+        """Test secrets that need more than a 16-bit length and several frames."""
+        method = FourSpachMethod()
+        secret = "0123456789abcdef" * 10000  # 160000 bytes, three frames
+
+        encoded = method.encode(sample_cover_text, secret)
+        assert method.decode(encoded) == secret
+        assert method.decode_tail(encoded) == secret
+
+    def test_decode_tail_matches_decode(self, sample_cover_text, temp_dir):
+        """Test that tail decoding returns the first of messages appended one after another."""
+        method = FourSpachMethod()
+
+        appended = method.encode(method.encode(sample_cover_text, "first"), "second")
+        for text in (appended, appended + "\n"):
+            assert method.decode(text) == "first"
+            assert method.decode_tail(text) == "first"
+
+            path = os.path.join(temp_dir, "stego.txt")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            assert method.decode_file(path) == "first"
+        assert method.decode_tail(sample_cover_text) == ""
+
+        # Only the trailing run is read: an earlier run cut off by cover text is not
+        chat_log = method.encode(method.encode(sample_cover_text, "first") + " reply", "second")
+        assert method.decode_tail(chat_log) == "second"
+
+    def test_decode_file_reads_only_the_tail(self, temp_dir, monkeypatch):
+        """Test that decode_file() neither maps nor reads the cover of a large file."""
+        import mmap
+        import stego.tail
+
+        method = FourSpachMethod()
+        path = os.path.join(temp_dir, "large.txt")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(method.encode("a" * 4 * 1024 * 1024 + " \u200b \ufeff ", "secret"))
+
+        read_sizes = []
+
+        class CountingFile(io.FileIO):
+            def read(self, size=-1):
+                data = super().read(size)
+                read_sizes.append(len(data))
+                return data
+
+        monkeypatch.setattr(stego.tail, 'open', lambda p, mode: CountingFile(p, mode[0]), raising=False)
+        monkeypatch.setattr(mmap, 'mmap', None)
+        assert method.decode_file(path) == "secret"
+        assert sum(read_sizes) <= 2 * stego.tail.TAIL_BLOCK_SIZE
+
+    def test_decode_file(self, temp_dir, sample_cover_text, sample_secret):
+        """Test decoding from the tail of a file."""
+        method = FourSpachMethod()
+        path = os.path.join(temp_dir, "stego.txt")
+
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(sample_cover_text * 1000 + method.encode("", sample_secret))
+
+        assert method.decode_file(path) == sample_secret
+
+    def test_binary_round_trip(self, sample_cover_text, temp_dir):
+        """Test that arbitrary bytes survive every bytes decoder."""
+        method = FourSpachMethod()
+        secret = bytes(range(256)) + b'\xff\xfe'
+
+        encoded = method.encode_bytes(sample_cover_text, secret)
+        assert method.decode_bytes(encoded) == secret
+        assert method.decode_tail_bytes(encoded) == secret
+        assert method.decode(encoded) == ''
+
+        path = os.path.join(temp_dir, 'stego.txt')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(encoded)
+        assert method.decode_file_bytes(path) == secret
+
+    def test_compression(self, sample_cover_text):
+        """Test that a compressed secret is shorter and round trips."""
+        secret = "compressible text " * 50
+
+        plain = FourSpachMethod().encode(sample_cover_text, secret)
+        encoded = FourSpachMethod(compression='zlib').encode(sample_cover_text, secret)
+        assert len(encoded) < len(plain)
+        assert FourSpachMethod().decode(encoded) == secret
@@ -0,0 +1,133 @@
+"""Tests for the shared frame format."""
+
+import io
+import pytest
+import zlib
+from stego.framing import (CODECS, FLAG_CODEC_MASK, FLAG_MORE, FRAME_VERSION, LEGACY_VERSION, MARKER,
+                           FrameError, FrameReader, build_frame, compress_payload, decode_varint,
+                           decompress_payload, encode_varint, frame_message, iter_messages,
+                           legacy_frame, read_message)
+
+
+class TestVarint:
+    """Test cases for varint lengths."""
+
+    @pytest.mark.parametrize("value", [0, 1, 127, 128, 300, 65535, 65536, 2 ** 32 + 5])
+    def test_round_trip(self, value):
+        """Test that values survive encoding and decoding."""
+        encoded = encode_varint(value)
+        assert decode_varint(encoded) == (value, len(encoded))
+
+    def test_small_values_use_one_byte(self):
+        """Test the compact encoding of short lengths."""
+        assert encode_varint(127) == b'\x7f'
+        assert encode_varint(128) == b'\x80\x01'
+
+    def test_truncated(self):
+        """Test that a varint cut short is rejected."""
+        with pytest.raises(FrameError):
+            decode_varint(b'\x80')
+
+
+class TestFrames:
+    """Test cases for building and reading frames."""
+
+    def test_single_frame(self):
+        """Test the layout of a small frame."""
+        frame = build_frame(b'abc')
+        assert frame[:4] == b'\x00\x00' + bytes([FRAME_VERSION, 0])
+        assert frame[4] == 3
+        assert read_message(frame) == b'abc'
+
+    def test_large_message_is_split(self):
+        """Test that large payloads span several frames with FLAG_MORE."""
+        data = bytes(range(256)) * 1000
+        framed = frame_message(data, frame_size=100000)
+
+        frames = list(FrameReader(framed))
+        assert len(frames) == 3
+        assert [bool(frame.flags & FLAG_MORE) for frame in frames] == [True, True, False]
+        assert frames[1].start == frames[0].end
+        assert read_message(framed) == data
+
+    def test_frames_decode_independently(self):
+        """Test that each frame can be read on its own."""
+        framed = frame_message(b'x' * 25, frame_size=10)
+        frames = list(FrameReader(framed))
+
+        for frame in frames:
+            alone = FrameReader(framed[frame.start:frame.end]).next_frame()
+            assert alone.payload == frame.payload
+
+    def test_checksum_failure(self):
+        """Test that a corrupted payload is detected."""
+        frame = bytearray(build_frame(b'hello'))
+        frame[6] ^= 0xFF
+        with pytest.raises(FrameError):
+            read_message(bytes(frame))
+
+    def test_incomplete_message(self):
+        """Test that a truncated message reads as empty."""
+        framed = frame_message(b'x' * 25, frame_size=10)
+        assert read_message(framed[:-1]) == b''
+
+    def test_legacy_frame(self):
+        """Test that 16-bit length frames are still read."""
+        data = legacy_frame(b'legacy') + b'trailing'
+        frame = FrameReader(data).next_frame()
+
+        assert frame.version == LEGACY_VERSION
+        assert frame.payload == b'legacy'
+        with pytest.raises(ValueError):
+            legacy_frame(b'x' * 70000)
+
+    def test_unknown_version(self):
+        """Test that a marker followed by an unknown version is not read as a frame."""
+        assert FrameReader(MARKER + bytes([1, 1]) + (5).to_bytes(4, 'big') + b'hello').next_frame() is None
+
+    def test_sources(self):
+        """Test reading from a file object and from a byte iterator."""
+        framed = frame_message(b'streamed', frame_size=3)
+
+        assert read_message(io.BytesIO(framed)) == b'streamed'
+        assert read_message(iter(framed)) == b'streamed'
+
+    def test_iter_messages(self):
+        """Test reading consecutive messages."""
+        data = frame_message(b'one') + legacy_frame(b'two') + frame_message(b'three', frame_size=2)
+        payloads = [b''.join(f.payload for f in frames) for frames in iter_messages(data)]
+        assert payloads == [b'one', b'two', b'three']
+
+
+class TestCompression:
+    """Test cases for compressed frame payloads."""
+
+    @pytest.mark.parametrize("codec", list(CODECS))
+    def test_round_trip(self, codec):
+        """Test that compressed messages decode and are smaller."""
+        data = b"the same words over and over " * 200
+        framed = frame_message(data, compression=codec)
+
+        assert len(framed) < len(data) // 4
+        assert FrameReader(framed).next_frame().flags & FLAG_CODEC_MASK
+        assert read_message(framed) == data
+
+    def test_skipped_when_it_does_not_pay_off(self):
+        """Test that incompressible chunks are stored as is."""
+        payload, flags = compress_payload(b"abc", "zlib")
+        assert (payload, flags) == (b"abc", 0)
+        assert read_message(frame_message(bytes(range(256)), compression="lzma")) == bytes(range(256))
+
+    def test_corrupt_payload(self):
+        """Test that corrupt or truncated compressed payloads raise FrameError."""
+        compressed, flags = compress_payload(b"a" * 1000, "zlib")
+        with pytest.raises(FrameError):
+            decompress_payload(b"not zlib data", flags)
+        with pytest.raises(FrameError):
+            decompress_payload(compressed[:-4], flags)
+        assert decompress_payload(compressed, flags) == zlib.decompress(compressed)
+
+    def test_unknown_codec(self):
+        """Test that unknown codec names are rejected."""
+        with pytest.raises(ValueError):
+            frame_message(b"data", compression="zip")
@@ -0,0 +1,91 @@
+"""Tests for the derived-key cache."""
+
+import hashlib
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from stego.keycache import DerivedKeyCache
+from stego.methods.ait_steg import AITStegMethod
+
+
+class TestDerivedKeyCache:
+    """Test cases for DerivedKeyCache."""
+
+    def test_matches_pbkdf2(self):
+        """Test that cached results equal a direct PBKDF2 call."""
+        cache = DerivedKeyCache()
+        expected = hashlib.pbkdf2_hmac('sha256', b'key', b'salt', 1000)
+
+        assert cache.derive('sha256', b'key', b'salt', 1000) == expected
+        assert cache.derive('sha256', b'key', b'salt', 1000) == expected
+        assert cache.info() == (1, 1, 256, 1)
+
+    def test_parameters_are_part_of_the_key(self):
+        """Test that salt and iteration changes are separate entries."""
+        cache = DerivedKeyCache()
+
+        cache.derive('sha256', b'key', b'salt', 1000)
+        cache.derive('sha256', b'key', b'other', 1000)
+        cache.derive('sha256', b'key', b'salt', 2000)
+        assert cache.misses == 3
+        assert len(cache) == 3
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = DerivedKeyCache(maxsize=2)
+
+        cache.derive('sha256', b'a', b'salt', 10)
+        cache.derive('sha256', b'b', b'salt', 10)
+        cache.derive('sha256', b'a', b'salt', 10)  # 'a' is now most recent
+        cache.derive('sha256', b'c', b'salt', 10)  # evicts 'b'
+
+        cache.derive('sha256', b'a', b'salt', 10)
+        assert cache.hits == 2
+        cache.derive('sha256', b'b', b'salt', 10)
+        assert cache.misses == 4
+
+    def test_resize_and_disable(self):
+        """Test shrinking the cache and disabling it with maxsize 0."""
+        cache = DerivedKeyCache(maxsize=4)
+        for key in (b'a', b'b', b'c'):
+            cache.derive('sha256', key, b'salt', 10)
+
+        cache.maxsize = 1
+        assert len(cache) == 1
+
+        cache.maxsize = 0
+        cache.derive('sha256', b'd', b'salt', 10)
+        assert len(cache) == 0
+
+        with pytest.raises(ValueError):
+            DerivedKeyCache(maxsize=-1)
+
+    def test_clear(self):
+        """Test that clear drops entries and counters."""
+        cache = DerivedKeyCache()
+        cache.derive('sha256', b'key', b'salt', 10)
+        cache.derive('sha256', b'key', b'salt', 10)
+
+        cache.clear()
+        assert cache.info() == (0, 0, 256, 0)
+
+    def test_thread_safety(self):
+        """Test concurrent use from a thread pool."""
+        cache = DerivedKeyCache(maxsize=8)
+        keys = [str(i % 16).encode() for i in range(400)]
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda k: cache.derive('sha256', k, b'salt', 50), keys))
+
+        for key, derived in zip(keys, results):
+            assert derived == hashlib.pbkdf2_hmac('sha256', key, b'salt', 50)
+        assert cache.hits + cache.misses == len(keys)
+        assert len(cache) <= 8
+
+    def test_ait_steg_reuses_derivation(self, sample_cover_text, sample_secret):
+        """Test that AIT_Steg encode and decode share one derivation."""
+        method = AITStegMethod()
+        method.key_cache = DerivedKeyCache()
+
+        encoded = method.encode(sample_cover_text, sample_secret, "cached_key")
+        assert method.decode(encoded, "cached_key") == sample_secret
+        assert method.key_cache.info()[:2] == (1, 1)
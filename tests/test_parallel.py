@@ -0,0 +1,189 @@
+"""Tests for chunked parallel encode and decode."""
+
+import itertools
+import os
+import random
+import subprocess
+from unittest import mock
+
+import pytest
+
+from stego.methods import METHODS
+from stego.parallel import ChunkPool, _chunk_bounds, parallel_decode, parallel_encode
+
+METHOD_NAMES = ['4spach', 'ait-steg', 'twsm', 'em-st']
+
+
+def make_cover(words: int, seed: int = 7) -> str:
+    """A cover with mixed whitespace and non-ASCII words."""
+    rng = random.Random(seed)
+    vocabulary = ['alpha', 'beta', 'gamma', 'café', 'x', 'delta,']
+    return ''.join(rng.choice(vocabulary) + rng.choice([' ', '  ', '\n', '\t ']) for _ in range(words))
+
+
+def counting_urandom():
+    """A deterministic stand-in for os.urandom, so AIT_Steg nonces repeat across runs."""
+    counter = itertools.count()
+    return lambda size: bytes([next(counter) % 256]) * size
+
+
+def encode_both(method, cover, secret, key, chunk_size):
+    """Return (serial, parallel) encodings drawing the same nonces."""
+    with mock.patch('os.urandom', counting_urandom()):
+        serial = method.encode_bytes(cover, secret, key)
+    with mock.patch('os.urandom', counting_urandom()):
+        chunked = parallel_encode(method, cover, secret, key, workers=1, chunk_size=chunk_size)
+    return serial, chunked
+
+
+class TestChunkPool:
+    """Test cases for cutting text into chunks."""
+
+    def test_split_rejoins(self):
+        """Test that chunks join back to the text and stay near the chunk size."""
+        text = make_cover(200)
+        chunks = ChunkPool(workers=1, chunk_size=50).split(text)
+        assert ''.join(chunks) == text
+        assert all(len(chunk) == 50 for chunk in chunks[:-1])
+
+    def test_split_at_space_keeps_words_whole(self):
+        """Test that every cut falls just after whitespace."""
+        text = make_cover(200)
+        chunks = ChunkPool(workers=1, chunk_size=30).split(text, at_space=True)
+        assert ''.join(chunks) == text
+        assert all(chunk[-1].isspace() for chunk in chunks[:-1])
+        assert sum(len(chunk.split()) for chunk in chunks) == len(text.split())
+
+    def test_split_empty_text(self):
+        """Test that an empty text still gives one chunk."""
+        assert ChunkPool(workers=1).split('') == ['']
+
+    def test_split_words_offsets(self):
+        """Test that split_words() numbers each chunk's first word."""
+        text = make_cover(100)
+        words = text.split()
+        for chunk, first, count in ChunkPool(workers=1, chunk_size=40).split_words(text):
+            assert chunk.split() == words[first:first + count]
+
+    @pytest.mark.parametrize('chunk_size', [1, 2, 4, 5])
+    def test_bytes_cut_in_last_character(self, chunk_size):
+        """Test that a cut inside the final multibyte character ends the chunking."""
+        data = 'ab\u200b'.encode('utf-8')
+        bounds = list(_chunk_bounds(data, chunk_size, False))
+        assert b''.join(data[start:end] for start, end in bounds) == data
+        assert all(end > start for start, end in bounds)
+        for start, end in bounds:
+            data[start:end].decode('utf-8')
+
+    def test_rejects_empty_chunks(self):
+        """Test that a chunk size below one is refused."""
+        with pytest.raises(ValueError):
+            ChunkPool(chunk_size=0)
+
+
+@pytest.mark.parametrize('name', METHOD_NAMES)
+class TestParallelEncodeDecode:
+    """Test cases comparing the chunked paths with encode_bytes() and decode_bytes()."""
+
+    @pytest.mark.parametrize('chunk_size', [1, 37, 4096])
+    def test_encode_matches_serial(self, name, chunk_size):
+        """Test that the chunked output is identical to the serial output."""
+        method = METHODS[name]()
+        key = 'k' if name == 'ait-steg' else None
+        serial, chunked = encode_both(method, make_cover(300), bytes(range(256)) * 2, key, chunk_size)
+        assert chunked == serial
+
+    def test_multi_frame_secret(self, name):
+        """Test a secret spanning several frames, with compression."""
+        method = METHODS[name](compression='zlib')
+        secret = os.urandom(70000) + b'a' * 1000
+        serial, chunked = encode_both(method, make_cover(2000), secret, None, 3000)
+        assert chunked == serial
+        assert parallel_decode(method, serial, workers=1, chunk_size=3000) == secret
+
+    @pytest.mark.parametrize('cover', ['', '  \n ', 'one', 'few words here'])
+    def test_short_covers(self, name, cover):
+        """Test covers with no words or fewer words than symbols."""
+        method = METHODS[name]()
+        serial, chunked = encode_both(method, cover, b'secret data', None, 5)
+        assert chunked == serial
+
+    def test_empty_secret(self, name):
+        """Test that an empty secret leaves the cover unchanged."""
+        cover = make_cover(20)
+        assert parallel_encode(METHODS[name](), cover, b'', workers=1) == cover
+
+    @pytest.mark.parametrize('chunk_size', [1, 64, 10000])
+    def test_decode_matches_serial(self, name, chunk_size):
+        """Test that chunked decoding returns the secret decode_bytes() returns."""
+        method = METHODS[name]()
+        stego_text = method.encode_bytes(make_cover(300), b'hidden \xff bytes', None)
+        assert parallel_decode(method, stego_text, workers=1, chunk_size=chunk_size) == b'hidden \xff bytes'
+
+    def test_decode_without_message(self, name):
+        """Test that a plain text decodes to nothing, as serially."""
+        method = METHODS[name]()
+        cover = make_cover(50)
+        assert parallel_decode(method, cover, workers=1, chunk_size=16) == method.decode_bytes(cover)
+
+
+class TestProcessPool:
+    """Test cases running the chunks on worker processes."""
+
+    @pytest.mark.parametrize('name', METHOD_NAMES)
+    def test_round_trip_on_pool(self, name):
+        """Test that a two-process pool gives the serial result."""
+        method = METHODS[name]()
+        cover = make_cover(3000)
+        secret = os.urandom(3000)
+        stego_text = parallel_encode(method, cover, secret, workers=2, chunk_size=2000)
+        if name != 'ait-steg':
+            assert stego_text == method.encode_bytes(cover, secret)
+        assert parallel_decode(method, stego_text, workers=2, chunk_size=2000) == secret
+
+    def test_shared_executor(self):
+        """Test that a caller's executor is used and left running."""
+        from concurrent.futures import ProcessPoolExecutor
+
+        method = METHODS['em-st']()
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            stego_text = parallel_encode(method, make_cover(500), b'one', executor=executor, chunk_size=500)
+            assert parallel_decode(method, stego_text, executor=executor, chunk_size=500) == b'one'
+
+
+class TestCLIParallel:
+    """Test cases for the --parallel option."""
+
+    @pytest.mark.parametrize('method', ['ait-steg', 'twsm'])
+    def test_parallel_workflow(self, sample_files, method):
+        """Test that --parallel encodes and decodes like the default path."""
+        env = dict(os.environ, STEGO_DAEMON='off')
+        encode_result = subprocess.run([
+            'stego', method, 'encode', '--parallel', '2',
+            '--cover', sample_files['cover'],
+            '--data', sample_files['secret'],
+            '--output', sample_files['output']
+        ], capture_output=True, text=True, env=env)
+        assert encode_result.returncode == 0
+
+        decode_result = subprocess.run([
+            'stego', method, 'decode', '--parallel', '2',
+            '--input', sample_files['output'],
+            '--output', sample_files['decoded']
+        ], capture_output=True, text=True, env=env)
+        assert decode_result.returncode == 0
+
+        with open(sample_files['secret'], 'r', encoding='utf-8') as f, \
+                open(sample_files['decoded'], 'r', encoding='utf-8') as g:
+            assert g.read() == f.read()
+
+    def test_rejects_zero_workers(self, sample_files):
+        """Test that --parallel 0 is an error."""
+        result = subprocess.run([
+            'stego', 'em-st', 'encode', '--parallel', '0',
+            '--cover', sample_files['cover'],
+            '--data', sample_files['secret'],
+            '--output', sample_files['output']
+        ], capture_output=True, text=True)
+        assert result.returncode == 1
+        assert 'Error:' in result.stdout
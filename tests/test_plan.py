@@ -0,0 +1,96 @@
+"""Tests for capacity estimates and method planning."""
+
+import json
+import os
+import subprocess
+
+import pytest
+
+from stego.methods import METHODS
+from stego.methods.ait_steg import AITStegMethod
+from stego.methods.base import Estimate, StegoMethod
+from stego.methods.twsm import TWSMMethod
+from stego.plan import plan
+
+
+class TestEstimate:
+    """Test cases for StegoMethod.estimate()."""
+
+    @pytest.mark.parametrize('name', ['4spach', 'ait-steg', 'em-st'])
+    @pytest.mark.parametrize('payload_len', [0, 1, 50, 70000])
+    def test_output_size_is_exact(self, name, payload_len, sample_cover_text):
+        """Test that the predicted output size matches a real encode."""
+        method = METHODS[name]()
+        estimate = method.estimate(sample_cover_text, payload_len)
+        encoded = method.encode_bytes(sample_cover_text, os.urandom(payload_len), 'key')
+
+        assert estimate.output_size == len(encoded)
+        assert estimate.overhead_chars == len(encoded) - len(sample_cover_text)
+
+    def test_twsm_recycling_is_overflow(self, sample_cover_text):
+        """Test that TWSM reports recycled words once the cover runs out."""
+        words = len(sample_cover_text.split())
+        method = TWSMMethod()
+
+        small = method.estimate(sample_cover_text, 0)
+        large = method.estimate(sample_cover_text, 100)
+        assert small.fits and small.overflow == 0
+        assert not large.fits
+        assert large.overflow == large.carriers - words
+
+        encoded = method.encode_bytes(sample_cover_text, os.urandom(100))
+        assert abs(large.output_size - len(encoded)) < len(encoded) * 0.1
+
+    def test_em_st_capacity(self):
+        """Test that Em_st capacity is the largest payload without trailing symbols."""
+        method = METHODS['em-st']()
+        cover = 'word ' * 100
+        capacity = method.estimate(cover, 1).capacity
+
+        assert method.estimate(cover, capacity).fits
+        assert not method.estimate(cover, capacity + 1).fits
+
+    def test_xor_capacity(self):
+        """Test that the legacy xor frame limits AIT_Steg capacity."""
+        assert AITStegMethod().estimate("cover", 10 ** 6).capacity is None
+        assert not AITStegMethod(cipher='xor').estimate("cover", 10 ** 6).fits
+
+    def test_default_estimate_encodes(self, sample_cover_text):
+        """Test the measuring fallback for methods without a model."""
+        class Plain(METHODS['4spach']):
+            estimate = StegoMethod.estimate
+
+        estimate = Plain().estimate(sample_cover_text, 10)
+        assert isinstance(estimate, Estimate)
+        assert estimate.output_size == len(sample_cover_text) + 4 * 19
+
+
+class TestPlan:
+    """Test cases for ranking methods."""
+
+    def test_fitting_methods_first(self):
+        """Test that methods which fit the cover are ranked first."""
+        ranking = plan("a short cover", 40, order='size')
+
+        fits = [estimate.fits for _, estimate in ranking]
+        assert fits == sorted(fits, reverse=True)
+        assert {name for name, _ in ranking} == set(METHODS)
+
+    def test_unknown_order(self):
+        """Test that an unknown order is rejected."""
+        with pytest.raises(ValueError):
+            plan("cover", 1, order='luck')
+
+    def test_cli(self, sample_files):
+        """Test the plan command in table and JSON form."""
+        result = subprocess.run(['stego', 'plan', '--cover', sample_files['cover'],
+                                 '--data', sample_files['secret']], capture_output=True, text=True)
+        assert result.returncode == 0
+        assert 'Rank' in result.stdout and 'em-st' in result.stdout
+
+        result = subprocess.run(['stego', 'plan', '--cover', sample_files['cover'], '--length', '5',
+                                 '--sort', 'size', '--json'], capture_output=True, text=True)
+        assert result.returncode == 0
+        records = json.loads(result.stdout)
+        assert len(records) == 4
+        assert all(record['payload_len'] == 5 for record in records)
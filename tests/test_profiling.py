@@ -0,0 +1,84 @@
+"""Tests for per-stage profiling."""
+
+import subprocess
+
+import pytest
+
+from stego.methods import METHODS
+from stego.methods.ait_steg import AITStegMethod
+from stego.profiling import NULL_PROFILER, Profiler
+
+
+class TestProfiler:
+    """Test cases for the Profiler and its use by the methods."""
+
+    def test_disabled_by_default(self):
+        """Test that methods use the no-op profiler unless given one."""
+        method = METHODS['4spach']()
+        assert method.profiler is NULL_PROFILER
+        with method.profiler.stage('anything', 10):
+            pass
+        assert method.profiler.stats() == []
+
+    def test_records_calls_time_and_bytes(self):
+        """Test that repeated stages accumulate and keep their first-run order."""
+        profiler = Profiler()
+        for _ in range(3):
+            with profiler.stage('b', 10):
+                pass
+        with profiler.stage('a'):
+            pass
+
+        stats = profiler.stats()
+        assert [stat.stage for stat in stats] == ['b', 'a']
+        assert stats[0].calls == 3 and stats[0].bytes == 30
+        assert stats[0].seconds >= 0
+        assert 'Peak memory: 1.00 MB' in profiler.format_table(10 ** 6)
+
+        profiler.reset()
+        assert profiler.stats() == []
+
+    def test_callback(self):
+        """Test that the callback sees every finished stage, even on errors."""
+        seen = []
+        profiler = Profiler(callback=lambda stage, seconds, size: seen.append((stage, size)))
+        with pytest.raises(KeyError):
+            with profiler.stage('lookup', 4):
+                raise KeyError('x')
+        assert seen == [('lookup', 4)]
+
+    @pytest.mark.parametrize('name', sorted(METHODS))
+    def test_method_stages(self, name, sample_cover_text):
+        """Test that encode and decode of every method report their stages."""
+        profiler = Profiler()
+        method = METHODS[name](profiler=profiler)
+        encoded = method.encode_bytes(sample_cover_text, b'secret bytes', 'key')
+        assert 'insertion' in {stat.stage for stat in profiler.stats()}
+
+        profiler.reset()
+        assert method.decode_bytes(encoded, 'key') == b'secret bytes'
+        assert 'extraction' in {stat.stage for stat in profiler.stats()}
+
+    def test_ait_stages(self, sample_cover_text):
+        """Test that AIT_Steg separates key derivation, encryption and mapping."""
+        profiler = Profiler()
+        AITStegMethod(compression='zlib', profiler=profiler).encode_bytes(sample_cover_text, b'x' * 100)
+        stages = [stat.stage for stat in profiler.stats()]
+        assert stages == ['cover hashing', 'key derivation', 'compression', 'encryption',
+                          'symbol mapping', 'insertion']
+
+    def test_cli_profile(self, sample_files):
+        """Test that --profile prints the stage table and peak memory."""
+        result = subprocess.run(['stego', 'em-st', 'encode', '--cover', sample_files['cover'],
+                                 '--data', sample_files['secret'], '--output', sample_files['output'],
+                                 '--profile'], capture_output=True, text=True)
+        assert result.returncode == 0
+        assert 'symbol mapping' in result.stdout and 'Peak memory' in result.stdout
+
+        decoded = sample_files['output'] + '.decoded'
+        result = subprocess.run(['stego', 'em-st', 'decode', '--input', sample_files['output'],
+                                 '--output', decoded, '--profile'], capture_output=True, text=True)
+        assert result.returncode == 0
+        assert 'deframing' in result.stdout
+        with open(decoded, encoding='utf-8') as f1, open(sample_files['secret'], encoding='utf-8') as f2:
+            assert f1.read() == f2.read()
@@ -0,0 +1,97 @@
+"""Tests for the lazy method registry and CLI startup cost."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+import stego
+from stego import methods
+from stego.methods import BUILTIN_METHODS, METHODS, MethodRegistry, MethodSpec
+
+# Cumulative import time allowed for stego.cli, in milliseconds
+IMPORT_BUDGET_MS = float(os.environ.get('STEGO_IMPORT_BUDGET_MS', 50))
+
+# Modules a 4spach run must not load
+HEAVY_MODULES = ['cryptography', 'hashlib', 'multiprocessing', 'concurrent.futures', 'socket', 'threading',
+                 'importlib.metadata', 'tracemalloc', 'stego.methods.ait_steg', 'stego.bench', 'stego.server']
+
+
+def run_python(code, env=None):
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, env=env)
+    assert result.returncode == 0, result.stderr
+    return result
+
+
+class TestRegistry:
+    """Test cases for MethodRegistry."""
+
+    def test_builtin_classes(self):
+        """Test that names resolve to the method classes, also as attributes."""
+        from stego.methods.ait_steg import AITStegMethod
+        from stego.methods.fourspach import FourSpachMethod
+
+        assert METHODS['4spach'] is FourSpachMethod
+        assert stego.AITStegMethod is AITStegMethod
+        assert methods.FourSpachMethod is FourSpachMethod
+        assert list(METHODS)[:4] == [spec.name for spec in BUILTIN_METHODS]
+        with pytest.raises(AttributeError):
+            stego.NoSuchMethod
+
+    def test_specs_match_classes(self):
+        """Test that the CLI metadata agrees with the method classes."""
+        assert METHODS.spec('ait-steg').ciphers == METHODS['ait-steg'].CIPHERS
+        assert all(METHODS[spec.name].__name__ == spec.attr for spec in BUILTIN_METHODS)
+
+    def test_unknown_method(self):
+        """Test that unknown names are missing rather than failing to import."""
+        assert 'nope' not in METHODS
+        with pytest.raises(KeyError):
+            METHODS['nope']
+
+    def test_entry_point_plugins(self, monkeypatch):
+        """Test that entry-point methods are added without replacing built-ins."""
+        plugins = [MethodSpec('plain', 'stego.methods.twsm', 'TWSMMethod', 'plugin', False, False, ()),
+                   MethodSpec('4spach', 'elsewhere', 'Other', 'clash', False, False, ())]
+        monkeypatch.setattr(methods, '_entry_point_specs', lambda: iter(plugins))
+
+        registry = MethodRegistry(BUILTIN_METHODS)
+        assert registry.specs(plugins=False) == list(BUILTIN_METHODS)
+        assert registry['plain'] is METHODS['twsm']
+        assert registry.spec('4spach') == BUILTIN_METHODS[0]
+        assert len(registry) == 5
+
+        with pytest.raises(ValueError):
+            registry.register(plugins[0])
+
+
+class TestStartup:
+    """Test cases for the import cost of the CLI."""
+
+    @pytest.mark.parametrize('action', ['encode', 'decode'])
+    def test_lazy_imports(self, sample_files, temp_dir, action):
+        """Test that a whole 4spach run through main() only imports the 4spach module."""
+        if action == 'encode':
+            args = ['--cover', sample_files['cover'], '--data', sample_files['secret']]
+        else:
+            args = ['--input', sample_files['cover']]
+        argv = ['stego', '4spach', action, *args, '--output', sample_files['output']]
+        code = (f"import sys, stego.cli; sys.argv = {argv!r}; stego.cli.main();"
+                f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+        # The default daemon socket is looked up, and missing, as on a machine without a daemon
+        env = {name: value for name, value in os.environ.items() if name != 'STEGO_DAEMON'}
+        env['XDG_RUNTIME_DIR'] = temp_dir
+
+        lines = run_python(code, env).stdout.splitlines()
+        assert lines[0].endswith(sample_files['output'])
+        assert lines[-1] == ''
+
+    def test_import_time_budget(self):
+        """Test that importing the CLI stays within the startup budget."""
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import stego.cli'],
+                                capture_output=True, text=True)
+        cumulative = [int(line.split('|')[1]) for line in result.stderr.splitlines()
+                      if line.rstrip().endswith('| stego.cli')]
+        assert cumulative, result.stderr
+        assert cumulative[0] / 1000 < IMPORT_BUDGET_MS
@@ -0,0 +1,115 @@
+"""Tests for finding every message in a text."""
+
+import pytest
+
+from stego.methods import METHODS
+from stego.scanning import Message, scan_frames
+from stego.framing import frame_message
+
+COVER = "line {} hello there friend how are you doing today"
+
+
+def chat_log(method, count=3, key=None, stray=' :) \u200b'):
+    """Join independently encoded lines, with stray carrier symbols between them."""
+    lines = [method.encode_bytes(COVER.format(i), f"message {i}".encode(), key) for i in range(count)]
+    return (stray + '\n').join(lines)
+
+
+class TestScanFrames:
+    """Test cases for the byte-level frame search."""
+
+    def test_finds_messages_between_garbage(self):
+        """Test that garbage before, between and after messages is skipped."""
+        first = frame_message(b'one')
+        second = frame_message(b'two')
+        data = b'\x00\x00junk' + first + b'\x00\x00\x02\xff' + second + b'tail'
+
+        found = list(scan_frames(data))
+        assert [data[start:end] for start, end, _ in found] == [first, second]
+        assert [frames[0].payload for _, _, frames in found] == [b'one', b'two']
+
+    def test_skips_corrupt_message(self):
+        """Test that a message failing its checksum is not reported."""
+        corrupt = bytearray(frame_message(b'one'))
+        corrupt[5] ^= 0xFF
+        good = frame_message(b'two')
+
+        found = list(scan_frames(bytes(corrupt) + good))
+        assert [frames[0].payload for _, _, frames in found] == [b'two']
+
+
+@pytest.mark.parametrize('name', ['4spach', 'ait-steg', 'twsm', 'em-st'])
+class TestIterMessages:
+    """Test cases for iter_messages(), index_messages() and message_at()."""
+
+    def test_yields_every_message_in_order(self, name):
+        """Test that each line of a log is found with its own payload."""
+        method = METHODS[name]()
+        log = chat_log(method)
+
+        messages = list(method.iter_messages(log))
+        assert [message.payload for message in messages] == [b'message 0', b'message 1', b'message 2']
+        assert all(isinstance(message, Message) for message in messages)
+        offsets = [message.offset for message in messages]
+        assert offsets == sorted(offsets)
+
+    def test_spans_cover_the_carriers(self, name):
+        """Test that a message's span holds exactly that message."""
+        method = METHODS[name]()
+        log = chat_log(method)
+        for offset, length in method.index_messages(log):
+            assert method.index_messages(log[offset:offset + length]) == [(0, length)]
+
+    def test_message_at_reads_one_message(self, name):
+        """Test random access through the offset index."""
+        method = METHODS[name]()
+        log = chat_log(method, count=4)
+
+        index = method.index_messages(log)
+        assert len(index) == 4
+        assert method.message_at(log, *index[2]) == b'message 2'
+        assert method.message_at(log, *index[0]) == b'message 0'
+
+    def test_message_at_rejects_bad_offset(self, name):
+        """Test that an offset where no message starts raises ValueError."""
+        method = METHODS[name]()
+        log = chat_log(method, count=2)
+        offset, length = method.index_messages(log)[1]
+        with pytest.raises(ValueError):
+            method.message_at(log, offset + 1, length)
+
+    def test_no_messages(self, name):
+        """Test that plain text yields nothing."""
+        method = METHODS[name]()
+        assert list(method.iter_messages("just some words :) here")) == []
+        assert method.index_messages("") == []
+
+    def test_is_lazy(self, name):
+        """Test that the generator stops decoding when the caller stops reading."""
+        method = METHODS[name]()
+        log = chat_log(method)
+        messages = method.iter_messages(log)
+        assert next(messages).payload == b'message 0'
+        messages.close()
+
+
+class TestAITMessages:
+    """Test cases for the cover candidates of AIT_Steg messages."""
+
+    def test_user_key(self):
+        """Test that messages open with the user key and not without it."""
+        method = METHODS['ait-steg']()
+        log = chat_log(method, key='secret')
+
+        assert [m.payload for m in method.iter_messages(log, key='secret')] == \
+            [b'message 0', b'message 1', b'message 2']
+        assert [m.payload for m in method.iter_messages(log, key='wrong')] == [None, None, None]
+
+    def test_appended_messages(self):
+        """Test that messages appended to an earlier stego text use it as cover."""
+        method = METHODS['ait-steg']()
+        text = method.encode_bytes("The original cover text", b'first')
+        text = method.encode_bytes(text, b'second')
+        text = method.encode_bytes(text + " a reply", b'third')
+
+        assert [m.payload for m in method.iter_messages(text)] == [b'first', b'second', b'third']
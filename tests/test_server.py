@@ -0,0 +1,195 @@
+"""Tests for the stego serve daemon and its client."""
+
+import json
+import os
+import stat
+import subprocess
+import threading
+
+import pytest
+
+from stego.server import (DaemonClient, ServerStats, StegoServer, check_socket, execute, parse_address,
+                          private_dir)
+
+
+@pytest.fixture
+def server(temp_dir):
+    """An in-process daemon on a Unix socket, serving from a thread."""
+    server = StegoServer(os.path.join(temp_dir, 'stego.sock'), workers=0)
+    server.start()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    thread.join(timeout=5)
+
+
+class TestServer:
+    """Test cases for the daemon protocol."""
+
+    def test_parse_address(self):
+        """Test telling TCP addresses from socket paths."""
+        assert parse_address('127.0.0.1:8765') == ('127.0.0.1', 8765)
+        assert parse_address('localhost:80') == ('localhost', 80)
+        assert parse_address('/run/user/1000/stego.sock') == '/run/user/1000/stego.sock'
+        assert parse_address('[::1]:8765') == ('::1', 8765)
+
+    @pytest.mark.parametrize('address', ['0.0.0.0:8765', '192.168.1.5:8765', 'example.com:80', '[::]:8765'])
+    def test_rejects_non_loopback(self, address):
+        """Test that the daemon cannot be bound to or reached on a non-loopback host."""
+        with pytest.raises(ValueError, match='loopback'):
+            StegoServer(address, workers=0)
+        with pytest.raises(ValueError, match='loopback'):
+            DaemonClient(address)
+
+    def test_tcp_refuses_file_ops(self, sample_files):
+        """Test that a TCP daemon does not read or write files for its clients."""
+        server = StegoServer('127.0.0.1:0', workers=0)
+        response = server.handle({'op': 'decode_file', 'method': 'twsm', 'input': sample_files['cover'],
+                                  'output': sample_files['output']})
+        assert response['ok'] is False and 'Unix socket' in response['error']
+        assert not os.path.exists(sample_files['output'])
+
+    def test_socket_permissions(self, server, temp_dir):
+        """Test that the socket is private to this user and others are refused."""
+        assert stat.S_IMODE(os.stat(server.address).st_mode) & 0o077 == 0
+        check_socket(server.address)
+        os.chmod(server.address, 0o666)
+        with pytest.raises(PermissionError):
+            check_socket(server.address)
+
+        regular = os.path.join(temp_dir, 'regular')
+        open(regular, 'w').close()
+        os.chmod(regular, 0o600)
+        with pytest.raises(PermissionError):
+            check_socket(regular)
+        with pytest.raises(FileNotFoundError):
+            check_socket(os.path.join(temp_dir, 'missing.sock'))
+
+    def test_private_dir(self, temp_dir):
+        """Test that the socket directory is created 0700 and a shared one is refused."""
+        directory = private_dir(os.path.join(temp_dir, 'stego-1000'))
+        assert stat.S_IMODE(os.stat(directory).st_mode) == 0o700
+        assert private_dir(directory) == directory
+        os.chmod(directory, 0o755)
+        with pytest.raises(PermissionError):
+            private_dir(directory)
+
+    @pytest.mark.parametrize('name', ['4spach', 'ait-steg', 'twsm', 'em-st'])
+    def test_encode_decode(self, server, name, sample_cover_text, sample_secret):
+        """Test text and binary round trips through the daemon."""
+        with DaemonClient(server.address) as client:
+            encoded = client.encode(name, sample_cover_text, sample_secret, key='k')
+            assert client.decode(name, encoded, key='k') == sample_secret
+
+            encoded = client.encode(name, sample_cover_text, b'\x00\xff', key='k',
+                                    options={'compression': 'zlib'})
+            assert client.decode(name, encoded, key='k', binary=True) == b'\x00\xff'
+
+            stats = client.stats()
+        assert stats['requests'] == 4 and stats['errors'] == 0
+        assert stats['queue_depth'] == 0
+        assert stats['latency_p50_ms'] <= stats['latency_p99_ms']
+
+    def test_errors(self, server):
+        """Test error responses for bad requests; the connection stays usable."""
+        with DaemonClient(server.address) as client:
+            assert 'Unknown method' in client.request({'op': 'encode', 'method': 'nope'})['error']
+            assert 'Missing request field' in client.request({'op': 'encode', 'method': '4spach'})['error']
+            with pytest.raises(ValueError):
+                client.call({'op': 'fly', 'method': '4spach'})
+            assert client.call({'op': 'ping'}) == 'pong'
+            assert client.stats()['errors'] == 3
+
+        assert server.handle_line(b'not json')['ok'] is False
+        assert server.handle_line(b'{"op": "ping", "id": 7}') == {'ok': True, 'result': 'pong', 'id': 7}
+
+    def test_queue_limit(self):
+        """Test that requests beyond the queue limit are rejected and counted."""
+        stats = ServerStats()
+        assert stats.admit(1)
+        assert not stats.admit(1)
+        stats.done(0.01, ok=True)
+        assert stats.admit(1)
+        snapshot = stats.snapshot()
+        assert snapshot['rejected'] == 1 and snapshot['max_queue_depth'] == 1
+
+    def test_worker_processes(self, temp_dir, sample_cover_text):
+        """Test a daemon with a warm process pool."""
+        server = StegoServer(os.path.join(temp_dir, 'pool.sock'), workers=1)
+        server.start()
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            with DaemonClient(server.address) as client:
+                encoded = client.encode('em-st', sample_cover_text, 'hi')
+                assert client.decode('em-st', encoded) == 'hi'
+        finally:
+            server.shutdown()
+            thread.join(timeout=5)
+        assert not os.path.exists(server.address)
+
+    def test_execute_file_ops(self, sample_files):
+        """Test the file ops the CLI uses."""
+        response = execute({'op': 'encode_file', 'method': 'twsm', 'cover': sample_files['cover'],
+                            'data': sample_files['secret'], 'output': sample_files['output']})
+        assert response == {'ok': True, 'result': sample_files['output']}
+
+
+class TestCLIShim:
+    """Test cases for the CLI handing work to a running daemon."""
+
+    def run_cli(self, args, address):
+        env = dict(os.environ, STEGO_DAEMON=address)
+        return subprocess.run(['stego'] + args, capture_output=True, text=True, env=env)
+
+    def test_uses_running_daemon(self, server, sample_files):
+        """Test that encode and decode go through the daemon when it is running."""
+        decoded = sample_files['output'] + '.decoded'
+        result = self.run_cli(['ait-steg', 'encode', '--cover', sample_files['cover'], '--data',
+                               sample_files['secret'], '--key', 'k', '--output', sample_files['output']],
+                              server.address)
+        assert result.returncode == 0, result.stdout
+        result = self.run_cli(['ait-steg', 'decode', '--input', sample_files['output'], '--key', 'k',
+                               '--output', decoded], server.address)
+        assert result.returncode == 0, result.stdout
+
+        with open(decoded, encoding='utf-8') as f1, open(sample_files['secret'], encoding='utf-8') as f2:
+            assert f1.read() == f2.read()
+        assert server.stats.snapshot()['requests'] == 2
+
+        result = self.run_cli(['serve', '--address', server.address, '--stats'], server.address)
+        assert json.loads(result.stdout)['requests'] == 2
+
+    def test_falls_back_without_daemon(self, temp_dir, sample_files):
+        """Test that a missing daemon means a local run."""
+        result = self.run_cli(['4spach', 'encode', '--cover', sample_files['cover'], '--data',
+                               sample_files['secret'], '--output', sample_files['output']],
+                              os.path.join(temp_dir, 'missing.sock'))
+        assert result.returncode == 0
+        assert 'Encoded data written' in result.stdout
+
+    def test_refuses_open_socket(self, server, sample_files):
+        """Test that a socket other users could connect to is not used."""
+        os.chmod(server.address, 0o666)
+        result = self.run_cli(['4spach', 'encode', '--cover', sample_files['cover'], '--data',
+                               sample_files['secret'], '--output', sample_files['output']], server.address)
+        assert result.returncode == 1
+        assert 'Error:' in result.stdout and 'Refusing' in result.stdout
+        assert server.stats.snapshot()['requests'] == 0
+
+    def test_unsafe_default_socket_runs_locally(self, temp_dir, sample_files):
+        """Test that a default socket in a shared directory is skipped with a warning."""
+        directory = os.path.join(temp_dir, f'stego-{os.getuid()}')
+        os.mkdir(directory, 0o755)
+        os.chmod(directory, 0o755)
+        open(os.path.join(directory, 'daemon.sock'), 'w').close()
+        env = {name: value for name, value in os.environ.items() if name != 'STEGO_DAEMON'}
+        env['XDG_RUNTIME_DIR'] = temp_dir
+
+        result = subprocess.run(['stego', '4spach', 'encode', '--cover', sample_files['cover'], '--data',
+                                 sample_files['secret'], '--output', sample_files['output']],
+                                capture_output=True, text=True, env=env)
+        assert result.returncode == 0, result.stdout
+        assert 'Encoded data written' in result.stdout
+        assert 'Warning: Refusing' in result.stderr
@@ -0,0 +1,153 @@
+"""Tests for the shared-memory transport of large texts."""
+
+import asyncio
+import gc
+import os
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from stego import shm
+from stego.aio import async_decode, async_encode
+from stego.methods import METHODS
+from stego.parallel import parallel_decode, parallel_encode
+from stego.server import StegoServer
+from stego.shm import (SEGMENT_PREFIX, SegmentManager, TextSlice, call_shared, read_text, segment_dir,
+                       share, sweep_segments, unshare)
+
+TEXT = 'café naïve\u3000words ' * 20
+
+
+def own_segments() -> list:
+    """Segments of this process left in the segment directory."""
+    prefix = f'{SEGMENT_PREFIX}{os.getpid()}-'
+    return [name for name in os.listdir(segment_dir()) if name.startswith(prefix)]
+
+
+def upper(text):
+    return text.upper()
+
+
+@pytest.fixture
+def small_threshold(monkeypatch):
+    """Send every text of 100 characters or more through segments.
+
+    Set before any pool starts, so forked workers see it too.
+    """
+    monkeypatch.setattr(shm, 'SHARED_MIN_SIZE', 100)
+
+
+class TestSegmentManager:
+    """Test cases for creating and unlinking segments."""
+
+    def test_put_and_read(self, temp_dir):
+        """Test that text round trips through a segment, whole or sliced."""
+        with SegmentManager(temp_dir) as segments:
+            ref = segments.put_text(TEXT)
+            assert read_text(ref) == TEXT
+            assert read_text(ref._replace(start=0, end=5)) == 'café'
+
+    def test_close_unlinks(self, temp_dir):
+        """Test that every segment is gone after the block, even on an error."""
+        with pytest.raises(RuntimeError):
+            with SegmentManager(temp_dir) as segments:
+                segments.put_text(TEXT)
+                segments.new_segment()
+                assert len(segments.paths) == 2
+                raise RuntimeError('boom')
+        assert os.listdir(temp_dir) == []
+
+    def test_finalizer_unlinks(self, temp_dir):
+        """Test that a forgotten manager unlinks its segments when collected."""
+        segments = SegmentManager(temp_dir)
+        segments.put_text(TEXT)
+        del segments
+        gc.collect()
+        assert os.listdir(temp_dir) == []
+
+    def test_sweep_removes_dead_owners(self, temp_dir):
+        """Test that segments of exited processes are swept and others kept."""
+        child = subprocess.run([sys.executable, '-c', 'import os; print(os.getpid())'],
+                               capture_output=True, text=True)
+        dead = os.path.join(temp_dir, f'{SEGMENT_PREFIX}{child.stdout.strip()}-abc')
+        mine = os.path.join(temp_dir, f'{SEGMENT_PREFIX}{os.getpid()}-abc')
+        other = os.path.join(temp_dir, 'stego-1000.sock')
+        for path in (dead, mine, other):
+            open(path, 'w').close()
+
+        assert sweep_segments(temp_dir) == 1
+        assert sorted(os.listdir(temp_dir)) == sorted(os.path.basename(path) for path in (mine, other))
+
+
+class TestShare:
+    """Test cases for share(), unshare() and call_shared()."""
+
+    def test_share_large_values(self, temp_dir, small_threshold):
+        """Test that only large strings, alone or in a dict, become slices."""
+        with SegmentManager(temp_dir) as segments:
+            ref = share(TEXT, segments)
+            assert isinstance(ref, TextSlice)
+            request = share({'op': 'encode', 'cover': TEXT, 'key': 'k'}, segments)
+            assert isinstance(request['cover'], TextSlice) and request['key'] == 'k'
+            assert share('short', segments) == 'short'
+            assert unshare(request) == {'op': 'encode', 'cover': TEXT, 'key': 'k'}
+
+    def test_call_shared_result(self, temp_dir, small_threshold):
+        """Test that a large result is written to the output segment."""
+        with SegmentManager(temp_dir) as segments:
+            result = call_shared(upper, segments.new_segment(), share(TEXT, segments))
+            assert isinstance(result, TextSlice)
+            assert unshare(result) == TEXT.upper()
+            assert call_shared(upper, segments.new_segment(), 'small') == 'SMALL'
+
+    def test_unlinked_output_is_not_recreated(self, temp_dir, small_threshold):
+        """Test that a worker finishing after the owner closed leaves nothing behind."""
+        with SegmentManager(temp_dir) as segments:
+            output = segments.new_segment()
+        with pytest.raises(FileNotFoundError):
+            call_shared(upper, output, TEXT)
+        assert os.listdir(temp_dir) == []
+
+
+class TestTransports:
+    """Test cases for the pools that hand texts over through segments."""
+
+    @pytest.mark.parametrize('name', ['4spach', 'twsm', 'em-st'])
+    def test_parallel_chunks(self, name, small_threshold, monkeypatch):
+        """Test that chunked encode/decode over segments matches the serial path."""
+        shared = []
+        put_bytes = SegmentManager.put_bytes
+        monkeypatch.setattr(SegmentManager, 'put_bytes',
+                            lambda self, data: shared.append(len(data)) or put_bytes(self, data))
+        method = METHODS[name]()
+        cover = TEXT * 50
+        secret = os.urandom(500)
+        stego_text = parallel_encode(method, cover, secret, workers=2, chunk_size=700)
+        assert stego_text == method.encode_bytes(cover, secret)
+        assert parallel_decode(method, stego_text, workers=2, chunk_size=700) == secret
+        assert shared and own_segments() == []
+
+    def test_async_process_pool(self, small_threshold):
+        """Test async calls on a process pool with large texts."""
+        async def round_trip(executor):
+            stego_text = await async_encode('ait-steg', TEXT * 10, b'secret', key='k', executor=executor)
+            return await async_decode('ait-steg', stego_text, key='k', binary=True, executor=executor)
+
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            assert asyncio.run(round_trip(executor)) == b'secret'
+        assert own_segments() == []
+
+    def test_server_pool(self, temp_dir, small_threshold):
+        """Test daemon requests carrying large covers on a worker process."""
+        server = StegoServer(os.path.join(temp_dir, 'pool.sock'), workers=1)
+        server.start()
+        try:
+            encoded = server.handle({'op': 'encode', 'method': 'em-st', 'cover': TEXT * 10, 'secret': 'hi'})
+            assert encoded['ok'] and encoded['result'] == METHODS['em-st']().encode(TEXT * 10, 'hi')
+            decoded = server.handle({'op': 'decode', 'method': 'em-st', 'text': encoded['result']})
+            assert decoded == {'ok': True, 'result': 'hi'}
+        finally:
+            server.close()
+        assert own_segments() == []
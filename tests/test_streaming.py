@@ -0,0 +1,136 @@
+"""Tests for the streaming encode/decode API."""
+
+import io
+
+import pytest
+
+from stego.methods.ait_steg import AITStegMethod
+from stego.methods.em_st import EmStMethod
+from stego.methods.fourspach import FourSpachMethod
+from stego.methods.twsm import TWSMMethod
+from stego.streaming import (BLOCK_SIZE, MAX_CARRY, ChunkReader, iter_aligned, iter_blocks,
+                             iter_secret_frames, iter_words)
+
+DETERMINISTIC_METHODS = [FourSpachMethod, TWSMMethod, EmStMethod]
+ALL_METHODS = DETERMINISTIC_METHODS + [AITStegMethod]
+
+
+def blocks(text, size=7):
+    """Split text into small blocks so tokens straddle block boundaries."""
+    return iter_blocks(io.StringIO(text), size)
+
+
+def stream_encode(method, cover, secret, key=None):
+    out = io.StringIO()
+    method.encode_stream(blocks(cover), io.BytesIO(secret), out, key)
+    return out.getvalue()
+
+
+class TestStreamingHelpers:
+    """Test cases for the chunk and word helpers."""
+
+    def test_iter_aligned_keeps_tokens_whole(self):
+        """Test that re-cut chunks only end on whitespace."""
+        text = "alpha beta  gamma\ndelta epsilon"
+        chunks = list(iter_aligned(blocks(text, 4)))
+        assert ''.join(chunks) == text
+        assert all(chunk[-1].isspace() for chunk in chunks[:-1])
+
+    def test_iter_aligned_bounds_long_tokens(self):
+        """Test that whitespace-free input is cut once the carry reaches its limit."""
+        text = "x" * 1000 + " tail"
+        chunks = list(iter_aligned(blocks(text, 30), max_carry=100))
+        assert ''.join(chunks) == text
+        assert max(map(len, chunks)) <= 130
+
+    def test_iter_aligned_large_whitespace_free_input(self):
+        """Test a large single-line input: linear time and chunks no longer than the limit."""
+        token = "\u200b" * (3 * MAX_CARRY + 7)
+        chunks = list(iter_aligned(blocks(token + "\nend", BLOCK_SIZE)))
+        assert ''.join(chunks) == token + "\nend"
+        assert max(map(len, chunks)) <= MAX_CARRY + BLOCK_SIZE
+
+    def test_iter_words_matches_split(self):
+        """Test that streamed words match str.split()."""
+        text = "  one two\tthree\n\nfour five  "
+        assert list(iter_words(blocks(text, 3))) == text.split()
+
+    def test_chunk_reader(self):
+        """Test reading fixed sizes across chunk boundaries."""
+        reader = ChunkReader([b'ab', b'', b'cde', b'f'])
+        assert reader.read(3) == b'abc'
+        assert reader.read(10) == b'def'
+        assert reader.read(1) == b''
+
+    def test_secret_frames_split(self):
+        """Test that secrets are framed one frame-sized chunk at a time."""
+        frames = list(iter_secret_frames(io.BytesIO(b'x' * 10), frame_size=4))
+        assert len(frames) == 3
+        assert list(iter_secret_frames(io.BytesIO(b''))) == []
+
+
+class TestStreamMethods:
+    """Test cases for encode_stream/decode_stream on every method."""
+
+    @pytest.mark.parametrize('method_class', DETERMINISTIC_METHODS)
+    def test_stream_encode_matches_encode(self, method_class, sample_cover_text, sample_secret):
+        """Test that streaming produces exactly the output of encode()."""
+        method = method_class()
+        streamed = stream_encode(method, sample_cover_text, sample_secret.encode('utf-8'))
+        assert streamed == method.encode(sample_cover_text, sample_secret)
+
+    @pytest.mark.parametrize('method_class', ALL_METHODS)
+    def test_stream_round_trip(self, method_class, sample_cover_text, sample_secret):
+        """Test decoding a streamed encoding, both streaming and in memory."""
+        method = method_class()
+        stego_text = stream_encode(method, sample_cover_text, sample_secret.encode('utf-8'))
+
+        assert b''.join(method.decode_stream(blocks(stego_text))) == sample_secret.encode('utf-8')
+        assert method.decode(stego_text) == sample_secret
+
+    @pytest.mark.parametrize('method_class', ALL_METHODS)
+    def test_empty_secret_copies_cover(self, method_class, sample_cover_text):
+        """Test that an empty secret leaves the cover unchanged."""
+        method = method_class()
+        assert stream_encode(method, sample_cover_text, b'') == sample_cover_text
+
+    @pytest.mark.parametrize('method_class', [FourSpachMethod, EmStMethod, AITStegMethod])
+    def test_multi_frame_secret(self, method_class, sample_cover_text):
+        """Test a binary secret spanning several frames."""
+        method = method_class()
+        secret = bytes(range(256)) * 300
+        stego_text = stream_encode(method, sample_cover_text, secret, key='k')
+
+        chunks = list(method.decode_stream(io.StringIO(stego_text), key='k'))
+        assert len(chunks) > 1
+        assert b''.join(chunks) == secret
+
+    def test_ait_stream_with_user_key(self, sample_cover_text, sample_secret):
+        """Test AIT_Steg streaming with a user key, including a wrong key."""
+        method = AITStegMethod()
+        stego_text = stream_encode(method, sample_cover_text, sample_secret.encode('utf-8'), key='k')
+
+        assert method.decode(stego_text, key='k') == sample_secret
+        with pytest.raises(ValueError):
+            b''.join(method.decode_stream(blocks(stego_text), key='wrong'))
+
+    def test_ait_stream_short_cover(self):
+        """Test that a cover shorter than the salt still round trips."""
+        method = AITStegMethod()
+        stego_text = stream_encode(method, "short", b'secret', key='k')
+        assert b''.join(method.decode_stream(blocks(stego_text, 2), key='k')) == b'secret'
+
+    def test_twsm_reads_only_needed_words(self):
+        """Test that TWSM stops reading the cover once every bit is placed."""
+        method = TWSMMethod()
+        read = []
+
+        def cover():
+            for index in range(10 ** 6):
+                read.append(index)
+                yield f"word{index} "
+
+        out = io.StringIO()
+        method.encode_stream(cover(), io.BytesIO(b'hi'), out)
+        assert len(read) < 1000
+        assert method.decode(out.getvalue()) == 'hi'
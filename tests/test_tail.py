@@ -0,0 +1,39 @@
+"""Tests for trailing payload helpers."""
+
+import os
+from stego.tail import read_trailing_run, trailing_run
+
+
+class TestTrailingRun:
+    """Test cases for locating appended runs of invisible characters."""
+
+    def test_trailing_run_in_text(self):
+        """Test that only the run at the very end is returned."""
+        text = "a\u200Bb\u200C\u200D\n"
+
+        offset, run = trailing_run(text, "\u200B\u200C\u200D")
+        assert offset == 3
+        assert run == "\u200C\u200D"
+
+    def test_no_trailing_run(self):
+        """Test text that does not end with the character set."""
+        offset, run = trailing_run("a\u200Bb", "\u200B")
+        assert offset == 3
+        assert run == ""
+
+    def test_run_longer_than_block(self):
+        """Test that the search widens when the run fills the first block."""
+        text = "cover" + "\u200B" * 100
+
+        assert trailing_run(text, "\u200B", block_size=8) == (5, "\u200B" * 100)
+
+    def test_read_trailing_run_from_file(self, temp_dir):
+        """Test reading a trailing run from a file with a small block size."""
+        path = os.path.join(temp_dir, "tail.txt")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("cover é" + "\u200B\uFEFF" * 50 + "\n")
+
+        offset, run = read_trailing_run(path, "\u200B\uFEFF", block_size=16)
+        assert offset == len("cover é".encode('utf-8'))
+        assert run == "\u200B\uFEFF" * 50
+
@@ -99,3 +99,36 @@ class TestTWSMMethod:
         common_formats = ['*', '**', '_', '__']
         uses_common = any(fmt in encoded for fmt in common_formats)
         assert uses_common
+
+    def test_formatting_scanner_edge_cases(self):
+        """Test marker precedence and word boundaries in the formatting scanner."""
+        method = TWSMMethod()
+
+        # '***' and '****' read as single asterisks, '**' alone is not a word
+        text = "**bold** __under__ *it* _it_ *** **** ** plain*word* _x__\n__y_"
+        assert list(method._iter_formatting_symbols(text)) == [1, 3, 0, 2, 0, 0, 2, 2]
+
+    def test_decode_stops_after_frame(self, sample_cover_text, sample_secret):
+        """Test that formatting after the frame does not affect decoding."""
+        method = TWSMMethod()
+
+        encoded = method.encode(sample_cover_text, sample_secret)
+        assert method.decode(encoded + " *trailing* **words**") == sample_secret
+
+    def test_binary_round_trip(self, sample_cover_text):
+        """Test that arbitrary bytes survive encode_bytes/decode_bytes."""
+        method = TWSMMethod()
+        secret = bytes(range(256)) + b'\xff\xfe'
+
+        encoded = method.encode_bytes(sample_cover_text, secret)
+        assert method.decode_bytes(encoded) == secret
+        assert method.decode(encoded) == ''
+
+    def test_compression(self, sample_cover_text):
+        """Test that a compressed secret is shorter and round trips."""
+        secret = "compressible text " * 50
+
+        plain = TWSMMethod().encode(sample_cover_text, secret)
+        encoded = TWSMMethod(compression='zlib').encode(sample_cover_text, secret)
+        assert len(encoded) < len(plain)
+        assert TWSMMethod().decode(encoded) == secret
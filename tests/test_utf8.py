@@ -0,0 +1,105 @@
+"""Tests for the bytes-native zero-width engine."""
+
+import os
+
+import pytest
+
+from stego.batch import encode_file
+from stego.methods import METHODS
+from stego.methods.fourspach import FourSpachMethod
+from stego.utf8 import ZeroWidthCodec, map_file
+
+COVER = "Plain “quoted” text — with dashes, é accents and a plain line.\n" * 50
+ZERO_WIDTH = ['4spach', 'ait-steg']
+
+
+class TestZeroWidthCodec:
+    """Test cases for locating and reading zero-width sequences in bytes."""
+
+    def test_rejects_unfit_characters(self):
+        """Test that characters other than three-byte sequences are refused."""
+        with pytest.raises(ValueError):
+            ZeroWidthCodec(['a', '\u200b'], b'01')
+
+    def test_runs_and_symbols(self):
+        """Test that runs are found between other multi-byte characters."""
+        codec = ZeroWidthCodec(['\u200b', '\u200c', '\u200d', '\ufeff'], b'0123')
+        text = "“a”\u200b\u200c— b\ufeff\u200d é"
+        data = text.encode('utf-8')
+
+        runs = [run.group().decode('utf-8') for run in codec.iter_runs(data)]
+        assert runs == ['\u200b\u200c', '\ufeff\u200d']
+        assert codec.extract(data) == b'0132'
+        assert b''.join(codec.iter_cover(data)).decode('utf-8') == "“a”— b é"
+
+    def test_dense_lead_bytes(self):
+        """Test text where most lead bytes start other characters."""
+        codec = ZeroWidthCodec(['\u200b', '\u200c'], b'01')
+        data = ('“”—' * 1000 + '\u200c\u200b' + '—' * 1000 + '\u200b').encode('utf-8')
+        assert codec.extract(data) == b'100'
+
+
+@pytest.mark.parametrize('name', ZERO_WIDTH)
+class TestBytesNativeMethods:
+    """Test cases for the raw-bytes encode and decode paths of the methods."""
+
+    @pytest.mark.parametrize('key', [None, 'k'])
+    def test_encode_file_matches_str_path(self, name, key, temp_dir):
+        """Test that encode_file() output decodes like the str path and keeps the cover bytes."""
+        cover = os.path.join(temp_dir, 'cover.txt')
+        secret = os.path.join(temp_dir, 'secret.bin')
+        output = os.path.join(temp_dir, 'out.txt')
+        with open(cover, 'w', encoding='utf-8') as f:
+            f.write(COVER)
+        with open(secret, 'wb') as f:
+            f.write(os.urandom(5000))
+
+        method = METHODS[name]()
+        encode_file(method, cover, secret, output, key, binary=True)
+
+        with open(output, 'rb') as f:
+            assert f.read().startswith(COVER.encode('utf-8'))
+        with open(output, encoding='utf-8') as f:
+            stego_text = f.read()
+        with open(secret, 'rb') as f:
+            expected = f.read()
+        assert method.decode_bytes(stego_text, key) == expected
+        assert method.decode_path_bytes(output, key) == expected
+        assert method.decode_file_bytes(output, key) == expected
+
+    def test_decode_buffer_matches_decode_bytes(self, name):
+        """Test that decoding raw bytes gives the same secret as decoding the str."""
+        method = METHODS[name](compression='zlib')
+        stego_text = method.encode_bytes(COVER, b'secret ' * 100)
+        assert method.decode_buffer_bytes(stego_text.encode('utf-8')) == b'secret ' * 100
+
+    def test_empty_file(self, name, temp_dir):
+        """Test that an empty file maps to an empty buffer."""
+        path = os.path.join(temp_dir, 'empty.txt')
+        open(path, 'w').close()
+        with map_file(path) as buffer:
+            assert buffer == b''
+        assert METHODS[name]().decode_path_bytes(path) == b''
+
+
+class TestStrFallback:
+    """Test cases for subclasses whose characters are not three-byte sequences."""
+
+    def test_fallback(self, temp_dir):
+        """Test that such a subclass still encodes and decodes through the str paths."""
+        class AsciiSpach(FourSpachMethod):
+            UNICODE_CHARS = {'00': '\x01', '01': '\x02', '10': '\x03', '11': '\x04'}
+
+        method = AsciiSpach()
+        assert method._UTF8 is None
+
+        cover = os.path.join(temp_dir, 'cover.txt')
+        secret = os.path.join(temp_dir, 'secret.txt')
+        output = os.path.join(temp_dir, 'out.txt')
+        with open(cover, 'w', encoding='utf-8') as f:
+            f.write(COVER)
+        with open(secret, 'w', encoding='utf-8') as f:
+            f.write('fallback')
+        encode_file(method, cover, secret, output)
+        assert method.decode_path_bytes(output) == b'fallback'
+        assert method.decode_file_bytes(output) == b'fallback'